@@ -0,0 +1,186 @@
+import bpy
+import base64
+import copy
+import json
+import os
+import socket
+import time
+from collections import namedtuple
+from . import preview, routing, tracing
+
+# Notification channels. Each backend turns the add-on settings into plain
+# config data on the main thread, then sends from a worker thread without
+# touching bpy. One notification goes to every enabled channel at once, so
+# the total wait is that of the slowest channel rather than the sum.
+# Backend libraries (mailbox, subprocess, urllib) are imported by the send
+# that needs them rather than when the add-on loads.
+WEBHOOK_TIMEOUT = 15.0          # Seconds to wait for the webhook endpoint
+WEBHOOK_THUMBNAIL_EDGE = 320    # Longest edge of the thumbnail embedded in the JSON payload
+SENDMAIL_TIMEOUT = 60.0
+DEFAULT_SENDMAIL_PATH = "/usr/sbin/sendmail"
+
+# What a channel is asked to deliver; message is the finished MIME email, or None
+# when no enabled channel needs one
+Notification = namedtuple('Notification', ['subject', 'body', 'preview', 'message'])
+
+FileDropConfig = namedtuple('FileDropConfig', ['mode', 'path'])
+WebhookConfig = namedtuple('WebhookConfig', ['url', 'timeout'])
+
+_registry = {}  # Channel name -> Channel, in registration order
+
+class Channel:
+    """A way of delivering notifications; subclasses register themselves with register_channel()"""
+
+    name = ""
+    label = ""
+    needs_network = False   # Subject to Blender's 'Allow Online Access'
+    needs_message = False   # Sends the MIME email built by notifier_core
+
+    def configure(self, settings):
+        """Plain-data config if the channel is enabled, otherwise None (main thread only)"""
+        return None
+
+    def send(self, notification, config):
+        """Deliver a notification; runs on a worker thread and returns (success, message)"""
+        raise NotImplementedError
+
+def register_channel(channel):
+    _registry[channel.name] = channel
+    return channel
+
+def get_channel(name):
+    return _registry.get(name)
+
+def configured(settings):
+    """(channel, config) for every enabled channel"""
+    targets = []
+    for channel in _registry.values():
+        try:
+            config = channel.configure(settings)
+        except Exception as e:
+            print(f"⚠️ {channel.label} is misconfigured: {e}")
+            continue
+        if config is not None:
+            targets.append((channel, config))
+    return targets
+
+def _send_one(channel, config, notification):
+    try:
+        with tracing.span(f"channel.{channel.name.lower()}"):
+            return channel.send(notification, config)
+    except Exception as e:
+        print(f"⚠️ {channel.label} failed: {e}")
+        return False, f"Failed: {str(e)}"
+
+def dispatch(notification, targets):
+    """Send to every target concurrently; returns (all succeeded, combined message)"""
+    if len(targets) == 1:
+        channel, config = targets[0]
+        return _send_one(channel, config, notification)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="RenderMailBotChannel") as executor:
+        futures = [executor.submit(_send_one, channel, config, notification) for channel, config in targets]
+        results = [future.result() for future in futures]
+
+    success = all(ok for ok, _ in results)
+    summary = "; ".join(f"{channel.label}: {message}" for (channel, _), (_, message) in zip(targets, results))
+    return success, summary
+
+def _without_bcc(msg):
+    """Copy of a message with the Bcc header removed, the way smtplib sends it"""
+    msg_copy = copy.copy(msg)
+    del msg_copy['Bcc']
+    return msg_copy
+
+class FileDropChannel(Channel):
+    """Hands the email to the local mail system: a Maildir folder or the sendmail program"""
+
+    name = 'FILE'
+    label = "Local Mail Drop"
+    needs_message = True
+
+    def configure(self, settings):
+        if not settings.channel_file:
+            return None
+        if settings.file_drop_mode == 'SENDMAIL':
+            return FileDropConfig('SENDMAIL', settings.sendmail_path.strip() or DEFAULT_SENDMAIL_PATH)
+        if not settings.maildir_path.strip():
+            raise ValueError("no Maildir folder set")
+        return FileDropConfig('MAILDIR', bpy.path.abspath(settings.maildir_path))
+
+    def send(self, notification, config):
+        msg = notification.message
+        if config.mode == 'MAILDIR':
+            import mailbox
+            # Maildir delivery writes to tmp/ and renames into new/, so readers never see partial mail
+            key = mailbox.Maildir(config.path, create=True).add(_without_bcc(msg).as_bytes())
+            print(f"📥 Dropped email into Maildir {config.path} ({key})")
+            return True, "📥 Email saved to the Maildir folder"
+
+        import subprocess
+        recipients = routing.envelope_recipients(msg)
+        data = _without_bcc(msg).as_bytes(policy=msg.policy.clone(linesep=os.linesep))
+        completed = subprocess.run([config.path, "-i", "-f", str(msg['From']), "--", *recipients],
+                                   input=data, capture_output=True, timeout=SENDMAIL_TIMEOUT)
+        if completed.returncode != 0:
+            error = completed.stderr.decode('utf-8', 'replace').strip() or f"exit code {completed.returncode}"
+            return False, f"sendmail failed: {error}"
+        print(f"📥 Handed email to {config.path} for {len(recipients)} recipient(s)")
+        return True, "📥 Email handed to sendmail"
+
+class WebhookChannel(Channel):
+    """POSTs the notification as JSON, with a small JPEG thumbnail, to an HTTP endpoint"""
+
+    name = 'WEBHOOK'
+    label = "Webhook"
+    needs_network = True
+
+    def configure(self, settings):
+        if not settings.channel_webhook:
+            return None
+        url = settings.webhook_url.strip()
+        if not url.startswith(("http://", "https://")):
+            raise ValueError("the webhook URL must start with http:// or https://")
+        return WebhookConfig(url, WEBHOOK_TIMEOUT)
+
+    def payload(self, notification):
+        data = {
+            'subject': notification.subject,
+            'body': notification.body,
+            'host': socket.gethostname(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'thumbnail': None,
+        }
+        if notification.preview is not None:
+            thumbnail = preview.thumbnail(notification.preview, WEBHOOK_THUMBNAIL_EDGE)
+            image, subtype, filename = thumbnail.encode()
+            data['thumbnail'] = {
+                'content_type': f"image/{subtype}",
+                'filename': filename,
+                'width': thumbnail.size[0],
+                'height': thumbnail.size[1],
+                'data': base64.b64encode(image).decode('ascii'),
+            }
+        return data
+
+    def send(self, notification, config):
+        import urllib.error
+        import urllib.request
+        body = json.dumps(self.payload(notification), ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(config.url, data=body, method='POST', headers={
+            'Content-Type': "application/json; charset=utf-8",
+            'User-Agent': "Render-Email-Notifier",
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=config.timeout) as response:
+                status = response.status
+        except urllib.error.HTTPError as e:
+            return False, f"Webhook returned HTTP {e.code}"
+        except urllib.error.URLError as e:
+            return False, f"Webhook unreachable: {e.reason}"
+        print(f"🪝 Webhook accepted the notification (HTTP {status})")
+        return True, "🪝 Webhook notified"
+
+register_channel(FileDropChannel())
+register_channel(WebhookChannel())
@@ -0,0 +1,213 @@
+import bpy
+import functools
+import os
+import time
+from . import preview, tracing
+
+# Contact sheet for animation renders: evenly spaced frames are shrunk into
+# the cells of one preallocated canvas, so memory depends on the sheet size
+# and not on the number of frames rendered. The render_write handler only
+# notes the path of a wanted frame; a timer reads it back one frame per tick,
+# shrinking it while it is read, and whatever is still waiting when the
+# render ends is read by the completion email. NumPy is imported when a sheet
+# is drawn, not when the add-on loads.
+DEFAULT_FRAMES = 24
+DEFAULT_COLUMNS = 6
+BACKGROUND = 24   # Dark grey for empty cells and gutters
+GUTTER = 2        # Pixels between cells
+
+# 3x5 bitmap glyphs for frame number labels and chart axes
+_GLYPHS = {
+    '0': ("111", "101", "101", "101", "111"),
+    '1': ("010", "110", "010", "010", "111"),
+    '2': ("111", "001", "111", "100", "111"),
+    '3': ("111", "001", "111", "001", "111"),
+    '4': ("101", "101", "111", "001", "001"),
+    '5': ("111", "100", "111", "001", "111"),
+    '6': ("111", "100", "111", "101", "111"),
+    '7': ("111", "001", "010", "010", "010"),
+    '8': ("111", "101", "111", "101", "111"),
+    '9': ("111", "101", "111", "001", "111"),
+    '-': ("000", "000", "111", "000", "000"),
+    '.': ("000", "000", "000", "000", "010"),
+    ':': ("000", "010", "000", "010", "000"),
+    '%': ("101", "001", "010", "100", "101"),
+    'G': ("111", "100", "101", "101", "111"),
+    'B': ("110", "101", "110", "101", "110"),
+}
+_GLYPH_MASKS = {}  # Char -> boolean array, built the first time the glyph is drawn
+
+_sheet = None  # ContactSheet for the animation currently rendering
+
+def pick_frames(frames, count):
+    """Evenly subsample a list of frames down to at most count entries, keeping first and last"""
+    if len(frames) <= count:
+        return list(frames)
+    import numpy as np
+    picks = np.linspace(0, len(frames) - 1, count).round().astype(int)
+    return [frames[i] for i in dict.fromkeys(picks.tolist())]
+
+class ContactSheet:
+    """Preallocated mosaic of evenly spaced animation frames"""
+
+    def __init__(self, frames, columns, width, aspect):
+        import numpy as np
+        self.frames = frames
+        self.slots = {frame: index for index, frame in enumerate(frames)}
+        self.captured = []
+        self.pending = []                          # (frame, path) written but not read back yet
+        self.display = preview.STANDARD_DISPLAY   # How float frames are tone mapped
+        self.timer = None                          # Timer reading back pending frames
+        self.columns = max(1, min(columns, len(frames)))
+        self.rows = -(-len(frames) // self.columns)
+        self.cell_w = max(8, (width - GUTTER * (self.columns - 1)) // self.columns)
+        self.cell_h = max(8, round(self.cell_w * aspect))
+        self.canvas = np.full((self.rows * self.cell_h + GUTTER * (self.rows - 1),
+                               self.columns * self.cell_w + GUTTER * (self.columns - 1), 3),
+                              BACKGROUND, dtype=np.uint8)
+
+    @property
+    def cell_edge(self):
+        return max(self.cell_w, self.cell_h)
+
+    def wants(self, frame):
+        return frame in self.slots
+
+    @property
+    def frame_count(self):
+        """Frames on the sheet once every pending one has been read"""
+        return len(self.captured) + len(self.pending)
+
+    def develop_next(self):
+        """Read back and place the oldest pending frame; returns False when none is left"""
+        if not self.pending:
+            return False
+        frame, path = self.pending.pop(0)
+        start_time = time.perf_counter()
+        try:
+            with tracing.span("contact_sheet.frame", frame=frame):
+                self.add(frame, preview.preview_from_file(path, self.cell_edge, self.display))
+        except Exception as e:
+            print(f"⚠️ Could not add frame {frame} to the contact sheet: {e}")
+            return True
+        print(f"🎞️ Contact sheet: frame {frame} added in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+        return True
+
+    def develop(self):
+        """Read back every pending frame"""
+        while self.develop_next():
+            pass
+
+    def add(self, frame, pixels):
+        """Place a display-ready frame (uint8 RGB, top row first) into its cell"""
+        index = self.slots[frame]
+        if pixels.shape[:2] != (self.cell_h, self.cell_w):
+            pixels = preview.resample(pixels, self.cell_w, self.cell_h)
+
+        top = (index // self.columns) * (self.cell_h + GUTTER)
+        left = (index % self.columns) * (self.cell_w + GUTTER)
+        cell = self.canvas[top:top + self.cell_h, left:left + self.cell_w]
+        cell[:] = pixels
+        _draw_label(cell, str(frame))
+        self.captured.append(frame)
+
+def stamp_text(canvas, top, left, text, colour=255, scale=1):
+    """Draw text with the bitmap glyphs; characters without a glyph leave a space"""
+    import numpy as np
+    glyph_w, glyph_h = 3 * scale, 5 * scale
+    for i, char in enumerate(text):
+        mask = _GLYPH_MASKS.get(char)
+        if mask is None and char in _GLYPHS:
+            mask = _GLYPH_MASKS[char] = np.array([[c == '1' for c in row] for row in _GLYPHS[char]])
+        x = left + i * (glyph_w + scale)
+        if mask is None or x + glyph_w > canvas.shape[1] or top + glyph_h > canvas.shape[0]:
+            continue
+        big = np.kron(mask, np.ones((scale, scale), dtype=bool))
+        canvas[top:top + glyph_h, x:x + glyph_w][big] = colour
+
+def _draw_label(cell, text):
+    """Stamp a frame number in the top-left corner of a cell"""
+    scale = max(1, cell.shape[0] // 40)
+    glyph_w, glyph_h = 3 * scale, 5 * scale
+    pad = scale
+    label_w = len(text) * (glyph_w + scale) + pad
+    label_h = glyph_h + 2 * pad
+    if label_w > cell.shape[1] or label_h > cell.shape[0]:
+        return
+
+    cell[:label_h, :label_w] = 0
+    stamp_text(cell, pad, pad, text, 255, scale)
+
+def _develop(sheet):
+    """Timer callback: read back one pending frame per tick so the UI stays responsive"""
+    return 0.0 if sheet.develop_next() and sheet.pending else None
+
+def _viewer_pixels(scene, edge, display):
+    """Display pixels of the Viewer Node, for movie output that leaves no frame file to read back"""
+    viewer = bpy.data.images.get("Viewer Node")
+    if scene.use_nodes and viewer is not None and viewer.has_data and len(viewer.pixels) > 0:
+        return preview.preview_from_image(viewer, edge, display)
+    return None
+
+def start(scene, settings):
+    """Prepare an empty sheet for the frame range about to be rendered"""
+    global _sheet
+
+    _sheet = None
+    if not settings.contact_sheet:
+        return
+
+    frames = list(range(scene.frame_start, scene.frame_end + 1, max(1, scene.frame_step)))
+    if len(frames) < 2:
+        return
+
+    render = scene.render
+    aspect = (render.resolution_y * render.pixel_aspect_y) / max(1, render.resolution_x * render.pixel_aspect_x)
+    _sheet = ContactSheet(pick_frames(frames, settings.contact_sheet_frames),
+                          settings.contact_sheet_columns, settings.preview_max_size, aspect)
+    _sheet.display = preview.display_settings(scene, settings)
+
+def capture_frame(scene):
+    """render_write handler part: queue the frame that was just written, if it is one of the sheet's frames"""
+    frame = scene.frame_current
+    if _sheet is None or not _sheet.wants(frame):
+        return
+
+    render = scene.render
+    if not render.is_movie_format:
+        path = bpy.path.abspath(render.frame_path(frame=frame))
+        if os.path.exists(path):
+            _sheet.pending.append((frame, path))
+            # Timers only run once the render is over in background mode; finish() leaves the frames to the email
+            if not bpy.app.background and (_sheet.timer is None or not bpy.app.timers.is_registered(_sheet.timer)):
+                _sheet.timer = functools.partial(_develop, _sheet)
+                bpy.app.timers.register(_sheet.timer, first_interval=0.0)
+            return
+
+    # The Viewer Node is overwritten by the next frame, so it has to be read now
+    try:
+        with tracing.span("contact_sheet.frame", frame=frame):
+            pixels = _viewer_pixels(scene, _sheet.cell_edge, _sheet.display)
+    except Exception as e:
+        print(f"⚠️ Could not add frame {frame} to the contact sheet: {e}")
+        return
+    if pixels is not None:
+        _sheet.add(frame, pixels)
+
+def finish():
+    """Hand back the finished sheet (or None if fewer than two frames were captured) and reset
+
+    Frames still pending are read back by whoever builds the email, with develop().
+    """
+    global _sheet
+
+    sheet, _sheet = _sheet, None
+    if sheet is None or sheet.frame_count < 2:
+        return None
+    return sheet
+
+def discard():
+    global _sheet
+    if _sheet is not None:
+        _sheet.pending.clear()  # Its timer stops at the next tick
+    _sheet = None
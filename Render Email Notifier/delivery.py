@@ -0,0 +1,116 @@
+import bpy
+import queue
+import threading
+import time
+
+# Background delivery: the main thread only builds messages and queues them,
+# a worker thread does the slow SMTP round trips, and a timer brings the
+# results back to the UI.
+_outgoing = queue.Queue()   # Jobs waiting for the worker
+_results = queue.Queue()    # (success, message, notify) tuples waiting for the UI
+_worker = None              # The delivery worker thread
+_pending = 0                # Jobs submitted but not yet reported back
+_pending_lock = threading.Lock()
+
+RESULT_POLL_INTERVAL = 0.25  # Seconds between checks for finished deliveries
+
+def _worker_loop():
+    """Take jobs off the queue and run them until the stop sentinel arrives"""
+    while True:
+        job = _outgoing.get()
+        if job is None:
+            break
+
+        func, args, notify = job
+        try:
+            success, msg = func(*args)
+        except Exception as e:
+            success, msg = False, f"Failed to send email: {str(e)}"
+            print(f"⚠️ {msg}")
+        _results.put((success, msg, notify))
+
+def start_worker():
+    """Start the delivery worker thread if it is not already running"""
+    global _worker
+
+    if _worker is not None and _worker.is_alive():
+        return
+
+    _worker = threading.Thread(target=_worker_loop, name="RenderMailBotDelivery", daemon=True)
+    _worker.start()
+    print("🧵 Started email delivery worker")
+
+def stop_worker(timeout=2.0):
+    """Ask the worker to finish and wait briefly for it to exit"""
+    global _worker, _pending
+
+    if bpy.app.timers.is_registered(_poll_results):
+        bpy.app.timers.unregister(_poll_results)
+
+    if _worker is None:
+        return
+
+    _outgoing.put(None)
+    _worker.join(timeout)
+    if _worker.is_alive():
+        print("⚠️ Email delivery worker still busy - leaving it to finish in the background")
+    _worker = None
+
+    with _pending_lock:
+        _pending = 0
+    print("🧵 Stopped email delivery worker")
+
+def submit(func, *args, notify=True):
+    """Queue func(*args) for the worker; it must return (success, message) and not touch bpy"""
+    global _pending
+
+    start_worker()
+    with _pending_lock:
+        _pending += 1
+    _outgoing.put((func, args, notify))
+
+    if not bpy.app.timers.is_registered(_poll_results):
+        bpy.app.timers.register(_poll_results, first_interval=RESULT_POLL_INTERVAL)
+
+def pending_count():
+    """Number of deliveries that have not reported back yet"""
+    with _pending_lock:
+        return _pending
+
+def _show_result(success, msg):
+    """Surface a delivery result through the notification popup"""
+    if bpy.app.background:
+        return  # No UI to show it in; the worker already printed the result
+    try:
+        bpy.ops.rendermailbot.show_message('INVOKE_DEFAULT',
+                                        message=msg if success else f"Error sending email: {msg}",
+                                        icon='INFO' if success else 'ERROR')
+    except Exception as e:
+        print(f"Couldn't show UI notification: {e}")
+
+def _poll_results():
+    """Timer callback that reports finished deliveries on the main thread"""
+    global _pending
+
+    while True:
+        try:
+            success, msg, notify = _results.get_nowait()
+        except queue.Empty:
+            break
+
+        with _pending_lock:
+            _pending = max(0, _pending - 1)
+        if notify:
+            _show_result(success, msg)
+
+    # Keep polling only while something is still in flight
+    return RESULT_POLL_INTERVAL if pending_count() > 0 else None
+
+def wait_idle(timeout):
+    """Block until every submitted job has finished, e.g. before Blender exits in background mode"""
+    deadline = time.monotonic() + timeout
+    _poll_results()
+    while pending_count() > 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+        _poll_results()
+    return pending_count() == 0
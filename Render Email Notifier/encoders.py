@@ -0,0 +1,276 @@
+import struct
+import zlib
+import numpy as np
+
+# Pure NumPy image encoders for email previews. Blender ships NumPy but no
+# imaging library, so PNG and baseline JPEG are written here directly from
+# (height, width, 3) uint8 arrays into bytes, without touching the disk.
+
+# ---------------------------------------------------------------- PNG
+
+def _png_chunk(tag, data):
+    chunk = tag + data
+    return struct.pack(">I", len(data)) + chunk + struct.pack(">I", zlib.crc32(chunk) & 0xFFFFFFFF)
+
+def encode_png(pixels, compress_level=6):
+    """Encode an RGB or RGBA uint8 array as PNG bytes"""
+    height, width, channels = pixels.shape
+    color_type = {3: 2, 4: 6}[channels]
+    rows = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(height, width * channels)
+
+    # "Up" filter on every row: photos compress noticeably better than unfiltered
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", header)
+            + _png_chunk(b"IDAT", zlib.compress(filtered.tobytes(), compress_level))
+            + _png_chunk(b"IEND", b""))
+
+# ---------------------------------------------------------------- JPEG
+
+# Standard tables from ITU-T T.81 Annex K
+_LUMA_QUANT = np.array([
+    16, 11, 10, 16, 24, 40, 51, 61,
+    12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56,
+    14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77,
+    24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101,
+    72, 92, 95, 98, 112, 100, 103, 99], dtype=np.float32)
+
+_CHROMA_QUANT = np.array([
+    17, 18, 24, 47, 99, 99, 99, 99,
+    18, 21, 26, 66, 99, 99, 99, 99,
+    24, 26, 56, 99, 99, 99, 99, 99,
+    47, 66, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99], dtype=np.float32)
+
+_DC_LUMA = ([0, 1, 5, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0], list(range(12)))
+_DC_CHROMA = ([0, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0], list(range(12)))
+_AC_LUMA = ([0, 2, 1, 3, 3, 2, 4, 3, 5, 5, 4, 4, 0, 0, 1, 125], [
+    0x01, 0x02, 0x03, 0x00, 0x04, 0x11, 0x05, 0x12, 0x21, 0x31, 0x41, 0x06, 0x13, 0x51, 0x61, 0x07,
+    0x22, 0x71, 0x14, 0x32, 0x81, 0x91, 0xa1, 0x08, 0x23, 0x42, 0xb1, 0xc1, 0x15, 0x52, 0xd1, 0xf0,
+    0x24, 0x33, 0x62, 0x72, 0x82, 0x09, 0x0a, 0x16, 0x17, 0x18, 0x19, 0x1a, 0x25, 0x26, 0x27, 0x28,
+    0x29, 0x2a, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3a, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49,
+    0x4a, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5a, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69,
+    0x6a, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7a, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89,
+    0x8a, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0x98, 0x99, 0x9a, 0xa2, 0xa3, 0xa4, 0xa5, 0xa6, 0xa7,
+    0xa8, 0xa9, 0xaa, 0xb2, 0xb3, 0xb4, 0xb5, 0xb6, 0xb7, 0xb8, 0xb9, 0xba, 0xc2, 0xc3, 0xc4, 0xc5,
+    0xc6, 0xc7, 0xc8, 0xc9, 0xca, 0xd2, 0xd3, 0xd4, 0xd5, 0xd6, 0xd7, 0xd8, 0xd9, 0xda, 0xe1, 0xe2,
+    0xe3, 0xe4, 0xe5, 0xe6, 0xe7, 0xe8, 0xe9, 0xea, 0xf1, 0xf2, 0xf3, 0xf4, 0xf5, 0xf6, 0xf7, 0xf8,
+    0xf9, 0xfa])
+_AC_CHROMA = ([0, 2, 1, 2, 4, 4, 3, 4, 7, 5, 4, 4, 0, 1, 2, 119], [
+    0x00, 0x01, 0x02, 0x03, 0x11, 0x04, 0x05, 0x21, 0x31, 0x06, 0x12, 0x41, 0x51, 0x07, 0x61, 0x71,
+    0x13, 0x22, 0x32, 0x81, 0x08, 0x14, 0x42, 0x91, 0xa1, 0xb1, 0xc1, 0x09, 0x23, 0x33, 0x52, 0xf0,
+    0x15, 0x62, 0x72, 0xd1, 0x0a, 0x16, 0x24, 0x34, 0xe1, 0x25, 0xf1, 0x17, 0x18, 0x19, 0x1a, 0x26,
+    0x27, 0x28, 0x29, 0x2a, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3a, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48,
+    0x49, 0x4a, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5a, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68,
+    0x69, 0x6a, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7a, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87,
+    0x88, 0x89, 0x8a, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0x98, 0x99, 0x9a, 0xa2, 0xa3, 0xa4, 0xa5,
+    0xa6, 0xa7, 0xa8, 0xa9, 0xaa, 0xb2, 0xb3, 0xb4, 0xb5, 0xb6, 0xb7, 0xb8, 0xb9, 0xba, 0xc2, 0xc3,
+    0xc4, 0xc5, 0xc6, 0xc7, 0xc8, 0xc9, 0xca, 0xd2, 0xd3, 0xd4, 0xd5, 0xd6, 0xd7, 0xd8, 0xd9, 0xda,
+    0xe2, 0xe3, 0xe4, 0xe5, 0xe6, 0xe7, 0xe8, 0xe9, 0xea, 0xf2, 0xf3, 0xf4, 0xf5, 0xf6, 0xf7, 0xf8,
+    0xf9, 0xfa])
+
+# Zigzag scan order: _ZIGZAG[i] is the natural (row-major) index of the i-th coefficient
+_ZIGZAG = np.array(sorted(range(64), key=lambda i: (
+    (i // 8 + i % 8), (i // 8 if (i // 8 + i % 8) % 2 else i % 8))), dtype=np.intp)
+
+def _dct_matrix():
+    k = np.arange(8)
+    matrix = np.cos((2 * k[None, :] + 1) * k[:, None] * np.pi / 16) * np.sqrt(2 / 8)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+_DCT = _dct_matrix()
+
+def _huffman_lookup(table):
+    """Expand a (bits, values) table into per-symbol code and length arrays"""
+    bits, values = table
+    codes = np.zeros(256, dtype=np.uint32)
+    lengths = np.zeros(256, dtype=np.uint32)
+    code = 0
+    symbol = 0
+    for length, count in enumerate(bits, start=1):
+        for _ in range(count):
+            codes[values[symbol]] = code
+            lengths[values[symbol]] = length
+            code += 1
+            symbol += 1
+        code <<= 1
+    return codes, lengths
+
+_DC_LOOKUP = (_huffman_lookup(_DC_LUMA), _huffman_lookup(_DC_CHROMA))
+_AC_LOOKUP = (_huffman_lookup(_AC_LUMA), _huffman_lookup(_AC_CHROMA))
+
+def _scaled_quant(table, quality):
+    """IJG quality scaling of a base quantization table"""
+    quality = min(100, max(1, int(quality)))
+    scale = 5000 / quality if quality < 50 else 200 - quality * 2
+    return np.clip(np.floor((table * scale + 50) / 100), 1, 255)
+
+def _bit_size(values):
+    """Number of bits needed for |value| (the JPEG magnitude category)"""
+    magnitude = np.abs(values).astype(np.uint32)
+    size = np.zeros(magnitude.shape, dtype=np.uint32)
+    while np.any(magnitude):
+        nonzero = magnitude > 0
+        size += nonzero
+        magnitude >>= 1
+    return size
+
+def _magnitude_bits(values, sizes):
+    """Extra bits after each Huffman symbol (one's complement for negative values)"""
+    values = values.astype(np.int64)
+    return np.where(values >= 0, values, values + (1 << sizes.astype(np.int64)) - 1).astype(np.uint64)
+
+def _to_blocks(plane, block_rows, block_cols):
+    """Split a plane into (block_rows, block_cols, 8, 8) tiles"""
+    return plane.reshape(block_rows, 8, block_cols, 8).swapaxes(1, 2)
+
+def _pack_bits(values, lengths):
+    """Concatenate variable length codes (MSB first) into bytes, padding with 1 bits"""
+    lengths = lengths.astype(np.int64)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    total_bits = int(ends[-1]) if ends.size else 0
+    byte_count = -(-total_bits // 8)
+
+    # Codes are at most 27 bits, so shifted to their bit offset they fit a 5 byte window.
+    # Codes never overlap, so summing the window bytes per output byte equals OR-ing them
+    window = values.astype(np.uint64) << (40 - lengths - (starts & 7)).astype(np.uint64)
+    first_byte = starts >> 3
+    packed = np.zeros(byte_count + 5, dtype=np.float64)
+    for lane in range(5):
+        lane_bytes = (window >> np.uint64(32 - 8 * lane)) & np.uint64(0xFF)
+        packed += np.bincount(first_byte + lane, weights=lane_bytes.astype(np.float64), minlength=packed.size)
+
+    packed = packed[:byte_count].astype(np.uint8)
+    padding = (-total_bits) % 8
+    if padding:
+        packed[-1] |= (1 << padding) - 1
+    return packed.tobytes()
+
+def _marker_segment(marker, payload):
+    return struct.pack(">HH", marker, len(payload) + 2) + payload
+
+def _dht_payload(table_class, table_id, table):
+    bits, values = table
+    return bytes([(table_class << 4) | table_id]) + bytes(bits) + bytes(values)
+
+def encode_jpeg(pixels, quality=85):
+    """Encode an RGB uint8 array as a baseline 4:2:0 JPEG"""
+    height, width = pixels.shape[:2]
+    rgb = pixels[..., :3].astype(np.float32)
+
+    # Pad to whole 16x16 macroblocks by repeating the edge pixels
+    padded_h, padded_w = -(-height // 16) * 16, -(-width // 16) * 16
+    rgb = np.pad(rgb, ((0, padded_h - height), (0, padded_w - width), (0, 0)), mode='edge')
+
+    # RGB -> YCbCr, centered on zero
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    y = 0.299 * r + 0.587 * g + 0.114 * b - 128
+    cb = -0.168736 * r - 0.331264 * g + 0.5 * b
+    cr = 0.5 * r - 0.418688 * g - 0.081312 * b
+
+    # 2x2 chroma subsampling
+    def subsample(plane):
+        return plane.reshape(padded_h // 2, 2, padded_w // 2, 2).mean(axis=(1, 3))
+    cb, cr = subsample(cb), subsample(cr)
+
+    mcu_rows, mcu_cols = padded_h // 16, padded_w // 16
+    # Four luma blocks per MCU in raster order, followed by one Cb and one Cr block
+    y_blocks = _to_blocks(y, mcu_rows * 2, mcu_cols * 2).reshape(mcu_rows, 2, mcu_cols, 2, 8, 8)
+    y_blocks = y_blocks.transpose(0, 2, 1, 3, 4, 5).reshape(-1, 4, 8, 8)
+    cb_blocks = _to_blocks(cb, mcu_rows, mcu_cols).reshape(-1, 1, 8, 8)
+    cr_blocks = _to_blocks(cr, mcu_rows, mcu_cols).reshape(-1, 1, 8, 8)
+    blocks = np.concatenate([y_blocks, cb_blocks, cr_blocks], axis=1).reshape(-1, 8, 8)
+    component = np.tile(np.array([0, 0, 0, 0, 1, 2], dtype=np.intp), mcu_rows * mcu_cols)
+    is_chroma = (component > 0).astype(np.intp)
+
+    # Forward DCT and quantization, then zigzag reorder
+    luma_q = _scaled_quant(_LUMA_QUANT, quality)
+    chroma_q = _scaled_quant(_CHROMA_QUANT, quality)
+    coefficients = (_DCT @ blocks @ _DCT.T).reshape(-1, 64)
+    quant = np.stack([luma_q, chroma_q])[is_chroma]
+    coefficients = np.round(coefficients / quant).astype(np.int32)[:, _ZIGZAG]
+
+    block_count = coefficients.shape[0]
+    block_index = np.arange(block_count)
+
+    # DC coefficients are coded as differences from the previous block of the same component
+    dc = coefficients[:, 0]
+    dc_diff = np.empty_like(dc)
+    for comp in range(3):
+        mask = component == comp
+        dc_diff[mask] = np.diff(dc[mask], prepend=0)
+    dc_size = _bit_size(dc_diff)
+    dc_codes = np.stack([_DC_LOOKUP[0][0], _DC_LOOKUP[1][0]])[is_chroma, dc_size]
+    dc_lengths = np.stack([_DC_LOOKUP[0][1], _DC_LOOKUP[1][1]])[is_chroma, dc_size]
+
+    # AC coefficients: (run of zeros, size) symbols for every nonzero value
+    ac = coefficients[:, 1:]
+    nz_block, nz_pos = np.nonzero(ac)
+    nz_value = ac[nz_block, nz_pos]
+    first_in_block = np.ones(nz_block.size, dtype=bool)
+    first_in_block[1:] = nz_block[1:] != nz_block[:-1]
+    previous = np.where(first_in_block, -1, np.concatenate([[-1], nz_pos[:-1]]))
+    run = nz_pos - previous - 1
+    zrl_count = run // 16
+    run = run % 16
+    ac_size = _bit_size(nz_value)
+    ac_symbol = (run << 4) | ac_size
+    ac_chroma = is_chroma[nz_block]
+    ac_codes = np.stack([_AC_LOOKUP[0][0], _AC_LOOKUP[1][0]])[ac_chroma, ac_symbol]
+    ac_lengths = np.stack([_AC_LOOKUP[0][1], _AC_LOOKUP[1][1]])[ac_chroma, ac_symbol]
+
+    # Runs of 16+ zeros need ZRL (0xF0) symbols in front of the coefficient
+    zrl_parent = np.repeat(np.arange(nz_block.size), zrl_count)
+    zrl_step = np.arange(zrl_parent.size) - np.repeat(np.cumsum(zrl_count) - zrl_count, zrl_count)
+    zrl_chroma = ac_chroma[zrl_parent]
+    zrl_codes = np.stack([_AC_LOOKUP[0][0], _AC_LOOKUP[1][0]])[zrl_chroma, 0xF0]
+    zrl_lengths = np.stack([_AC_LOOKUP[0][1], _AC_LOOKUP[1][1]])[zrl_chroma, 0xF0]
+
+    # End-of-block for every block whose last coefficient is zero
+    last_nonzero = np.full(block_count, -1)
+    np.maximum.at(last_nonzero, nz_block, nz_pos)
+    eob_block = block_index[last_nonzero < 62]
+    eob_codes = np.stack([_AC_LOOKUP[0][0], _AC_LOOKUP[1][0]])[is_chroma[eob_block], 0x00]
+    eob_lengths = np.stack([_AC_LOOKUP[0][1], _AC_LOOKUP[1][1]])[is_chroma[eob_block], 0x00]
+
+    # Merge all symbols in stream order: sort key = block, then position inside the block
+    def with_bits(codes, lengths, extra, extra_size):
+        values = (codes.astype(np.uint64) << extra_size.astype(np.uint64)) | extra
+        return values, lengths + extra_size
+
+    dc_values, dc_total = with_bits(dc_codes, dc_lengths, _magnitude_bits(dc_diff, dc_size), dc_size)
+    ac_values, ac_total = with_bits(ac_codes, ac_lengths, _magnitude_bits(nz_value, ac_size), ac_size)
+    keys = np.concatenate([
+        block_index * 256,
+        nz_block[zrl_parent] * 256 + 1 + nz_pos[zrl_parent] * 4 + zrl_step,
+        nz_block * 256 + 1 + nz_pos * 4 + 3,
+        eob_block * 256 + 255,
+    ])
+    values = np.concatenate([dc_values, zrl_codes.astype(np.uint64), ac_values, eob_codes.astype(np.uint64)])
+    lengths = np.concatenate([dc_total, zrl_lengths, ac_total, eob_lengths])
+    order = np.argsort(keys, kind='stable')
+    scan = _pack_bits(values[order], lengths[order]).replace(b"\xff", b"\xff\x00")
+
+    header = b"\xff\xd8"
+    header += _marker_segment(0xFFE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")
+    header += _marker_segment(0xFFDB, b"\x00" + bytes(luma_q[_ZIGZAG].astype(np.uint8))
+                              + b"\x01" + bytes(chroma_q[_ZIGZAG].astype(np.uint8)))
+    header += _marker_segment(0xFFC0, struct.pack(">BHHB", 8, height, width, 3)
+                              + b"\x01\x22\x00\x02\x11\x01\x03\x11\x01")
+    header += _marker_segment(0xFFC4, _dht_payload(0, 0, _DC_LUMA) + _dht_payload(1, 0, _AC_LUMA)
+                              + _dht_payload(0, 1, _DC_CHROMA) + _dht_payload(1, 1, _AC_CHROMA))
+    header += _marker_segment(0xFFDA, b"\x03\x01\x00\x02\x11\x03\x11\x00\x3f\x00")
+    return header + scan + b"\xff\xd9"
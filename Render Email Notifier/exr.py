@@ -0,0 +1,208 @@
+import mmap
+import struct
+import zlib
+import numpy as np
+
+# Minimal OpenEXR reader for scanline files, shared by the output frame
+# checks and the float preview path. It walks the header and chunk table and
+# decodes uncompressed, ZIPS and ZIP blocks (Blender's default) with zlib and
+# NumPy, so neither needs bpy and both can run off the main thread. Tiled,
+# multi-part and deep files and the other codecs are left to Blender.
+MAGIC = b"\x76\x2f\x31\x01"
+SAMPLE_BYTES = {0: 4, 1: 2, 2: 4}           # UINT, HALF, FLOAT
+SAMPLE_TYPES = {0: "<u4", 1: "<f2", 2: "<f4"}
+# Scanlines per chunk for each compression: NONE, RLE, ZIPS, ZIP, PIZ, PXR24, B44, B44A, DWAA, DWAB
+BLOCK_LINES = {0: 1, 1: 1, 2: 1, 3: 16, 4: 32, 5: 16, 6: 32, 7: 32, 8: 32, 9: 256}
+DECODED_CODECS = (0, 2, 3)
+DEFAULT_PASS = "Combined"
+# Channel suffixes shown as colour, in display order; passes like Normal or Vector use XYZ
+COLOUR_SETS = (('R', 'G', 'B'), ('X', 'Y', 'Z'))
+
+class ExrError(ValueError):
+    """The OpenEXR file is damaged or truncated"""
+
+def read_header(data):
+    """Attributes needed to walk the file; returns (header dict, offset after the header)"""
+    if data[:4] != MAGIC:
+        raise ExrError("not an OpenEXR file")
+    version = struct.unpack_from("<I", data, 4)[0]
+    if version & 0x1A00:
+        return None, 0  # Tiled, multi-part or deep: only the magic number is checked
+    header = {}
+    position = 8
+    while True:
+        end = data.find(b"\0", position)
+        if end < 0:
+            raise ExrError("header is truncated")
+        name = data[position:end]
+        if not name:
+            if not {'channels', 'compression', 'data_window'} <= header.keys():
+                raise ExrError("header is missing required attributes")
+            return header, end + 1
+        type_end = data.find(b"\0", end + 1)
+        size = struct.unpack_from("<i", data, type_end + 1)[0]
+        value = type_end + 5
+        if value + size > len(data):
+            raise ExrError("header is truncated")
+        if name == b"channels":
+            channels = []
+            cursor = value
+            while data[cursor] != 0:
+                name_end = data.find(b"\0", cursor)
+                # pixel type, pLinear and 3 reserved bytes, x and y sampling
+                pixel_type, x_sampling, y_sampling = struct.unpack_from("<i4xii", data, name_end + 1)
+                channels.append((data[cursor:name_end].decode('utf-8', 'replace'), pixel_type, x_sampling, y_sampling))
+                cursor = name_end + 17
+            header['channels'] = channels
+        elif name == b"compression":
+            header['compression'] = data[value]
+        elif name == b"dataWindow":
+            header['data_window'] = struct.unpack_from("<iiii", data, value)
+        position = value + size
+
+def image_size(header):
+    x_min, y_min, x_max, y_max = header['data_window']
+    return x_max - x_min + 1, y_max - y_min + 1
+
+def chunk_offsets(data, header, position):
+    """The scanline chunk table, checked against the file length"""
+    height = image_size(header)[1]
+    blocks = -(-height // BLOCK_LINES.get(header['compression'], 1))
+    table_end = position + blocks * 8
+    if table_end > len(data):
+        raise ExrError("chunk table is truncated")
+    # Copied out of the map: a NumPy view would keep an mmap from closing if decoding fails
+    offsets = np.frombuffer(data[position:table_end], dtype="<u8")
+    bad = (offsets < table_end) | (offsets + 8 > len(data))
+    if bad.any():
+        raise ExrError(f"{int(bad.sum())} of {blocks} scanline blocks are missing (truncated or unfinished file)")
+    return offsets
+
+def is_decodable(header):
+    """Whether blocks can be decoded here rather than only checked for structure"""
+    return (header['compression'] in DECODED_CODECS
+            and all(c[2] == 1 and c[3] == 1 and c[1] in SAMPLE_BYTES for c in header['channels']))
+
+def check_chunks(data, offsets):
+    """Structural check for files whose blocks are not decoded"""
+    for offset in offsets.tolist():
+        size = struct.unpack_from("<i", data, offset + 4)[0]
+        if size < 0 or offset + 8 + size > len(data):
+            raise ExrError("file is truncated")
+
+def undo_zip(raw, expected):
+    """Reverse the ZIP codec's byte predictor and half-split interleave"""
+    values = np.frombuffer(raw, dtype=np.uint8)
+    if len(values) != expected:
+        raise ExrError("a block decompresses to the wrong size")
+    deltas = values - np.uint8(128)                  # uint8 arithmetic wraps, so this is the predictor mod 256
+    deltas[0] = values[0]
+    predicted = np.cumsum(deltas, dtype=np.uint8)
+    result = np.empty_like(predicted)
+    half = (len(predicted) + 1) // 2
+    result[0::2] = predicted[:half]
+    result[1::2] = predicted[half:]
+    return result
+
+def channel_columns(header):
+    """Byte range of each channel within one decoded scanline: name -> (pixel type, start, end)"""
+    width = image_size(header)[0]
+    columns = {}
+    start = 0
+    for name, pixel_type, _, _ in header['channels']:
+        end = start + width * SAMPLE_BYTES[pixel_type]
+        columns[name] = (pixel_type, start, end)
+        start = end
+    return columns
+
+def iter_blocks(data, header, offsets):
+    """Decode every chunk of a decodable file; yields (first row, (rows, line bytes) uint8 array)"""
+    x_min, y_min, x_max, y_max = header['data_window']
+    width = x_max - x_min + 1
+    compression = header['compression']
+    lines = BLOCK_LINES[compression]
+    line_bytes = sum(width * SAMPLE_BYTES[c[1]] for c in header['channels'])
+    for index, offset in enumerate(offsets.tolist()):
+        y, size = struct.unpack_from("<ii", data, offset)
+        if size < 0 or offset + 8 + size > len(data):
+            raise ExrError("file is truncated")
+        if not y_min <= y <= y_max:
+            raise ExrError(f"block {index} is outside the image")
+        block_lines = min(lines, y_max - y + 1)
+        expected = block_lines * line_bytes
+        payload = data[offset + 8:offset + 8 + size]
+        if size == expected or compression == 0:
+            pixels = np.frombuffer(payload, dtype=np.uint8)  # Stored raw when compressing did not help
+        else:
+            try:
+                pixels = undo_zip(zlib.decompress(payload), expected)
+            except zlib.error as e:
+                raise ExrError(f"block {index} does not decompress: {e}")
+        if len(pixels) != expected:
+            raise ExrError(f"block {index} has the wrong size")
+        yield y - y_min, pixels.reshape(block_lines, line_bytes)
+
+def select_channels(names, layer="", pass_name=""):
+    """Channels of one render layer and pass: a colour triplet or a single channel, or None"""
+    pass_name = pass_name or DEFAULT_PASS
+    groups = {}
+    for name in names:
+        prefix, _, channel = name.rpartition(".")
+        groups.setdefault(prefix, {})[channel] = name
+
+    for prefix, channels in groups.items():
+        if prefix:
+            # Multilayer files name channels "<view layer>.<pass>.<channel>"
+            layer_name, _, pass_part = prefix.rpartition(".")
+            if pass_part != pass_name or (layer and layer_name != layer):
+                continue
+        elif layer or pass_name != DEFAULT_PASS:
+            continue  # Plain R, G, B channels are the combined image
+        for suffixes in COLOUR_SETS:
+            if all(suffix in channels for suffix in suffixes):
+                return [channels[suffix] for suffix in suffixes]
+        if len(channels) == 1:
+            return list(channels.values())
+    return None
+
+def _as_float(samples, pixel_type):
+    return np.ascontiguousarray(samples).view(SAMPLE_TYPES[pixel_type]).astype(np.float32, copy=False)
+
+def read_rgb(path, max_edge, layer="", pass_name=""):
+    """Scene-linear (height, width, 3) float32 pixels of one layer and pass, top row first,
+    box-filtered so the longest edge is at most max_edge; None if Blender has to load the file"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header, position = read_header(data)
+        if header is None or not is_decodable(header):
+            return None
+        names = [c[0] for c in header['channels']]
+        selected = select_channels(names, layer, pass_name)
+        if selected is None and (layer or pass_name):
+            print(f"⚠️ No '{pass_name or DEFAULT_PASS}' pass{f' in layer {layer}' if layer else ''} "
+                  f"in {path} - using the combined image")
+            selected = select_channels(names)
+        if selected is None:
+            return None
+
+        width, height = image_size(header)
+        factor = max(1, -(-max(width, height) // max(1, max_edge)))
+        out_w, out_h = max(1, width // factor), max(1, height // factor)
+        columns = channel_columns(header)
+        planes = np.zeros((len(selected), out_h, out_w), dtype=np.float32)
+        for top, rows in iter_blocks(data, header, chunk_offsets(data, header, position)):
+            # Rows of this block that land in the output, and where each output row starts
+            targets = np.arange(top, top + len(rows)) // factor
+            keep = targets < out_h
+            if not keep.any():
+                continue
+            targets = targets[keep]
+            starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+            for plane, name in zip(planes, selected):
+                pixel_type, start, end = columns[name]
+                values = _as_float(rows[keep, start:end], pixel_type)[:, :out_w * factor]
+                values = values.reshape(len(values), out_w, factor).sum(axis=2)
+                plane[targets[starts]] += np.add.reduceat(values, starts, axis=0)
+    planes /= factor * factor
+    if len(planes) == 1:
+        return np.repeat(planes[0][:, :, None], 3, axis=2)
+    return np.ascontiguousarray(planes.transpose(1, 2, 0))
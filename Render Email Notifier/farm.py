@@ -0,0 +1,507 @@
+import json
+import os
+import re
+import socket
+import sys
+import time
+
+if __name__ == "__main__" and not __package__:
+    # Run as a script outside Blender (PEP 366): load the sibling modules as a package
+    # without running the add-on's __init__, which needs bpy
+    import types
+    __package__ = "render_email_notifier"
+    _package = types.ModuleType(__package__)
+    _package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules[__package__] = _package
+
+from . import routing, transport
+
+# Render farm aggregation. When one animation is split across several Blender
+# instances or machines, each node appends compact JSON lines (start, one per
+# finished frame, done/cancel) to its own file in a shared spool folder, under
+# a job ID. Nodes never write to the same file, so no locking is needed on
+# network shares. The aggregator at the bottom of this file runs outside
+# Blender, reads only the bytes added since its last pass and sends one email
+# for the whole job once every node has finished. It then moves the job folder
+# into the spool's archive, so rendering the same file again under the same
+# job ID starts a new job instead of mixing with the events already reported.
+#
+#   python farm.py --spool /mnt/farm/notify --job shot010 --to lead@example.com
+EVENTS_SUFFIX = ".events"
+REPORT_NAME = "report.json"   # Written by the aggregator that sent the job email
+ARCHIVE_DIR = ".reported"     # Spool subfolder reported jobs are moved to; safe_name() never yields it
+POLL_INTERVAL = 30.0          # Seconds between aggregator passes
+SETTLE_TIME = 60.0            # Quiet time after the last node finished, so late starters can still join
+STALL_TIMEOUT = 900.0         # A rendering node silent for this long is reported as stalled
+STRAGGLER_FACTOR = 1.5        # Nodes whose mean frame time exceeds the median by this factor are stragglers
+MAX_NODE_LINES = 200          # Per-node rows in the email, slowest first
+MAX_RANGES = 20               # Missing frame ranges listed before summarizing
+ENV_PREFIX = "RENDER_NOTIFIER_"  # Same variables the add-on reads in background mode
+
+def safe_name(text):
+    """Job or node name usable as a file name on any share"""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', text).strip('._') or "job"
+
+def job_id_for(blend_path, job_id=""):
+    """The job ID setting, or the blend file name so every node rendering the same file agrees"""
+    if job_id.strip():
+        return safe_name(job_id.strip())
+    return safe_name(os.path.splitext(os.path.basename(blend_path))[0] or "untitled")
+
+def node_id():
+    return safe_name(f"{socket.gethostname()}-{os.getpid()}")
+
+def event_line(event, **fields):
+    """One compact JSON line of a node event file"""
+    record = {'e': event, 't': round(time.time(), 3)}
+    record.update(fields)
+    return json.dumps(record, separators=(',', ':')).encode('utf-8') + b"\n"
+
+def append_event(path, event, **fields):
+    """Add an event to a node file from another process, e.g. the crash watchdog"""
+    with open(path, 'ab') as f:
+        f.write(event_line(event, **fields))
+        f.flush()
+        os.fsync(f.fileno())
+
+class NodeLog:
+    """Append-only event file of one Blender instance for one job"""
+
+    def __init__(self, spool_dir, job_id, node=None):
+        self.node = node or node_id()
+        self.job_dir = os.path.join(spool_dir, safe_name(job_id))
+        os.makedirs(self.job_dir, exist_ok=True)
+        self.path = os.path.join(self.job_dir, self.node + EVENTS_SUFFIX)
+        self._file = open(self.path, 'ab')
+
+    def write(self, event, **fields):
+        self._file.write(event_line(event, **fields))
+        self._file.flush()
+        # NFS clients only publish data to other hosts once it has been flushed to the server
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+_log = None  # NodeLog of the render in progress, None when farm mode is off
+
+def _write(event, **fields):
+    try:
+        _log.write(event, **fields)
+    except Exception as e:
+        print(f"⚠️ Failed to write farm event to {_log.path}: {e}")
+
+def start(spool_dir, job_id, blend_file, frame_range):
+    """Open this node's event file and record the frame range it was given"""
+    global _log
+
+    close()
+    try:
+        _log = NodeLog(spool_dir, job_id)
+    except Exception as e:
+        print(f"⚠️ Cannot write to farm spool {spool_dir}: {e}")
+        return
+    _write('start', host=socket.gethostname(), pid=os.getpid(), blend=blend_file, range=list(frame_range))
+    print(f"🚜 Reporting frames of farm job '{job_id}' to {_log.path}")
+
+def frame_done(frame, seconds):
+    if _log is not None:
+        _write('frame', f=frame, s=round(seconds, 3) if seconds is not None else None)
+
+def finish(cancelled=False):
+    """Record the end of this node's share of the job"""
+    if _log is None:
+        return
+    _write('cancel' if cancelled else 'done')
+    close()
+
+def is_active():
+    return _log is not None
+
+def events_path():
+    """Event file of the render in progress, or None"""
+    return _log.path if _log is not None else None
+
+def close():
+    global _log
+
+    if _log is not None:
+        try:
+            _log.close()
+        except Exception:
+            pass
+        _log = None
+
+def parse_frames(text):
+    """Frame numbers from a list such as '1-100,150-200'"""
+    frames = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        frames.update(range(int(start), int(end or start) + 1))
+    return frames
+
+def format_ranges(frames, limit=MAX_RANGES):
+    """Sorted frames as compact ranges: '1-10, 15, 20-22'"""
+    ranges = []
+    for frame in sorted(frames):
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+    text = ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges[:limit])
+    if len(ranges) > limit:
+        text += f" (+{len(ranges) - limit} more ranges)"
+    return text
+
+def format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    return time.strftime('%H:%M:%S', time.gmtime(seconds))
+
+class NodeState:
+    """What the aggregator has read so far from one node's event file"""
+
+    def __init__(self, name):
+        self.name = name
+        self.host = name
+        self.offset = 0         # Bytes of the event file already merged
+        self.started = None
+        self.last_event = None
+        self.frames = 0         # Frames rendered, re-renders included
+        self.busy = 0.0         # Seconds spent in frames that reported a duration
+        self.timed = 0          # Frames that reported a duration
+        self.state = 'rendering'
+        self.ranges = []        # Frame ranges given to the node, one per render it started
+
+    def apply(self, record, frames_done):
+        event = record.get('e')
+        self.last_event = record.get('t', self.last_event)
+        if event == 'frame':
+            self.frames += 1
+            frames_done.add(record['f'])
+            if record.get('s') is not None:
+                self.busy += record['s']
+                self.timed += 1
+        elif event == 'start':
+            if self.started is None:
+                self.started = record.get('t')
+            self.host = record.get('host', self.host)
+            self.state = 'rendering'
+            if record.get('range'):
+                self.ranges.append(record['range'])
+        elif event in ('done', 'cancel'):
+            self.state = event
+
+    @property
+    def mean_frame_time(self):
+        return self.busy / self.timed if self.timed else None
+
+    @property
+    def throughput(self):
+        """Frames per hour over the node's wall time"""
+        if not self.frames or self.started is None or not self.last_event:
+            return 0.0
+        wall = self.last_event - self.started
+        if wall <= 0:
+            return 0.0
+        return self.frames * 3600.0 / wall
+
+class JobAggregator:
+    """Merges the node event files of one job incrementally"""
+
+    def __init__(self, spool_dir, job_id, expected_frames=None, expected_nodes=0,
+                 settle=SETTLE_TIME, stall_timeout=STALL_TIMEOUT):
+        self.job_id = safe_name(job_id)
+        self.job_dir = os.path.join(spool_dir, self.job_id)
+        self.expected_frames = expected_frames  # Set of frame numbers, or None to use the nodes' ranges
+        self.expected_nodes = expected_nodes
+        self.settle = settle
+        self.stall_timeout = stall_timeout
+        self.nodes = {}             # Node name -> NodeState
+        self.frames_done = set()
+        self.last_change = None     # time.time() when new events last arrived
+
+    def _read(self, node, path):
+        """Merge the complete lines appended since the last pass; returns the number of events"""
+        with open(path, 'rb') as f:
+            f.seek(node.offset)
+            data = f.read()
+        # A line still being written over NFS has no newline yet; it is picked up next pass
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return 0
+        count = 0
+        for line in data[:end].splitlines():
+            try:
+                node.apply(json.loads(line), self.frames_done)
+                count += 1
+            except (ValueError, KeyError) as e:
+                print(f"⚠️ Skipping bad event in {path}: {e}")
+        node.offset += end
+        return count
+
+    def poll(self):
+        """Read new events from every node file; returns how many were merged"""
+        if not os.path.isdir(self.job_dir):
+            return 0
+        count = 0
+        try:
+            with os.scandir(self.job_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(EVENTS_SUFFIX):
+                        continue
+                    name = entry.name[:-len(EVENTS_SUFFIX)]
+                    node = self.nodes.get(name)
+                    if node is None:
+                        node = self.nodes[name] = NodeState(name)
+                    if entry.stat().st_size <= node.offset:
+                        continue
+                    count += self._read(node, entry.path)
+        except FileNotFoundError:
+            pass  # Another aggregator reported the job and archived its folder
+        if count:
+            self.last_change = time.time()
+        return count
+
+    def expected(self):
+        """Frames the job should produce: the --frames option, else every range a node was given"""
+        if self.expected_frames is not None:
+            return self.expected_frames
+        frames = set()
+        for node in self.nodes.values():
+            for start, end, step in node.ranges:
+                frames.update(range(start, end + 1, max(1, step)))
+        return frames
+
+    def missing(self):
+        return self.expected() - self.frames_done
+
+    def stalled(self, now):
+        return [node for node in self.nodes.values()
+                if node.state == 'rendering' and node.last_event and now - node.last_event > self.stall_timeout]
+
+    def is_finished(self, now):
+        """Every expected frame is in, or every node that joined is done or cancelled, and the spool is quiet"""
+        if not self.nodes or len(self.nodes) < self.expected_nodes:
+            return False
+        if self.last_change is not None and now - self.last_change < self.settle:
+            return False
+        expected = self.expected()
+        if expected and not (expected - self.frames_done):
+            return True
+        return all(node.state != 'rendering' for node in self.nodes.values())
+
+    def stragglers(self, now):
+        """(node, reason) for stalled nodes and nodes much slower than the median"""
+        found = [(node, f"silent for {format_duration(now - node.last_event)}") for node in self.stalled(now)]
+        means = [node.mean_frame_time for node in self.nodes.values() if node.mean_frame_time is not None]
+        if len(means) >= 3:
+            import statistics
+            median = statistics.median(means)
+            for node in self.nodes.values():
+                mean = node.mean_frame_time
+                if mean is not None and mean > median * STRAGGLER_FACTOR:
+                    found.append((node, f"mean {format_duration(mean)} per frame vs {format_duration(median)} median"))
+        return found
+
+    def status_line(self):
+        expected = self.expected()
+        total = f"/{len(expected)}" if expected else ""
+        finished = sum(1 for node in self.nodes.values() if node.state != 'rendering')
+        return (f"{self.job_id}: {len(self.frames_done)}{total} frames, "
+                f"{finished}/{len(self.nodes)} nodes finished")
+
+    def report(self, now=None):
+        """(subject, body) of the job email"""
+        now = time.time() if now is None else now
+        nodes = list(self.nodes.values())
+        expected = self.expected()
+        missing = expected - self.frames_done
+        cancelled = [node for node in nodes if node.state == 'cancel']
+        finished = sum(1 for node in nodes if node.state == 'done')
+
+        complete = not missing and not cancelled
+        title = "Render Farm Job Complete" if complete else "Render Farm Job Incomplete"
+        frames = f"{len(self.frames_done)}/{len(expected)}" if expected else str(len(self.frames_done))
+        subject = f"{'🏁' if complete else '⚠️'} {title}: {self.job_id} ({frames} frames, {len(nodes)} nodes)"
+
+        lines = [f"{'🏁' if complete else '⚠️'} {title}: {self.job_id}"]
+        if expected:
+            lines.append(f"- Frames: {len(self.frames_done)} of {len(expected)} "
+                         f"({100.0 * len(self.frames_done) / len(expected):.1f}%)")
+        else:
+            lines.append(f"- Frames: {len(self.frames_done)}")
+        if missing:
+            lines.append(f"- Missing Frames: {format_ranges(missing)}")
+        lines.append(f"- Nodes: {len(nodes)} ({finished} finished, {len(cancelled)} cancelled, "
+                     f"{len(nodes) - finished - len(cancelled)} still rendering)")
+
+        starts = [node.started for node in nodes if node.started is not None]
+        ends = [node.last_event for node in nodes if node.last_event]
+        if starts and ends:
+            wall = max(ends) - min(starts)
+            lines.append(f"- Wall Time: {format_duration(wall)}")
+            if wall > 0:
+                lines.append(f"- Farm Throughput: {sum(node.frames for node in nodes) * 3600.0 / wall:.1f} frames/h")
+        busy = sum(node.busy for node in nodes)
+        timed = sum(node.timed for node in nodes)
+        if timed:
+            lines.append(f"- Frame Time: mean {format_duration(busy / timed)} over {timed} frames")
+
+        stragglers = self.stragglers(now)
+        if stragglers:
+            lines.append("- Stragglers: " + "; ".join(f"{node.host} ({reason})" for node, reason in stragglers))
+        if cancelled:
+            lines.append("- Cancelled On: " + ", ".join(node.host for node in cancelled))
+
+        lines.append("")
+        lines.append("Per-node throughput (slowest first):")
+        nodes.sort(key=lambda node: node.throughput)
+        for node in nodes[:MAX_NODE_LINES]:
+            mean = node.mean_frame_time
+            lines.append(f"- {node.name}: {node.frames} frames, {node.throughput:.1f} frames/h"
+                         + (f", mean {format_duration(mean)}" if mean is not None else "")
+                         + f", {node.state}")
+        if len(nodes) > MAX_NODE_LINES:
+            lines.append(f"- ... and {len(nodes) - MAX_NODE_LINES} more nodes")
+        return subject, "\n".join(lines) + "\n"
+
+    def claim_report(self):
+        """Create the report marker; False if another aggregator already sent (or is sending) this job"""
+        try:
+            fd = os.open(os.path.join(self.job_dir, REPORT_NAME), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except (FileExistsError, FileNotFoundError):
+            return False  # FileNotFoundError: already reported and archived
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'host': socket.gethostname(), 'claimed': time.time(),
+                       'frames': len(self.frames_done), 'nodes': len(self.nodes)}, f)
+        return True
+
+    def release_report(self):
+        try:
+            os.remove(os.path.join(self.job_dir, REPORT_NAME))
+        except FileNotFoundError:
+            pass
+
+    def archive(self):
+        """Move the reported job folder aside so the next render under this job ID starts a fresh job"""
+        archive_dir = os.path.join(os.path.dirname(self.job_dir), ARCHIVE_DIR)
+        base = os.path.join(archive_dir, f"{self.job_id}-{time.strftime('%Y%m%d-%H%M%S')}")
+        target, count = base, 1
+        while os.path.exists(target):
+            count += 1
+            target = f"{base}-{count}"
+        try:
+            os.makedirs(archive_dir, exist_ok=True)
+            os.rename(self.job_dir, target)
+        except OSError as e:
+            print(f"⚠️ Could not archive the reported job to {target}: {e}")
+            return None
+        print(f"📦 Archived the reported job to {target}")
+        return target
+
+def send_report(subject, body, sender, password, addresses, server):
+    """Email a plain text report over SMTP outside Blender; returns True if every recipient got it"""
+    recipients, invalid = routing.normalize_recipients(addresses)
+    if invalid:
+        print(f"⚠️ Skipping invalid recipient(s): {', '.join(invalid)}")
+    if not recipients:
+        print("⚠️ No recipient email")
+        return False
+
+    from email.message import EmailMessage
+    msg = EmailMessage()
+    msg['Subject'] = subject
+    msg['From'] = sender
+    for header, value in routing.address_headers(recipients).items():
+        msg[header] = value
+    msg.set_content(body)
+
+    try:
+        result = routing.fan_out(transport.smtp_pool, server, sender, password, msg, recipients)
+    finally:
+        transport.smtp_pool.close_all()
+    if not result.ok:
+        print(f"⚠️ Failed for {', '.join(result.failed)}: {result.first_error()}")
+        return False
+    print(f"📤 Report sent to {len(recipients)} recipient(s)")
+    return True
+
+def _parse_args(argv):
+    import argparse
+    env = os.environ.get
+    parser = argparse.ArgumentParser(
+        prog="farm.py",
+        description="Merge the frame events of a render farm job and send one email when it finishes.")
+    parser.add_argument("--spool", default=env(ENV_PREFIX + "FARM_SPOOL"), help="shared spool folder the nodes write to")
+    parser.add_argument("--job", default=env(ENV_PREFIX + "JOB_ID"), help="job ID the nodes were given")
+    parser.add_argument("--frames", type=parse_frames, help="frames the job must produce, e.g. 1-240 "
+                        "(default: every range a node was given)")
+    parser.add_argument("--nodes", type=int, default=0, help="wait until at least this many nodes have joined")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between passes")
+    parser.add_argument("--settle", type=float, default=SETTLE_TIME, help="quiet seconds required before sending")
+    parser.add_argument("--stall", type=float, default=STALL_TIMEOUT, help="seconds of silence before a node is stalled")
+    parser.add_argument("--timeout", type=float, default=0.0, help="send whatever arrived after this many seconds (0 = wait)")
+    parser.add_argument("--once", action="store_true", help="make one pass, print the status and exit (2 = not finished)")
+    parser.add_argument("--dry-run", action="store_true", help="print the email instead of sending it")
+    parser.add_argument("--to", action="append", default=[], help="recipient, repeat or separate with commas")
+    parser.add_argument("--sender", default=env(ENV_PREFIX + "SENDER"))
+    parser.add_argument("--password", default=env(ENV_PREFIX + "PASSWORD"))
+    parser.add_argument("--smtp-host", default=env(ENV_PREFIX + "SMTP_HOST") or transport.GMAIL_SERVER.host)
+    parser.add_argument("--smtp-port", type=int, default=int(env(ENV_PREFIX + "SMTP_PORT") or 0))
+    parser.add_argument("--smtp-security", choices=transport.SECURITY_MODES, type=str.upper,
+                        default=(env(ENV_PREFIX + "SMTP_SECURITY") or transport.GMAIL_SERVER.security).upper())
+    parser.add_argument("--max-recipients", type=int, default=transport.DEFAULT_MAX_RECIPIENTS)
+    options = parser.parse_args(argv)
+
+    if not options.spool or not options.job:
+        parser.error("--spool and --job are required (or set RENDER_NOTIFIER_FARM_SPOOL and RENDER_NOTIFIER_JOB_ID)")
+    options.to = [address.strip() for item in (options.to or [env(ENV_PREFIX + "TO", "")])
+                  for address in item.split(",") if address.strip()]
+    if not options.dry_run and not (options.sender and options.to):
+        parser.error("--sender and --to are required unless --dry-run is given")
+    return options
+
+def main(argv=None):
+    options = _parse_args(sys.argv[1:] if argv is None else argv)
+    aggregator = JobAggregator(options.spool, options.job, options.frames, options.nodes,
+                               settle=0.0 if options.once else options.settle, stall_timeout=options.stall)
+    if os.path.exists(os.path.join(aggregator.job_dir, REPORT_NAME)):
+        # Reported jobs are archived; this one could not be, so a new render would be mixed into it
+        print(f"✅ Job '{aggregator.job_id}' was already reported; move {aggregator.job_dir} aside to report a new render")
+        return 0
+
+    started = time.time()
+    while True:
+        aggregator.poll()
+        now = time.time()
+        print(f"🔎 {aggregator.status_line()}")
+        if aggregator.is_finished(now):
+            break
+        if options.once:
+            return 2
+        if options.timeout and now - started >= options.timeout:
+            print("⏰ Timed out waiting for the farm; reporting what arrived")
+            break
+        time.sleep(options.interval)
+
+    subject, body = aggregator.report()
+    if options.dry_run:
+        print(f"Subject: {subject}\n\n{body}")
+        return 0
+    if not aggregator.claim_report():
+        print(f"✅ Job '{aggregator.job_id}' is being reported by another aggregator")
+        return 0
+    server = transport.SMTPServer(options.smtp_host, options.smtp_port or transport.DEFAULT_PORTS[options.smtp_security],
+                                  options.smtp_security, max(1, options.max_recipients))
+    if not send_report(subject, body, options.sender, options.password, options.to, server):
+        aggregator.release_report()  # Let the next run try again
+        return 1
+    aggregator.archive()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import bpy
+import os
+import sys
+import time
+from types import SimpleNamespace
+from . import contact_sheet, preview
+
+# Headless (blender -b) support. Email settings can come from command-line
+# arguments after "--" or from environment variables, layered over the scene
+# properties, and every render in one batch invocation is collected into a
+# single digest that is sent when Blender exits.
+#
+#   RENDER_NOTIFIER_PASSWORD=... blender -b shot.blend -a -- --notify-to lead@example.com
+ENV_PREFIX = "RENDER_NOTIFIER_"
+OVERRIDES = {
+    # Setting: (command-line flag, environment variable)
+    'sender': ("--notify-sender", ENV_PREFIX + "SENDER"),
+    'password': ("--notify-password", ENV_PREFIX + "PASSWORD"),
+    'recipients': ("--notify-to", ENV_PREFIX + "TO"),
+    'smtp_host': ("--notify-smtp-host", ENV_PREFIX + "SMTP_HOST"),
+    'smtp_port': ("--notify-smtp-port", ENV_PREFIX + "SMTP_PORT"),
+    'smtp_security': ("--notify-smtp-security", ENV_PREFIX + "SMTP_SECURITY"),
+    'farm_spool_dir': ("--notify-farm-spool", ENV_PREFIX + "FARM_SPOOL"),
+    'farm_job_id': ("--notify-job-id", ENV_PREFIX + "JOB_ID"),
+    'watchdog_enabled': ("--notify-watchdog", ENV_PREFIX + "WATCHDOG"),
+    'verify_frames': ("--notify-verify", ENV_PREFIX + "VERIFY"),
+    'preview_layer': ("--notify-preview-layer", ENV_PREFIX + "PREVIEW_LAYER"),
+    'preview_pass': ("--notify-preview-pass", ENV_PREFIX + "PREVIEW_PASS"),
+}
+SWITCHES = {'watchdog_enabled', 'verify_frames'}   # On/off settings: 1, true, yes or on enable them
+MAX_DIGEST_PREVIEWS = 24
+
+_overrides = None   # Parsed once per session
+_jobs = []          # Finished renders waiting for the batch digest
+
+def is_headless():
+    return bpy.app.background
+
+def _parse_args(argv):
+    """Notifier options from the arguments Blender leaves to scripts (after '--')"""
+    if "--" not in argv:
+        return {}
+    import argparse
+    parser = argparse.ArgumentParser(add_help=False)
+    for name, (flag, _) in OVERRIDES.items():
+        parser.add_argument(flag, dest=name, action='append' if name == 'recipients' else 'store')
+    known, _ = parser.parse_known_args(argv[argv.index("--") + 1:])
+    return {name: value for name, value in vars(known).items() if value is not None}
+
+def load_overrides(argv=None, environ=None):
+    """Collect overrides; command-line arguments win over environment variables"""
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+
+    values = {name: environ[env] for name, (_, env) in OVERRIDES.items() if environ.get(env)}
+    values.update(_parse_args(argv))
+
+    overrides = {}
+    for name, value in values.items():
+        if name == 'recipients':
+            items = value if isinstance(value, list) else [value]
+            addresses = [a.strip() for item in items for a in item.split(",") if a.strip()]
+            overrides['recipients'] = [SimpleNamespace(name=address) for address in addresses]
+            overrides['send_myself'] = False
+        elif name == 'smtp_port':
+            overrides[name] = int(value)
+        elif name == 'smtp_security':
+            overrides[name] = value.upper()
+        elif name in SWITCHES:
+            overrides[name] = value.strip().lower() in ('1', 'true', 'yes', 'on')
+        elif name == 'farm_spool_dir':
+            overrides[name] = value
+            overrides['farm_enabled'] = True
+        else:
+            overrides[name] = value
+    return overrides
+
+class SettingsView:
+    """Scene notifier settings with command-line/environment overrides on top"""
+
+    def __init__(self, settings, overrides):
+        self._settings = settings
+        self._overrides = overrides
+
+    def __getattr__(self, name):
+        if name in self._overrides:
+            return self._overrides[name]
+        return getattr(self._settings, name)
+
+def get_settings(scene):
+    """The notifier settings to use for a scene"""
+    global _overrides
+
+    if _overrides is None:
+        try:
+            _overrides = load_overrides()
+        except Exception as e:
+            print(f"⚠️ Ignoring invalid notifier overrides: {e}")
+            _overrides = {}
+        if _overrides:
+            print(f"🛠️ Using notifier overrides for: {', '.join(sorted(_overrides))}")
+
+    settings = scene.render_mailbot
+    return SettingsView(settings, _overrides) if _overrides else settings
+
+def written_frame_path(scene, frame=None):
+    """Absolute path of an output frame on disk, or None for movies and missing files"""
+    render = scene.render
+    if render.is_movie_format:
+        return None
+    path = bpy.path.abspath(render.frame_path(frame=scene.frame_current if frame is None else frame))
+    return path if os.path.exists(path) else None
+
+def add_job(subject, body, preview_image, failed=False, charts=(), delivery=None):
+    """Keep a finished render for the batch digest; delivery is the DeliverySettings of its scene"""
+    blend_file = os.path.basename(bpy.data.filepath) or "untitled.blend"
+    _jobs.append(SimpleNamespace(blend_file=blend_file, subject=subject, body=body, preview=preview_image,
+                                 charts=list(charts), failed=failed, finished=time.time(), delivery=delivery))
+    print(f"📦 Batch job recorded: {blend_file} ({'failed' if failed else 'ok'})")
+
+def _digest_preview(jobs, settings):
+    """One mosaic of the job previews, labelled with the job numbers used in the body"""
+    with_preview = [(number, job.preview) for number, job in enumerate(jobs, start=1) if job.preview is not None]
+    with_preview = with_preview[:MAX_DIGEST_PREVIEWS]
+    if not with_preview:
+        return None
+    if len(with_preview) == 1:
+        return with_preview[0][1]
+
+    width, height = with_preview[0][1].size
+    sheet = contact_sheet.ContactSheet([number for number, _ in with_preview], contact_sheet.DEFAULT_COLUMNS,
+                                       settings.preview_max_size, height / max(1, width))
+    for number, job_preview in with_preview:
+        sheet.add(number, job_preview.pixels)
+    return preview.make_preview(sheet.canvas, settings)
+
+def flush(send, settings):
+    """Send the batch digest through send(subject, body, preview, charts=..., resolved=...) and forget the jobs
+
+    Renders of scenes with different delivery settings get one digest per set of settings.
+    """
+    global _jobs
+
+    jobs, _jobs = _jobs, []
+    groups = []  # [delivery, jobs]; settings may hold unhashable channel configs, so compare instead of hashing
+    for job in jobs:
+        for group in groups:
+            if group[0] == job.delivery:
+                group[1].append(job)
+                break
+        else:
+            groups.append([job.delivery, [job]])
+    for delivery, group in groups:
+        _send_digest(send, settings, group, delivery)
+
+def _send_digest(send, settings, jobs, delivery):
+    if len(jobs) == 1:
+        send(jobs[0].subject, jobs[0].body, jobs[0].preview, charts=jobs[0].charts, resolved=delivery)
+        return
+
+    failed = sum(1 for job in jobs if job.failed)
+    subject = f"📦 Blender Batch Complete: {len(jobs) - failed}/{len(jobs)} renders succeeded"
+    sections = [f"#{number} {job.blend_file} - {job.subject}\n{job.body}"
+                for number, job in enumerate(jobs, start=1)]
+    body = f"{subject}\n\n" + "\n".join(sections)
+    print(f"📦 Sending batch digest for {len(jobs)} renders")
+    # Each job's resource figures stay in its section; one chart per job would swamp the digest
+    send(subject, body, _digest_preview(jobs, settings), resolved=delivery)
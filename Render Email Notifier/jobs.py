@@ -0,0 +1,89 @@
+import itertools
+import time
+
+# One record per render, created in render_init. Handlers find the job of
+# their scene with two dict lookups, and the delayed completion timer is
+# handed its job's key, so a render that starts while the previous
+# notification is still pending, or renders of several scenes, never share
+# a start time or a sent flag.
+RENDERING, COMPLETED, NOTIFIED = range(3)
+
+class RenderJob:
+    """State of one render, from render_init until its notification is sent"""
+
+    __slots__ = ('scene_name', 'render_id', 'started', 'finished', 'is_animation', 'frames_written',
+                 'render_info', 'delivery', 'last_frame', 'state', 'body', 'sheet', 'charts', 'frame_paths',
+                 'verification', 'timer')
+
+    def __init__(self, scene_name, render_id, is_animation):
+        self.scene_name = scene_name
+        self.render_id = render_id
+        self.started = time.time()
+        self.finished = None
+        self.is_animation = is_animation
+        self.frames_written = 0    # Output files saved; only animations write them
+        self.render_info = None    # Render settings read when the render started
+        self.delivery = None       # snapshot.DeliverySettings of its scene when the render started
+        self.last_frame = None     # Scene frame when the render completed
+        self.state = RENDERING
+        self.body = None           # Notification text, fixed when the render completes
+        self.sheet = None          # Finished contact sheet, if any
+        self.charts = []           # (filename, PNG bytes) shown inline
+        self.frame_paths = None    # (frame, path) pairs to verify, if verification is on
+        self.verification = None   # Future of the output check running in the background
+        self.timer = None          # Pending completion timer callable, so it can be unregistered
+
+    @property
+    def key(self):
+        return self.scene_name, self.render_id
+
+    @property
+    def duration(self):
+        return (self.finished or time.time()) - self.started
+
+_jobs = {}                  # (scene name, render id) -> RenderJob, until notified or dropped
+_active = {}                # Scene name -> render id of the render in progress
+_render_ids = itertools.count(1)
+_latest_id = 0              # Most recent render started; its frame is what the Render Result shows
+
+def begin(scene, is_animation):
+    """Create the job for a render that is starting; an unfinished earlier render of the scene is dropped"""
+    global _latest_id
+    previous = _active.get(scene.name)
+    if previous is not None:
+        _jobs.pop((scene.name, previous), None)
+    job = RenderJob(scene.name, next(_render_ids), is_animation)
+    _latest_id = job.render_id
+    _jobs[job.key] = job
+    _active[scene.name] = job.render_id
+    return job
+
+def active(scene):
+    """The job of the render in progress for a scene, or None"""
+    render_id = _active.get(scene.name)
+    return None if render_id is None else _jobs.get((scene.name, render_id))
+
+def get(key):
+    return _jobs.get(key)
+
+def is_latest(job):
+    """Whether no other render has started since this one, so the Render Result is still its image"""
+    return job.render_id == _latest_id
+
+def complete(job):
+    """The render finished: stamp the end time and free the scene for its next render"""
+    job.finished = time.time()
+    job.state = COMPLETED
+    if _active.get(job.scene_name) == job.render_id:
+        del _active[job.scene_name]
+
+def close(job):
+    """The notification was handed off (or the render was cancelled): forget the job"""
+    job.state = NOTIFIED
+    _jobs.pop(job.key, None)
+    if _active.get(job.scene_name) == job.render_id:
+        del _active[job.scene_name]
+
+def pending():
+    """Jobs in the table, oldest first"""
+    return list(_jobs.values())
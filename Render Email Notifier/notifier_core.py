@@ -1,20 +1,34 @@
 import bpy
-import smtplib
-import time
-from email.message import EmailMessage
+import functools
 import os
+import socket
+import time
+from collections import namedtuple
 from bpy.app.handlers import persistent
+from . import channels, contact_sheet, delivery, farm, headless, jobs, outbox, preview, progress, routing, snapshot, telemetry, tracing, transport, watchdog
 
-# Global variables to track render state
-_render_start_time = None  # Stores when rendering began
-_email_sent = False        # Flag to prevent duplicate emails
-_render_in_progress = False # Track if we're currently rendering
-_is_animation = False      # Flag for animation render
+# Per-render state lives in jobs.RenderJob records. Registering the add-on
+# only loads modules that are cheap to import: the email package and smtplib
+# are imported by the first send, and NumPy with the modules built on it
+# (resource charts, frame verification, previews and encoders) when a render
+# first needs them.
+_last_notification = None  # (subject, body, preview, charts) of the last completion email, for resending
+
+BATCH_SEND_TIMEOUT = 120.0  # Seconds to wait for the batch digest before Blender exits
+VERIFY_POLL_INTERVAL = 0.25  # Seconds between checks whether the output frame check has finished
 
 def check_online_access():
     """Check if 'Allow Online Access' is enabled in Preferences"""
     try:
-        if not bpy.context.preferences.system.use_online_access:
+        # bpy.app.online_access also honours --offline-mode/--online-mode (Blender 4.2+)
+        online = getattr(bpy.app, 'online_access', None)
+        if online is None:
+            online = bpy.context.preferences.system.use_online_access
+        if not online:
+            if bpy.app.background:
+                print("❗ 'Allow Online Access' is disabled. Run Blender with --online-mode to send notifications.")
+                return False
+
             def show_warning(self, context):
                 self.layout.label(text="❗ 'Allow Online Access' is disabled.", icon='ERROR')
                 self.layout.label(text="Please enable it in Preferences > System > Network.")
@@ -25,269 +39,514 @@ def check_online_access():
     except:
         return False
 
-def get_email_info(scene):
-    """Retrieve email configuration from scene properties"""
-    sender = scene.render_mailbot.sender
-    password = scene.render_mailbot.password
-    
-    # Determine recipients - either sender or recipient list
-    if scene.render_mailbot.send_myself:
-        recipients = [sender]
-    else:
-        recipients = [recipient.name for recipient in scene.render_mailbot.recipients if recipient.name.strip()]
-        if not recipients: 
-            raise ValueError("Error: No recipients found. Please add at least one recipient or enable 'Send to myself' option.")
-            
-    return sender, password, recipients
+def sync_tracing(scene):
+    """Follow the Stage Timings setting; spans on worker threads only read the module flag"""
+    tracing.set_enabled(headless.get_settings(scene).stage_timings)
 
-def send_email(subject, body, attachment=None):
-    """Send email with render results"""
-    print("📧 Attempting to send email...")
+def get_email_info(scene):
+    """Retrieve email configuration from the scene's resolved settings (plus any command-line/environment overrides)"""
+    # Recipients were normalized and deduplicated when the settings were resolved; delivery only splits them into envelopes
+    resolved = snapshot.resolve(scene)
+    if resolved.error:
+        raise ValueError(resolved.error)
+    return resolved.sender, resolved.password, list(resolved.recipients)
 
-    # Check if Allow online access is enabled in Preference
-    if not check_online_access():
-        return False, "Online access is disabled."
+def build_email(subject, body, charts=(), resolved=None):
+    """Build the complete email on the main thread; returns (message, sender, password, server) or an error string
 
+    charts are (filename, PNG bytes) pairs shown inline below the text. resolved is the
+    snapshot.DeliverySettings to send with, those of the active scene when not given.
+    """
     try:
-        sender, password, recipients = get_email_info(bpy.context.scene)
+        resolved = resolved or snapshot.resolve(bpy.context.scene)
+        if resolved.error:
+            raise ValueError(resolved.error)
+        sender, password, recipients = resolved.sender, resolved.password, list(resolved.recipients)
         print(f"📧 Sender: {sender}, Recipients: {recipients}")
     except Exception as e:
         error_msg = f"Failed to get email info: {str(e)}"
         print(f"⚠️ {error_msg}")
-        return False, error_msg
+        return None, error_msg
     
     # Validate sender email
     if not sender or '@' not in sender:
         error_msg = "Invalid sender email"
         print(f"⚠️ {error_msg}")
-        return False, error_msg
+        return None, error_msg
         
     if not recipients:
         error_msg = "No recipient email"
         print(f"⚠️ {error_msg}")
-        return False, error_msg
+        return None, error_msg
 
     # Prepare email message
-    msg = EmailMessage()
-    msg['Subject'] = subject
-    msg['From'] = sender
-    msg['To'] = ", ".join(recipients)
-    msg.set_content(body)
-
-    # Add attachment if provided and exists
-    if attachment and os.path.exists(attachment):
-        try:
-            print(f"📎 Attaching file: {attachment}")
-            with open(attachment, 'rb') as f:
-                msg.add_attachment(f.read(), maintype='image', subtype='jpeg', filename='render_preview.jpg')
-        except Exception as e:
-            print(f"⚠️ Failed to attach file: {e}")
-    else:
-        print("📄 No attachment or file doesn't exist")
+    from email.message import EmailMessage
+    with tracing.span("email.build", recipients=len(recipients)):
+        msg = EmailMessage()
+        msg['Subject'] = subject
+        msg['From'] = sender
+        # Several recipients go in Bcc so nobody sees the other addresses
+        for header, value in routing.address_headers(recipients).items():
+            msg[header] = value
+        msg.set_content(body)
+        for filename, data in charts:
+            msg.add_attachment(data, maintype='image', subtype='png', filename=filename, disposition='inline')
+
+    return (msg, sender, password, resolved.server), None
 
-    # Send email via SMTP
+def attach_preview(msg, preview_image):
+    """Encode the render preview and attach it; runs on the delivery worker"""
     try:
-        print("🔌 Connecting to SMTP server...")
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            try:
-                print("🔑 Attempting login...")
-                smtp.login(sender, password)
-                print("✅ Login successful")
-            except smtplib.SMTPAuthenticationError as e:
-                error_msg = f"Authentication failed: {str(e)}"
-                print(f"⚠️ {error_msg}")
-                return False, "Authentication failed. Check your email and app password."
-        
-            try:
-                print("📤 Sending message...")
-                smtp.send_message(msg)
-                success_msg = "📤 Email sent successfully!"
-                print(success_msg)
-                
-                # Clean up the preview image in save folder after sending
-                if attachment and os.path.exists(attachment):
-                    try:
-                        os.remove(attachment)
-                        print(f"🗑️ Cleaned up temporary file: {attachment}")
-                    except Exception as e:
-                        print(f"⚠️ Failed to delete temporary file: {e}")
-                        
-                return True, success_msg
-            except Exception as e:
-                error_msg = f"Failed to send message: {str(e)}"
-                print(f"⚠️ {error_msg}")
-                return False, error_msg
-    except ConnectionError as e:
-        error_msg = f"Connection error: {str(e)}"
-        print(f"⚠️ {error_msg}")
-        return False, "Connection error. Please check your internet connection."
+        with tracing.span("email.attach") as span:
+            data, subtype, filename = preview_image.encode()
+            msg.add_attachment(data, maintype='image', subtype=subtype, filename=filename)
+            span.set(bytes=len(data), subtype=subtype)
+        print(f"📎 Attached {filename} ({len(data)} bytes)")
     except Exception as e:
-        error_msg = f"Failed to send email: {str(e)}"
-        print(f"⚠️ {error_msg}")
-        return False, error_msg
+        print(f"⚠️ Failed to attach preview: {e}")
+
+def describe_error(error):
+    """User-facing message for a delivery error"""
+    import smtplib
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        print(f"⚠️ Authentication failed: {str(error)}")
+        return "Authentication failed. Check your email and app password."
+    if isinstance(error, ConnectionError):
+        print(f"⚠️ Connection error: {str(error)}")
+        return "Connection error. Please check your internet connection."
+    if isinstance(error, smtplib.SMTPException):
+        error_msg = f"Failed to send message: {str(error)}"
+    elif isinstance(error, tuple):
+        # (code, reply) from the server for a refused recipient
+        code, reply = error
+        error_msg = f"Recipient refused: {code} {reply.decode('utf-8', 'replace')}"
+    else:
+        error_msg = f"Failed to send email: {str(error)}"
+    print(f"⚠️ {error_msg}")
+    return error_msg
+
+def deliver_email(msg, sender, password, server, recipients=None):
+    """Send a prepared message via SMTP; runs on the delivery worker and must not touch bpy
+
+    Returns (success, message, failed recipients) so callers can retry only the recipients that failed.
+    """
+    if recipients is None:
+        recipients = routing.envelope_recipients(msg)
+    if not recipients:
+        print("⚠️ No recipient email")
+        return False, "No recipient email", []
+    with tracing.span("email.deliver", host=server.host, recipients=len(recipients)):
+        result = routing.fan_out(transport.smtp_pool, server, sender, password, msg, recipients)
+
+    if result.ok:
+        success_msg = "📤 Email sent successfully!"
+        if len(recipients) > 1:
+            success_msg = f"📤 Email sent to {len(recipients)} recipients!"
+        print(success_msg)
+        return True, success_msg, []
+
+    failed = [address for address in recipients if address in result.failed]
+    error_msg = describe_error(result.first_error())
+    if len(failed) < len(recipients):
+        error_msg = (f"Sent to {len(result.delivered)} of {len(recipients)} recipients; "
+                     f"failed for {', '.join(failed)}: {error_msg}")
+    return False, error_msg, failed
+
+# Per-message SMTP delivery data; entry is the outbox entry for durable messages
+SMTPTarget = namedtuple('SMTPTarget', ['sender', 'password', 'server', 'entry'])
+
+class SMTPChannel(channels.Channel):
+    """Email over SMTP, through the outbox when the message must survive failures"""
 
-def get_render_info():
+    name = 'SMTP'
+    label = "Email"
+    needs_network = True
+    needs_message = True
+
+    def configure(self, settings):
+        # The real target is filled in by send_email() once the message is built
+        return True if settings.channel_smtp else None
+
+    def send(self, notification, target):
+        if target.entry is not None:
+            return outbox.send_entry(target.entry, notification.message)
+        success, message, _ = deliver_email(notification.message, target.sender, target.password, target.server)
+        return success, message
+
+channels.register_channel(SMTPChannel())
+
+def _dispatch(subject, body, preview_image, msg, targets):
+    """Worker job: finish the email (the preview is encoded here, off the main thread) and send to every channel"""
+    if msg is not None:
+        if preview_image is not None:
+            attach_preview(msg, preview_image)
+        msg.as_bytes()  # Fix MIME boundaries before channels serialize the message in parallel
+    return channels.dispatch(channels.Notification(subject, body, preview_image, msg), targets)
+
+def send_email(subject, body, preview_image=None, notify=True, durable=True, charts=(), resolved=None):
+    """Build the notification and hand it to the background delivery worker for every enabled channel
+
+    resolved is the snapshot.DeliverySettings of the render being reported; without it the
+    active scene's settings are used.
+    """
+    print("📧 Attempting to send email...")
+    scene = bpy.context.scene
+    sync_tracing(scene)
+
+    resolved = resolved or snapshot.resolve(scene)
+    targets = list(resolved.targets)
+    if not targets:
+        return False, "No notification channel is enabled."
+
+    # Check if Allow online access is enabled in Preference
+    if any(channel.needs_network for channel, _ in targets) and not check_online_access():
+        targets = [(channel, config) for channel, config in targets if not channel.needs_network]
+        if not targets:
+            return False, "Online access is disabled."
+
+    msg = None
+    if any(channel.needs_message for channel, _ in targets):
+        prepared, error_msg = build_email(subject, body, charts, resolved)
+        if prepared is None:
+            targets = [(channel, config) for channel, config in targets if not channel.needs_message]
+            if not targets:
+                return False, error_msg
+        else:
+            msg, sender, password, server = prepared
+
+    ready = []
+    for channel, config in targets:
+        if channel.name == SMTPChannel.name:
+            # Durable messages go through the on-disk outbox so failures are retried later
+            entry = outbox.enqueue(deliver_email, msg, sender, password, server) if durable else None
+            if durable and entry is None:
+                continue
+            config = SMTPTarget(sender, password, server, entry)
+        ready.append((channel, config))
+    if not ready:
+        return True, "♻️ Identical notification already queued"
+
+    delivery.submit(_dispatch, subject, body, preview_image, msg, ready, notify=notify)
+    return True, "📨 Notification queued for delivery"
+
+def send_progress_email(subject, body, preview_image, resolved=None):
+    """Progress digests are best effort: no outbox and no popup"""
+    send_email(subject, body, preview_image, notify=False, durable=False, resolved=resolved)
+
+def get_last_notification():
+    """Return (subject, body, preview, charts) of the last completion email, or None"""
+    return _last_notification
+
+def get_render_info(scene=None):
     """Collect render statistics and settings"""
-    render = bpy.context.scene.render
+    scene = scene or bpy.context.scene
+    render = scene.render
     engine = render.engine
     
     # Get samples count based on render engine
-    samples = bpy.context.scene.cycles.samples if engine == 'CYCLES' else "N/A"
+    samples = scene.cycles.samples if engine == 'CYCLES' else "N/A"
         
     return {
         'Resolution': f"{render.resolution_x}x{render.resolution_y}",
-        'Frame Start': bpy.context.scene.frame_start,
-        'Frame End': bpy.context.scene.frame_end,
-        'Frame Current': bpy.context.scene.frame_current,
+        'Frame Start': scene.frame_start,
+        'Frame End': scene.frame_end,
+        'Frame Current': scene.frame_current,
         'Samples': samples,
         'Render Engine': engine,
     }
 
-def save_render_preview_as_jpg(path=None):
-    """Save render result as temporary JPG for email attachment"""
-    print("🖼️ Attempting to save render preview...")
-    
-    if path is None:
-        # Use Blender's user resource folder (C:\Users\Hi\AppData\Roaming\Blender Foundation\Blender\version\datafiles\render_email_notifier)
-        ext_dir = bpy.utils.user_resource('DATAFILES', path="render_email_notifier", create=True)
-        path = os.path.join(ext_dir, "render_preview.jpg")
-        print(f"📁 Using path: {path}")
-    
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    
-    # DIFFERENT APPROACH: Try to access the render result directly from the render context
-    try:
-        print("📷 Trying to save directly from current render...")
-        bpy.ops.render.render_view_save(filepath=path)
-        
-        # Check if file was created
-        if os.path.exists(path) and os.path.getsize(path) > 0:
-            print(f"✅ Preview saved successfully: {path} ({os.path.getsize(path)} bytes)")
-            return path
-    except Exception as e:
-        print(f"⚠️ Could not save directly: {e}")
-    
-    # Fallback
-    try:
-        image = bpy.data.images.get("Render Result")
-        if image and hasattr(image, 'has_data') and image.has_data:
-            print("✅ Using default Render Result")
-            image.save_render(path)
-            
-            if os.path.exists(path) and os.path.getsize(path) > 0:
-                print(f"✅ Preview saved successfully: {path}")
-                return path
-    except Exception as e:
-        print(f"⚠️ Error with default approach: {e}")
-    
-    try:
-        for window in bpy.context.window_manager.windows:
-            for area in window.screen.areas:
-                if area.type == 'IMAGE_EDITOR':
-                    space_image = area.spaces.active
-                    if space_image and space_image.image:
-                        img = space_image.image
-                        if img and img.has_data:
-                            print(f"📷 Found image in editor: {img.name}")
-                            img.save_render(path)
-                            
-                            if os.path.exists(path) and os.path.getsize(path) > 0:
-                                print(f"✅ Preview saved successfully: {path}")
-                                return path
-    except Exception as e:
-        print(f"⚠️ Error with image editor approach: {e}")
-    
-    print("All methods failed to save preview")
-    return None
+def complete_job(job, scene):
+    """Stop the per-render work and fix the notification text while the scene still describes this render
 
-@persistent
-def send_render_notification_later():
-    """Callback to send notification after short delay"""
-    global _email_sent, _render_in_progress, _is_animation
-    
-    # Only send if we haven't already and render was in progress
-    if _email_sent or not _render_in_progress:
-        return None
-        
-    _email_sent = True  # Mark email as sent
-    _render_in_progress = False  # Render is complete
-    _is_animation = False # Reset animation flag
-    
-    end_time = time.time()
-    duration_sec = end_time - _render_start_time if _render_start_time else 0
-    info = get_render_info()
+    Returns False when no email follows (render farm nodes).
+    """
+    from . import resources, verify
+    jobs.complete(job)
+    progress.stop()
+    watchdog.stop()
+    resources.stop()
+
+    if farm.is_active():
+        # Farm nodes only report frames; the aggregator sends one email for the whole job
+        farm.finish()
+        contact_sheet.discard()
+        jobs.close(job)
+        print("🚜 Farm share complete - the job email is sent by the aggregator")
+        return False
+
+    duration_sec = job.duration
+    info = job.render_info
+    job.last_frame = scene.frame_current
 
     # Format duration as HH:MM:SS
     duration_str = time.strftime('%H:%M:%S', time.gmtime(duration_sec))
     
     # Prepare email body with render info
+    # The scene, render number and start time keep back-to-back renders from looking identical to the outbox
+    started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(job.started))
     body = f"""🎉 Render Complete!
+- Scene: {job.scene_name} (render {job.render_id} of this session, started {started})
 - Duration: {duration_str} ({duration_sec:.2f} seconds)
 - Resolution: {info['Resolution']}
 - Samples: {info['Samples']}
 - Engine: {info['Render Engine']}
 - Frame Range: {info['Frame Start']} to {info['Frame End']}
-- Current Frame: {info['Frame Current']}
+- Current Frame: {job.last_frame}
 """
+    for line in telemetry.report_lines():
+        body += line + "\n"
 
-    print("Saving render preview...")
-    preview_path = save_render_preview_as_jpg()
-    print("Sending completion email...")
-    success, msg = send_email("📸 Blender Render Complete", body, preview_path)
+    settings = headless.get_settings(scene)
+    if settings.resource_usage:
+        for line in resources.report_lines():
+            body += line + "\n"
+        job.charts = resources.chart_attachments()
+    if settings.verify_frames and job.frames_written and not scene.render.is_movie_format:
+        job.frame_paths = verify.expected_frames(scene)
+    job.sheet = contact_sheet.finish()
+    job.body = body
+    return True
+
+@persistent
+def send_render_notification_later(key):
+    """Timer callback that builds and sends the completion email of one finished render"""
+    global _last_notification
+    from . import verify
     
-    # Show UI notification if possible
-    if success:
+    # Only send once, and only for a render that completed
+    job = jobs.get(key)
+    if job is None or job.state != jobs.COMPLETED:
+        return None
+
+    report = verify_error = None
+    if job.frame_paths:
         try:
-            bpy.ops.rendermailbot.show_message('INVOKE_DEFAULT', 
-                                            message="📤 Email sent successfully!", 
-                                            icon='INFO')
+            if bpy.app.background:
+                report = verify.verify(job.frame_paths)  # No UI to keep responsive
+            else:
+                # The frames are checked on a background thread; keep the timer running until the report is in
+                if job.verification is None:
+                    job.verification = verify.verify_later(job.frame_paths)
+                if not job.verification.done():
+                    return VERIFY_POLL_INTERVAL
+                report = job.verification.result()
         except Exception as e:
-            print(f"Couldn't show UI notification: {e}")
+            # A failed check must not cost the completion email
+            verify_error = str(e) or type(e).__name__
+            print(f"⚠️ Output frame check failed: {verify_error}")
+    jobs.close(job)
+
+    body = job.body
+    subject = "📸 Blender Render Complete"
+    scene = bpy.data.scenes.get(job.scene_name) or bpy.context.scene
+    settings = headless.get_settings(scene)
+    if verify_error is not None:
+        body += f"- Output Check: failed ({verify_error}); check the output frames by hand\n"
+        subject = "⚠️ Blender Render Complete - Check Output Frames"
+    if report is not None:
+        for line in report.report_lines():
+            body += line + "\n"
+        if not report.ok:
+            subject = "⚠️ Blender Render Complete - Check Output Frames"
+
+    # Animations get a contact sheet of evenly spaced frames, stills the final image
+    sheet = job.sheet
+    if sheet is not None:
+        sheet.develop()  # Frames the timer has not read back yet
+        print(f"🎞️ Attaching contact sheet of {len(sheet.captured)} frames")
+        body += f"- Contact Sheet Frames: {', '.join(str(frame) for frame in sheet.captured)}\n"
+        preview_image = preview.make_preview(sheet.canvas, settings)
+    else:
+        # Read the frame written to the output folder when there is no UI (blender -b), and for EXR
+        # output, whose float layers and passes are decoded directly; otherwise use the Render Result,
+        # unless a newer render has replaced it in the meantime
+        frame_path = headless.written_frame_path(scene, job.last_frame)
+        if headless.is_headless() or (frame_path or "").lower().endswith(".exr"):
+            preview_image = preview.capture_render_preview(settings, frame_path)
+        elif jobs.is_latest(job):
+            preview_image = preview.capture_render_preview(settings)
+        elif frame_path is not None:
+            preview_image = preview.capture_render_preview(settings, frame_path)
+        else:
+            print("📄 A newer render replaced the Render Result - sending without a preview")
+            preview_image = None
+
+    charts = job.charts
+    _last_notification = (subject, body, preview_image, charts)
+    if headless.is_headless():
+        # Renders of a batch invocation are sent together when Blender exits
+        headless.add_job(subject, body, preview_image, charts=charts, delivery=job.delivery)
+        return None
+
+    print("Sending completion email...")
+    # Delivery happens on the worker; the result popup is shown once it finishes
+    send_email(subject, body, preview_image, charts=charts, resolved=job.delivery)
             
     return None  # Only run once
 
+def start_farm(scene, settings):
+    """In render farm mode, report this instance's frames to the shared spool instead of emailing"""
+    farm.close()
+    if not settings.farm_enabled:
+        return
+    if not settings.farm_spool_dir.strip():
+        print("⚠️ Render farm mode is on but no spool folder is set - sending emails from this instance")
+        return
+    farm.start(bpy.path.abspath(settings.farm_spool_dir), farm.job_id_for(bpy.data.filepath, settings.farm_job_id),
+               os.path.basename(bpy.data.filepath), (scene.frame_start, scene.frame_end, scene.frame_step))
+
+def start_watchdog(scene, settings, expected_frames):
+    """Launch the crash/hang watchdog with everything it needs to email without Blender"""
+    watchdog.stop()
+    if not settings.watchdog_enabled:
+        return
+
+    sender = password = None
+    recipients, server = [], None
+    if not getattr(bpy.app, 'online_access', True):
+        print("⚠️ Online access is disabled - the crash watchdog cannot send email")
+    elif settings.channel_smtp:
+        try:
+            sender, password, recipients = get_email_info(scene)
+            server = snapshot.resolve(scene).server
+        except Exception as e:
+            print(f"⚠️ Crash watchdog will not send email: {e}")
+    if not recipients and not farm.is_active():
+        return
+
+    config = {
+        'host': socket.gethostname(),
+        'blend': os.path.basename(bpy.data.filepath),
+        'range': [scene.frame_start, scene.frame_end, scene.frame_step],
+        'expected': expected_frames,
+        'min_timeout': settings.watchdog_minutes * 60.0,
+        'sender': sender,
+        'password': password,
+        'recipients': recipients,
+        'server': list(server) if server else None,
+        'farm_events': farm.events_path(),
+    }
+    base_dir = bpy.utils.user_resource('DATAFILES', path="render_email_notifier", create=True)
+    watchdog.start(config, os.path.join(base_dir, watchdog.LOG_NAME))
+
 @persistent
 def on_render_start(scene):
     """Handler for render start event"""
-    global _render_start_time, _email_sent, _render_in_progress, _is_animation
-    
-    # Reset state for new render
-    _render_start_time = time.time()
-    _email_sent = False
-    _render_in_progress = True
-    _is_animation = scene.render.engine != 'BLENDER_RENDER' and scene.render.use_sequencer is False # Check if it's animation
-    print(f"⏱️ Render started - timer reset. Animation: {_is_animation}")
+    from . import resources
+    # A fresh job record for this render; earlier renders keep theirs until they are notified
+    is_animation = scene.render.engine != 'BLENDER_RENDER' and scene.render.use_sequencer is False # Check if it's animation
+    job = jobs.begin(scene, is_animation)
+    # Render settings are fixed until the render ends; delivery settings are resolved now rather than when it finishes
+    job.render_info = get_render_info(scene)
+    job.delivery = snapshot.resolve(scene)
+    expected_frames = len(range(scene.frame_start, scene.frame_end + 1, max(1, scene.frame_step)))
+    settings = headless.get_settings(scene)
+    sync_tracing(scene)
+    contact_sheet.start(scene, settings)
+    telemetry.start(expected_frames)
+    if settings.resource_usage:
+        resources.start()
+    progress.start(settings, expected_frames)
+    start_farm(scene, settings)
+    start_watchdog(scene, settings, expected_frames)
+    print(f"⏱️ Render {job.render_id} started for {scene.name}. Animation: {job.is_animation}")
 
 @persistent
 def on_render_complete(scene=None, *args):  # Accept extra arguments for flexibility
     """Handler for render completion"""
-    global _render_in_progress, _is_animation
-    
-    if not _render_in_progress:
+    scene = scene or bpy.context.scene
+    job = jobs.active(scene)
+    if job is None:
         return
     # In render animtion case
-    if _is_animation and scene.frame_current < scene.frame_end:
-        print(f"🎬 Frame {scene.frame_current} of {_is_animation} complete - waiting for the rest")
+    if job.is_animation and scene.frame_current < scene.frame_end:
+        print(f"🎬 Frame {scene.frame_current} of {scene.frame_end} complete - waiting for the rest")
         return # Wait for all frames
+
+    if not complete_job(job, scene):
+        return
         
+    if bpy.app.background:
+        # Timers don't run in background mode, so build the notification right away
+        print("✅ Render complete - recording for the batch digest")
+        send_render_notification_later(job.key)
+        return
+
     print("✅ Render complete - scheduling email")
-    # Schedule email with small delay to ensure everything is ready
-    bpy.app.timers.register(send_render_notification_later, first_interval=0.5)
+    # Schedule email with small delay to ensure everything is ready; the timer carries its own job
+    job.timer = functools.partial(send_render_notification_later, job.key)
+    bpy.app.timers.register(job.timer, first_interval=0.5)
+
+@persistent
+def on_frame_pre(scene, *args):
+    """Handler called before each frame renders"""
+    telemetry.frame_started()
+
+@persistent
+def on_frame_post(scene, *args):
+    """Handler called after each frame renders"""
+    seconds = telemetry.frame_finished(scene.frame_current)
+    farm.frame_done(scene.frame_current, seconds)
+    watchdog.frame_done(scene.frame_current, seconds)
+
+@persistent
+def on_render_stats(stats):
+    """Handler called with render progress text; a cheap sign of life for the watchdog"""
+    from . import resources
+    watchdog.alive()
+    resources.render_stats(stats)
+
+@persistent
+def on_frame_written(scene, *args):
+    """Handler called after each animation frame is saved"""
+    job = jobs.active(scene)
+    if job is not None:
+        job.frames_written += 1
+        contact_sheet.capture_frame(scene)
+        progress.frame_done(scene, functools.partial(send_progress_email, resolved=job.delivery))
+
+@persistent
+def on_file_loaded(*args):
+    """Loading a file or stepping through undo replaces the settings without calling their update callbacks"""
+    snapshot.invalidate()
 
 @persistent
 def on_render_cancel(scene):
     """Handler for render cancellation/error"""
-    global _email_sent, _render_in_progress, _is_animation
-    
-    if _email_sent or not _render_in_progress:
+    job = jobs.active(scene)
+    if job is None:
         return
         
-    _email_sent = True
-    _render_in_progress = False
-    _is_animation = False
+    from . import resources
+    jobs.close(job)
+    contact_sheet.discard()
+    progress.stop()
+    watchdog.stop()
+    resources.stop()
+    if farm.is_active():
+        farm.finish(cancelled=True)
+        return
+    subject = "⚠️ Blender Render Cancelled"
+    body = "The render was cancelled or encountered an error."
+    if headless.get_settings(scene).resource_usage:
+        body += "\n" + "".join(line + "\n" for line in resources.report_lines())
+    if headless.is_headless():
+        headless.add_job(subject, body, None, failed=True, delivery=job.delivery)
+        return
+
     print("⚠️ Render cancelled - sending notification")
-    send_email("⚠️ Blender Render Cancelled", "The render was cancelled or encountered an error.")
+    send_email(subject, body, resolved=job.delivery)
+
+def flush_batch():
+    """Send the background-mode batch digest and wait for delivery before Blender exits"""
+    try:
+        headless.flush(send_email, headless.get_settings(bpy.context.scene))
+    except Exception as e:
+        print(f"⚠️ Failed to send batch digest: {e}")
+    # Background sessions never run the retry timer, so give older queued mail a chance too
+    outbox.retry_due()
+    if delivery.pending_count() and not delivery.wait_idle(BATCH_SEND_TIMEOUT):
+        print("⚠️ Timed out waiting for email delivery; unsent mail stays in the outbox")
 
 def register_handlers():
     """Register our handlers with Blender"""
@@ -299,7 +558,17 @@ def register_handlers():
     # Add our persistent handlers
     bpy.app.handlers.render_init.append(on_render_start)
     bpy.app.handlers.render_complete.append(on_render_complete)
+    bpy.app.handlers.render_pre.append(on_frame_pre)
+    bpy.app.handlers.render_post.append(on_frame_post)
+    bpy.app.handlers.render_write.append(on_frame_written)
     bpy.app.handlers.render_cancel.append(on_render_cancel)
+    bpy.app.handlers.render_stats.append(on_render_stats)
+    bpy.app.handlers.load_post.append(on_file_loaded)
+    bpy.app.handlers.undo_post.append(on_file_loaded)
+    bpy.app.handlers.redo_post.append(on_file_loaded)
+
+    # Pick up anything left unsent by a previous session
+    outbox.start(deliver_email)
     
     print("🔔 Registered render notification handlers")
 
@@ -310,7 +579,14 @@ def unregister_handlers():
     handlers = [
         (bpy.app.handlers.render_init, on_render_start),
         (bpy.app.handlers.render_complete, on_render_complete),
-        (bpy.app.handlers.render_cancel, on_render_cancel)
+        (bpy.app.handlers.render_pre, on_frame_pre),
+        (bpy.app.handlers.render_post, on_frame_post),
+        (bpy.app.handlers.render_write, on_frame_written),
+        (bpy.app.handlers.render_cancel, on_render_cancel),
+        (bpy.app.handlers.render_stats, on_render_stats),
+        (bpy.app.handlers.load_post, on_file_loaded),
+        (bpy.app.handlers.undo_post, on_file_loaded),
+        (bpy.app.handlers.redo_post, on_file_loaded),
     ]
     
     for handler_list, func in handlers:
@@ -320,10 +596,25 @@ def unregister_handlers():
     
     # Clear any pending timers
     if hasattr(bpy.app, 'timers') and callable(getattr(bpy.app.timers, 'unregister', None)):
-        try:
-            bpy.app.timers.unregister(send_render_notification_later)
-            print("🗑️ Unregistered timer")
-        except:
-            pass  # Timer might not be registered
+        for job in jobs.pending():
+            try:
+                if job.timer is not None:
+                    bpy.app.timers.unregister(job.timer)
+                    print("🗑️ Unregistered timer")
+            except:
+                pass  # Timer might have run already
+        progress.stop()  # Drops a progress digest still waiting for its timer
+        contact_sheet.discard()  # And contact sheet frames not read back yet
+
+    # Blender unregisters add-ons on exit, which is the last chance to send in background mode
+    if bpy.app.background:
+        flush_batch()
+
+    watchdog.stop()
+    farm.close()
+    outbox.stop()
+    delivery.stop_worker()
+    tracing.shutdown()
+    transport.smtp_pool.close_all()
     
     print("🔕 Unregistered render notification handlers")
\ No newline at end of file
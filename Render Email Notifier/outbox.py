@@ -0,0 +1,415 @@
+import bpy
+import json
+import os
+import random
+import threading
+import time
+from . import delivery, routing, snapshot, tracing
+
+# Durable outbox: every notification is spooled to disk before the first
+# attempt and only removed once it has been delivered. Failed messages are
+# retried with exponential backoff, also after a Blender restart. Every
+# Blender instance on the machine shares the spool, so each one writes to its
+# own folder in it and holds a lock on that folder for as long as it runs; on
+# startup an instance takes over the entries of folders whose lock it can get,
+# meaning their Blender has exited, so no message is retried by two instances.
+RETRY_BASE_DELAY = 30.0      # Seconds before the first retry
+RETRY_MAX_DELAY = 3600.0     # Backoff never waits longer than this
+MAX_ATTEMPTS = 12            # After this many failures a message is moved to failed/
+RETRY_TICK_INTERVAL = 15.0   # Seconds between checks for due retries
+STARTUP_DELAY = 5.0          # Give Blender time to load the scene before draining
+OWNER_LOCK = "owner.lock"    # Locked by the running instance whose entries are in the folder
+ORPHAN_GRACE = 600.0         # Seconds before a leftover temporary or half-written file is removed
+
+_spool_dir = None     # <user datafiles>/render_email_notifier/outbox
+_own_dir = None       # This instance's folder in the spool
+_own_lock = None      # Open file locking _own_dir until Blender exits
+_entries = {}         # Entry id -> metadata dict for every message still in the outbox
+_credentials = {}     # Sender -> (password, server), kept in memory only and never written to the spool
+_credentials_generation = None  # snapshot.generation() the scene credentials were last read at
+_deliver = None       # Sends a message: deliver(msg, sender, password, server, recipients) -> (ok, text, failed)
+_lock = threading.Lock()
+
+def get_spool_dir():
+    """Return the outbox folder next to the render preview, creating it if needed"""
+    global _spool_dir
+
+    if _spool_dir is None:
+        base_dir = bpy.utils.user_resource('DATAFILES', path="render_email_notifier", create=True)
+        _spool_dir = os.path.join(base_dir, "outbox")
+        os.makedirs(_spool_dir, exist_ok=True)
+    return _spool_dir
+
+def _try_lock(path):
+    """Open and lock a file without waiting; returns the open file, or None if another process holds the lock"""
+    f = open(path, 'a+b')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+def _claim_own_dir():
+    """This instance's folder in the spool, created and locked on first use"""
+    global _own_dir, _own_lock
+
+    if _own_dir is None:
+        import uuid
+        path = os.path.join(get_spool_dir(), f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(path, exist_ok=True)
+        _own_lock = _try_lock(os.path.join(path, OWNER_LOCK))
+        _own_dir = path
+    return _own_dir
+
+def _atomic_write(path, data):
+    """Write bytes to a temporary file and rename it into place"""
+    import uuid
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _entry_paths(entry_id):
+    return (os.path.join(_own_dir, f"{entry_id}.eml"),
+            os.path.join(_own_dir, f"{entry_id}.json"))
+
+def _dedupe_key(msg):
+    """Identical notifications (same sender, recipients, subject and text) share one key"""
+    import hashlib
+    digest = hashlib.sha1()
+    for header in ('From', 'To', 'Bcc', 'Subject'):
+        digest.update(str(msg[header]).encode('utf-8'))
+        digest.update(b'\0')
+    text = msg.get_body(preferencelist=('plain',))
+    if text is not None:
+        digest.update(text.get_content().encode('utf-8'))
+    return digest.hexdigest()
+
+def _write_metadata(entry):
+    meta = {key: value for key, value in entry.items() if key != 'in_flight'}
+    _atomic_write(_entry_paths(entry['id'])[1], json.dumps(meta).encode('utf-8'))
+
+def _write_entry(entry, msg):
+    """Spool the full message (attachments included) followed by its metadata"""
+    eml_path = _entry_paths(entry['id'])[0]
+    with tracing.span("outbox.spool") as span:
+        data = msg.as_bytes()
+        _atomic_write(eml_path, data)
+        # The metadata file is written last, so its presence marks a complete entry
+        _write_metadata(entry)
+        span.set(bytes=len(data))
+
+def _load_message(entry):
+    from email import policy
+    from email.parser import BytesParser
+    with open(_entry_paths(entry['id'])[0], 'rb') as f:
+        return BytesParser(policy=policy.default).parse(f)
+
+def _remove_entry(entry):
+    with _lock:
+        _entries.pop(entry['id'], None)
+    for path in _entry_paths(entry['id']):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Failed to remove outbox file {path}: {e}")
+
+def _give_up(entry):
+    """Move a message that keeps failing out of the retry loop"""
+    failed_dir = os.path.join(_spool_dir, "failed")
+    os.makedirs(failed_dir, exist_ok=True)
+    with _lock:
+        _entries.pop(entry['id'], None)
+    for path in _entry_paths(entry['id']):
+        try:
+            os.replace(path, os.path.join(failed_dir, os.path.basename(path)))
+        except Exception as e:
+            print(f"⚠️ Failed to move {path} to failed/: {e}")
+    print(f"🛑 Giving up on '{entry['subject']}' after {entry['attempts']} attempts")
+
+def _schedule_retry(entry, error_msg):
+    """Record a failed attempt and work out when to try again; returns the delay or None"""
+    entry['attempts'] += 1
+    entry['last_error'] = error_msg
+    if entry['attempts'] >= MAX_ATTEMPTS:
+        _give_up(entry)
+        return None
+
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (entry['attempts'] - 1))
+    delay *= random.uniform(0.8, 1.2)  # Jitter so several instances don't retry in lockstep
+    entry['next_attempt'] = time.time() + delay
+    try:
+        _write_metadata(entry)
+    except Exception as e:
+        print(f"⚠️ Failed to update outbox entry: {e}")
+    with _lock:
+        entry['in_flight'] = False
+    print(f"⏳ Will retry '{entry['subject']}' in {delay:.0f} seconds (attempt {entry['attempts']})")
+    return delay
+
+def _attempt(entries, msg):
+    """Deliver one message on behalf of one or more outbox entries"""
+    sender = entries[0]['sender']
+    password, server = _credentials[sender]
+    # Entries are grouped by recipients, and after a partial failure only the failed ones are left
+    success, result, failed = _deliver(msg, sender, password, server, routing.parse_recipients(entries[0]['to']))
+    if success:
+        for entry in entries:
+            _remove_entry(entry)
+        return True, result
+
+    if failed:
+        for entry in entries:
+            entry['to'] = ", ".join(failed)
+
+    delays = [_schedule_retry(entry, result) for entry in entries]
+    if delays[0] is not None:
+        return False, f"{result} (queued, retrying in {delays[0]:.0f}s)"
+    return False, result
+
+def send_entry(entry, msg):
+    """Worker job: spool a finished message, then make the first delivery attempt"""
+    try:
+        _write_entry(entry, msg)
+    except Exception as e:
+        print(f"⚠️ Failed to write outbox entry: {e}")
+    return _attempt([entry], msg)
+
+def _coalesce(entries, messages):
+    """Merge several queued notifications for the same recipients into one digest"""
+    from email.message import EmailMessage
+    digest = EmailMessage()
+    digest['Subject'] = f"📬 {len(messages)} delayed Blender render notifications"
+    digest['From'] = messages[0]['From']
+    digest['To'] = messages[0]['To']
+    if messages[0]['Bcc'] is not None:
+        digest['Bcc'] = messages[0]['Bcc']
+
+    sections = []
+    for entry, msg in zip(entries, messages):
+        queued_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['created']))
+        text = msg.get_body(preferencelist=('plain',))
+        sections.append(f"--- {entry['subject']} (queued {queued_at}) ---\n"
+                        f"{text.get_content() if text is not None else ''}")
+    digest.set_content("\n".join(sections))
+
+    # Only the newest preview is kept so the digest stays the size of one notification
+    for msg in reversed(messages):
+        attachments = list(msg.iter_attachments())
+        if attachments:
+            for part in attachments:
+                digest.add_attachment(part.get_content(), maintype=part.get_content_maintype(),
+                                      subtype=part.get_content_subtype(), filename=part.get_filename())
+            break
+    return digest
+
+def _retry_group(entries):
+    """Worker job: resend due entries, merging them when there is more than one"""
+    messages = []
+    loaded = []
+    for entry in entries:
+        try:
+            messages.append(_load_message(entry))
+            loaded.append(entry)
+        except Exception as e:
+            print(f"⚠️ Dropping unreadable outbox entry {entry['id']}: {e}")
+            _remove_entry(entry)
+
+    if not loaded:
+        return False, "Queued notification could not be read"
+    if len(loaded) == 1:
+        print(f"🔁 Retrying '{loaded[0]['subject']}'")
+        return _attempt(loaded, messages[0])
+
+    print(f"🔁 Retrying {len(loaded)} queued notifications as one digest")
+    return _attempt(loaded, _coalesce(loaded, messages))
+
+def _load_scene_credentials():
+    """Pick up the password for queued senders from the current scene settings, again after every change"""
+    global _credentials_generation
+
+    generation = snapshot.generation()
+    if generation == _credentials_generation:
+        return
+    try:
+        resolved = snapshot.resolve(bpy.context.scene)
+    except Exception:
+        return  # No scene available yet
+    _credentials_generation = generation
+    if resolved.sender and resolved.password:
+        # A password corrected after a failure replaces the one the queued messages were sent with
+        _credentials[resolved.sender] = (resolved.password, resolved.server)
+
+def retry_due():
+    """Hand entries whose retry time has come back to the delivery worker"""
+    if not _entries:
+        return
+
+    _load_scene_credentials()
+    now = time.time()
+    groups = {}
+    with _lock:
+        for entry in sorted(_entries.values(), key=lambda e: e['created']):
+            if entry['in_flight'] or entry['next_attempt'] > now or entry['sender'] not in _credentials:
+                continue
+            entry['in_flight'] = True
+            groups.setdefault((entry['sender'], entry['to']), []).append(entry)
+
+    for entries in groups.values():
+        delivery.submit(_retry_group, entries)
+
+def _retry_tick():
+    """Timer callback that retries due outbox entries"""
+    retry_due()
+    return RETRY_TICK_INTERVAL
+
+def enqueue(deliver, msg, sender, password, server):
+    """Register a message with the outbox; returns its entry, or None if an identical one is already pending
+
+    The caller then runs send_entry(entry, msg) off the main thread once the message is finished.
+    """
+    global _deliver
+
+    _claim_own_dir()
+    _deliver = deliver
+    # A render keeps the settings it started with, which may predate a corrected password
+    _credentials.setdefault(sender, (password, server))
+
+    import uuid
+    key = _dedupe_key(msg)
+    now = time.time()
+    entry = {
+        'id': f"{int(now * 1000)}-{uuid.uuid4().hex[:8]}",
+        'key': key,
+        'sender': sender,
+        'to': ", ".join(routing.envelope_recipients(msg)),
+        'subject': str(msg['Subject']),
+        'created': now,
+        'attempts': 0,
+        'next_attempt': now,
+        'last_error': None,
+        'in_flight': True,
+    }
+    with _lock:
+        if any(existing['key'] == key for existing in _entries.values()):
+            print("♻️ Identical notification already queued - skipping duplicate")
+            return None
+        _entries[entry['id']] = entry
+    return entry
+
+def pending_count():
+    """Number of messages still waiting in the outbox"""
+    with _lock:
+        return len(_entries)
+
+def _is_stale(path, now):
+    try:
+        return now - os.path.getmtime(path) > ORPHAN_GRACE
+    except OSError:
+        return False
+
+def _adopt(source_dir, own_dir, now):
+    """Move the complete entries of source_dir into own_dir and clear out old partial writes"""
+    names = set(os.listdir(source_dir))
+    for name in sorted(names):
+        path = os.path.join(source_dir, name)
+        if name.endswith('.json') and name[:-5] + '.eml' in names:
+            try:
+                # Moving the metadata claims the entry: only one instance can rename it away
+                os.rename(path, os.path.join(own_dir, name))
+            except FileNotFoundError:
+                continue
+            eml = name[:-5] + '.eml'
+            os.rename(os.path.join(source_dir, eml), os.path.join(own_dir, eml))
+        elif (name.endswith('.tmp') or (name.endswith('.eml') and name[:-4] + '.json' not in names)) \
+                and _is_stale(path, now):
+            # An interrupted write, or a message whose metadata never made it to disk
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def _take_over(root, own_dir):
+    """Adopt the entries of instances that are no longer running, and of older versions' flat spool"""
+    now = time.time()
+    _adopt(root, own_dir, now)
+    for name in os.listdir(root):
+        folder = os.path.join(root, name)
+        lock_path = os.path.join(folder, OWNER_LOCK)
+        if folder == own_dir or not os.path.isfile(lock_path):
+            continue  # failed/ and anything that is not an instance folder
+        lock = _try_lock(lock_path)
+        if lock is None:
+            continue  # That Blender is still running and retries its own entries
+        try:
+            _adopt(folder, own_dir, now)
+            if os.listdir(folder) == [OWNER_LOCK]:
+                os.remove(lock_path)
+                os.rmdir(folder)
+        except OSError as e:
+            print(f"⚠️ Could not take over outbox folder {folder}: {e}")
+        finally:
+            lock.close()
+
+def _load_spool():
+    """Take over entries left by earlier sessions and read them, dropping duplicates"""
+    own_dir = _claim_own_dir()
+    _take_over(_spool_dir, own_dir)
+    names = set(os.listdir(own_dir))
+    loaded = {}
+    for name in sorted(names):
+        path = os.path.join(own_dir, name)
+        if not name.endswith('.json') or name[:-5] + '.eml' not in names:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Skipping unreadable outbox entry {name}: {e}")
+            continue
+
+        entry['in_flight'] = False
+        entry['next_attempt'] = 0  # Drain straight away instead of waiting out the old backoff
+        duplicate = loaded.get(entry['key'])
+        if duplicate is not None:
+            _remove_entry(duplicate)  # Entry ids sort by creation time, so keep the newest
+        loaded[entry['key']] = entry
+
+    with _lock:
+        for entry in loaded.values():
+            _entries[entry['id']] = entry
+    return len(loaded)
+
+def start(deliver):
+    """Load the spool from disk and start the retry timer"""
+    global _deliver
+
+    _deliver = deliver
+    try:
+        get_spool_dir()
+        count = _load_spool()
+        if count:
+            print(f"📬 Found {count} unsent notification(s) in the outbox")
+    except Exception as e:
+        print(f"⚠️ Failed to load outbox: {e}")
+
+    if not bpy.app.timers.is_registered(_retry_tick):
+        bpy.app.timers.register(_retry_tick, first_interval=STARTUP_DELAY, persistent=True)
+
+def stop():
+    """Stop retrying; whatever is still spooled is picked up again on the next start"""
+    if bpy.app.timers.is_registered(_retry_tick):
+        bpy.app.timers.unregister(_retry_tick)
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,297 @@
+import bpy
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from . import tracing
+
+# Render preview pipeline: pixels are copied out of Blender with
+# foreach_get, box-filtered down to the preview size with NumPy and encoded
+# straight to bytes for the email, so the full-resolution frame never has to
+# be written out and read back just to build an attachment. NumPy and the
+# encoder, EXR and tone mapping modules are imported by the functions that
+# use them, so the add-on settings can read the defaults below at startup.
+DEFAULT_MAX_EDGE = 1280
+DEFAULT_QUALITY = 85
+DEFAULT_MAX_KB = 2048
+
+FORMATS = {
+    'JPEG': ('jpeg', 'jpg'),  # MIME subtype, file extension
+    'PNG': ('png', 'png'),
+}
+
+# Size budget search: each scale is tried with a binary search over JPEG quality
+BUDGET_SCALES = (1.0, 0.75, 0.5, 0.35, 0.25)
+MIN_QUALITY = 30
+QUALITY_STEP = 5
+
+# How float (scene-linear) pixels are turned into display colours, and which
+# render layer and pass of a multilayer EXR to show ("" = first layer, Combined)
+Display = namedtuple('Display', ['curve', 'exposure', 'gamma', 'layer', 'pass_name'])
+STANDARD_DISPLAY = Display('STANDARD', 0.0, 1.0, "", "")
+
+# Encoded previews keyed by pixel content hash plus encode settings, so resends,
+# retries and extra recipient groups reuse the bytes instead of encoding again
+ENCODE_CACHE_SIZE = 8
+_encode_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+class RenderPreview:
+    """Downscaled display-ready render pixels, encoded on demand"""
+
+    def __init__(self, pixels, file_format='JPEG', quality=DEFAULT_QUALITY, max_bytes=0):
+        self.pixels = pixels          # (height, width, 3) uint8, top row first
+        self.file_format = file_format if file_format in FORMATS else 'JPEG'
+        self.quality = quality
+        self.max_bytes = max_bytes    # 0 means no size limit
+        self._content_hash = None
+
+    @property
+    def size(self):
+        height, width = self.pixels.shape[:2]
+        return width, height
+
+    @property
+    def content_hash(self):
+        """Hash of the preview pixels, computed once"""
+        if self._content_hash is None:
+            import hashlib
+            import numpy as np
+            pixels = np.ascontiguousarray(self.pixels)
+            digest = hashlib.blake2b(pixels.data, digest_size=16)
+            digest.update(repr(pixels.shape).encode('ascii'))
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def encode(self):
+        """Encode the preview; returns (bytes, MIME subtype, filename). Safe to call off the main thread"""
+        key = (self.content_hash, self.file_format, self.quality, self.max_bytes)
+        with _cache_lock:
+            cached = _encode_cache.get(key)
+            if cached is not None:
+                _encode_cache.move_to_end(key)
+                print("♻️ Reusing cached preview encoding")
+                return cached
+
+        with tracing.span("preview.encode", format=self.file_format, size=f"{self.size[0]}x{self.size[1]}") as span:
+            result = self._encode_within_budget()
+            span.set(bytes=len(result[0]))
+        with _cache_lock:
+            _encode_cache[key] = result
+            while len(_encode_cache) > ENCODE_CACHE_SIZE:
+                _encode_cache.popitem(last=False)
+        return result
+
+    def _encode_within_budget(self):
+        """Highest quality encoding that fits max_bytes, shrinking quality first and then size"""
+        from . import encoders
+        if self.file_format == 'PNG':
+            data = encoders.encode_png(self.pixels)
+            if not self.max_bytes or len(data) <= self.max_bytes:
+                return _result('PNG', data)
+            print(f"🗜️ PNG preview is {len(data) // 1024} KB - switching to JPEG to fit {self.max_bytes // 1024} KB")
+        elif not self.max_bytes:
+            return _result('JPEG', encoders.encode_jpeg(self.pixels, self.quality))
+
+        width, height = self.size
+        smallest = None
+        for scale in BUDGET_SCALES:
+            pixels = self.pixels if scale == 1.0 else resample(
+                self.pixels, max(1, round(width * scale)), max(1, round(height * scale)))
+            data, quality, smallest = _fit_jpeg_quality(pixels, self.quality, self.max_bytes)
+            if data is not None:
+                if scale != 1.0 or quality != self.quality:
+                    print(f"🗜️ Preview fits {self.max_bytes // 1024} KB at quality {quality}, "
+                          f"{scale:.0%} scale ({len(data) // 1024} KB)")
+                return _result('JPEG', data)
+
+        print(f"⚠️ Preview still {len(smallest) // 1024} KB at the smallest size - sending it anyway")
+        return _result('JPEG', smallest)
+
+def _result(file_format, data):
+    subtype, extension = FORMATS[file_format]
+    return data, subtype, f"render_preview.{extension}"
+
+def _fit_jpeg_quality(pixels, quality, max_bytes):
+    """Binary search for the best quality under max_bytes; returns (fitting data or None, its quality, smallest data)"""
+    from . import encoders
+    data = encoders.encode_jpeg(pixels, quality)
+    if len(data) <= max_bytes:
+        return data, quality, data
+
+    candidates = list(range(MIN_QUALITY, quality, QUALITY_STEP))
+    best, best_quality = None, None
+    smallest = data
+    low, high = 0, len(candidates) - 1
+    while low <= high:
+        middle = (low + high) // 2
+        data = encoders.encode_jpeg(pixels, candidates[middle])
+        if len(data) <= max_bytes:
+            best, best_quality = data, candidates[middle]
+            low = middle + 1
+        else:
+            high = middle - 1
+        if len(data) < len(smallest):
+            smallest = data
+    return best, best_quality, smallest
+
+def _resample_axis(values, size, axis):
+    """Area-average one axis to a new length using prefix sums, for any scale factor"""
+    import numpy as np
+    source = values.shape[axis]
+    prefix = np.cumsum(values, axis=axis, dtype=np.float64)
+    prefix = np.concatenate([np.zeros_like(np.take(prefix, [0], axis=axis)), prefix], axis=axis)
+
+    edges = np.linspace(0, source, size + 1)
+    whole = np.minimum(np.floor(edges).astype(np.intp), source - 1)
+    fraction = (edges - whole).reshape([-1 if a == axis else 1 for a in range(values.ndim)])
+    # Prefix sum evaluated at fractional positions: full pixels plus part of the next one
+    at_edges = np.take(prefix, whole, axis=axis) + fraction * np.take(values, whole, axis=axis)
+    sums = np.diff(at_edges, axis=axis)
+    return sums / (source / size)
+
+def resample(pixels, width, height):
+    """Area-resample a uint8 image to width x height"""
+    import numpy as np
+    rows = _resample_axis(pixels.astype(np.float32), height, 0)
+    out = _resample_axis(rows, width, 1)
+    return np.clip(out + 0.5, 0, 255).astype(np.uint8)
+
+def read_pixels(image):
+    """Copy an image's pixels into a (height, width, channels) float32 array"""
+    import numpy as np
+    width, height = image.size
+    channels = image.channels
+    buffer = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(buffer)
+    return buffer.reshape(height, width, channels)
+
+def downscale(pixels, max_edge):
+    """Box-filter an image so its longest edge is at most max_edge pixels"""
+    height, width, channels = pixels.shape
+    factor = max(1, -(-max(height, width) // max(1, max_edge)))
+    if factor == 1:
+        return pixels
+
+    # Average rows first while the full-width view is still contiguous, then columns
+    out_h, out_w = height // factor, width // factor
+    rows = pixels[:out_h * factor].reshape(out_h, factor, width, channels).mean(axis=1)
+    return rows[:, :out_w * factor].reshape(out_h, out_w, factor, channels).mean(axis=2)
+
+def display_settings(scene, settings):
+    """The scene's view transform, exposure and gamma, or the add-on's own curve, for float previews"""
+    view = scene.view_settings
+    curve = settings.preview_tone_curve
+    if curve == 'SCENE':
+        from . import tonemap
+        curve = tonemap.curve_for_view(view.view_transform)
+    return Display(curve, view.exposure + settings.preview_exposure, view.gamma,
+                   settings.preview_layer.strip(), settings.preview_pass.strip())
+
+def to_display(pixels, is_float, display=STANDARD_DISPLAY):
+    """Turn Blender pixels (bottom row first, 0-1 or scene-linear floats) into top-down RGB uint8"""
+    import numpy as np
+    rgb = pixels[::-1, :, :3]
+    if is_float:
+        from . import tonemap
+        return tonemap.to_display(np.array(rgb, dtype=np.float32), display.curve, display.exposure, display.gamma)
+    return np.clip(rgb * 255.0 + 0.5, 0, 255).astype(np.uint8)
+
+def _image_has_pixels(image):
+    try:
+        return image is not None and image.has_data and image.size[0] > 0 and len(image.pixels) > 0
+    except Exception:
+        return False
+
+def preview_from_image(image, max_edge=DEFAULT_MAX_EDGE, display=STANDARD_DISPLAY):
+    """Downscaled display pixels for a Blender image datablock"""
+    pixels = downscale(read_pixels(image), max_edge)
+    return to_display(pixels, image.is_float, display)
+
+def preview_from_file(path, max_edge=DEFAULT_MAX_EDGE, display=STANDARD_DISPLAY):
+    """Downscaled display pixels for an image file, loaded and freed again"""
+    # Scanline EXRs are decoded here: any layer or pass, full float range, no bpy image
+    if path.lower().endswith(".exr"):
+        from . import exr, tonemap
+        rgb = exr.read_rgb(path, max_edge, display.layer, display.pass_name)
+        if rgb is not None:
+            return tonemap.to_display(rgb, display.curve, display.exposure, display.gamma)
+
+    image = bpy.data.images.load(path, check_existing=False)
+    try:
+        # Let Blender shrink its own buffer first: reading a full 8K frame into a float array takes 500 MB
+        width, height = image.size
+        factor = max(width, height) / max(1, max_edge)
+        if factor > 1:
+            image.scale(max(1, round(width / factor)), max(1, round(height / factor)))
+        return preview_from_image(image, max_edge, display)
+    finally:
+        bpy.data.images.remove(image)
+
+def _render_result_pixels(max_edge, display):
+    """Preview pixels for the latest render"""
+    # The compositor's Viewer Node keeps a readable copy of the composited frame
+    viewer = bpy.data.images.get("Viewer Node")
+    scene = bpy.context.scene
+    if scene.use_nodes and scene.render.use_compositing and _image_has_pixels(viewer):
+        print("📷 Reading preview from the Viewer Node")
+        return preview_from_image(viewer, max_edge, display)
+
+    result = bpy.data.images.get("Render Result")
+    if result is None or not result.has_data:
+        return None
+    if _image_has_pixels(result):
+        print("📷 Reading preview from the Render Result")
+        return preview_from_image(result, max_edge, display)
+
+    # Blender keeps Render Result pixels out of reach of Python, so in that case the
+    # frame is written once to a scratch file, read back as pixels and deleted
+    scratch_dir = bpy.utils.user_resource('DATAFILES', path="render_email_notifier", create=True)
+    extension = bpy.context.scene.render.file_extension or ".png"
+    path = os.path.join(scratch_dir, f"render_result{extension}")
+    print("📷 Reading preview from the Render Result via a scratch file")
+    result.save_render(path)
+    try:
+        return preview_from_file(path, max_edge, display)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def thumbnail(preview_image, max_edge):
+    """Small JPEG copy of a preview, e.g. for webhook payloads with tight size limits"""
+    width, height = preview_image.size
+    scale = max_edge / max(width, height)
+    pixels = preview_image.pixels
+    if scale < 1.0:
+        pixels = resample(pixels, max(1, round(width * scale)), max(1, round(height * scale)))
+    return RenderPreview(pixels, 'JPEG', DEFAULT_QUALITY)
+
+def make_preview(pixels, settings):
+    """Wrap display pixels in a RenderPreview using the add-on's encode settings"""
+    return RenderPreview(pixels, settings.preview_format, settings.preview_quality,
+                         settings.preview_max_kb * 1024)
+
+def capture_render_preview(settings, frame_path=None):
+    """Build a RenderPreview of the latest render using the add-on settings, or None"""
+    print("🖼️ Attempting to capture render preview...")
+    try:
+        with tracing.span("preview.capture"):
+            display = display_settings(bpy.context.scene, settings)
+            # A frame already written to the output folder also works without a UI (blender -b)
+            if frame_path is not None:
+                print(f"📷 Reading preview from {frame_path}")
+                pixels = preview_from_file(frame_path, settings.preview_max_size, display)
+            else:
+                pixels = _render_result_pixels(settings.preview_max_size, display)
+    except Exception as e:
+        print(f"⚠️ Could not capture render preview: {e}")
+        return None
+
+    if pixels is None:
+        print("📄 No render result available for a preview")
+        return None
+
+    preview = make_preview(pixels, settings)
+    print(f"✅ Preview captured at {preview.size[0]}x{preview.size[1]}")
+    return preview
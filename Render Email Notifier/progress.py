@@ -0,0 +1,155 @@
+import bpy
+import functools
+import os
+import time
+from collections import deque
+from . import headless, preview, telemetry
+
+# Opt-in progress digests for long animation renders. Frame callbacks only
+# bump a counter and compare a few numbers; when an update is due but the
+# hourly cap has been reached it stays pending and is merged into the next
+# digest that is allowed out. A due digest's text is fixed in the callback,
+# while reading back the thumbnail and sending happen in a timer, outside the
+# render_write handler.
+DEFAULT_EVERY_FRAMES = 100
+DEFAULT_EVERY_MINUTES = 60
+DEFAULT_MAX_PER_HOUR = 4
+THUMBNAIL_EDGE = 640
+
+class ProgressScheduler:
+    """Decides when a progress digest goes out, enforcing a hard per-hour cap"""
+
+    def __init__(self, every_frames, every_seconds, max_per_hour, now):
+        self.every_frames = every_frames
+        self.every_seconds = every_seconds
+        self.max_per_hour = max_per_hour
+        self.sent_times = deque()    # Send times within the last hour
+        self.last_due = now          # When the last update became due
+        self.frames_since = 0        # Frames finished since the last update became due
+        self.merged = 0              # Extra updates folded into the pending digest
+        self.pending = False
+
+    def _allowed(self, now):
+        while self.sent_times and now - self.sent_times[0] >= 3600:
+            self.sent_times.popleft()
+        return len(self.sent_times) < self.max_per_hour
+
+    def frame_done(self, now):
+        """Count a finished frame; returns True if a digest should be sent now (call sent() once it is)"""
+        self.frames_since += 1
+        due = ((self.every_frames and self.frames_since >= self.every_frames)
+               or (self.every_seconds and now - self.last_due >= self.every_seconds))
+        if due:
+            if self.pending:
+                self.merged += 1
+            self.pending = True
+            self.frames_since = 0
+            self.last_due = now
+        if not self.pending or not self._allowed(now):
+            return False
+
+        self.pending = False
+        return True
+
+    def sent(self, now):
+        """A digest went out; only those count against the hourly cap, not ones superseded before sending"""
+        self.sent_times.append(now)
+
+_scheduler = None      # ProgressScheduler for the render in progress
+_render_start = None   # time.time() when the render started
+_frames_done = 0
+_expected_frames = 0
+_digest_timer = None   # Pending timer that adds the thumbnail to a due digest and sends it
+
+def start(settings, expected_frames):
+    """Set up progress digests for a new render if they are enabled"""
+    global _scheduler, _render_start, _frames_done, _expected_frames
+
+    _scheduler = None
+    _frames_done = 0
+    _expected_frames = expected_frames
+    _render_start = time.time()
+    if not settings.progress_enabled or expected_frames < 2:
+        return
+    _scheduler = ProgressScheduler(settings.progress_every_frames,
+                                   settings.progress_every_minutes * 60,
+                                   settings.progress_max_per_hour,
+                                   _render_start)
+
+def stop():
+    global _scheduler, _digest_timer
+    _scheduler = None
+    # A digest still waiting for its timer is superseded by the completion or cancellation email
+    if _digest_timer is not None and bpy.app.timers.is_registered(_digest_timer):
+        bpy.app.timers.unregister(_digest_timer)
+    _digest_timer = None
+
+def _thumbnail(scene, frame):
+    """Small preview of a written frame, if it can be read back"""
+    render = scene.render
+    if render.is_movie_format:
+        return None
+    path = bpy.path.abspath(render.frame_path(frame=frame))
+    if not os.path.exists(path):
+        return None
+    settings = headless.get_settings(scene)
+    try:
+        pixels = preview.preview_from_file(path, min(THUMBNAIL_EDGE, settings.preview_max_size),
+                                         preview.display_settings(scene, settings))
+        return preview.make_preview(pixels, settings)
+    except Exception as e:
+        print(f"⚠️ Could not build progress thumbnail: {e}")
+        return None
+
+def build_digest(scene):
+    """Subject and body of a progress digest for the current state"""
+    elapsed = time.time() - _render_start
+    percent = 100.0 * _frames_done / max(1, _expected_frames)
+    throughput = _frames_done / (elapsed / 3600) if elapsed > 0 else 0.0
+
+    subject = f"⏳ Blender Render Progress: {_frames_done}/{_expected_frames} frames ({percent:.0f}%)"
+    body = f"""⏳ Render in progress
+- Frames Done: {_frames_done} of {_expected_frames} ({percent:.1f}%)
+- Elapsed: {time.strftime('%H:%M:%S', time.gmtime(elapsed))}
+- Throughput: {throughput:.1f} frames/hour
+- Last Frame: {scene.frame_current}
+"""
+    timings = telemetry.current()
+    if timings is not None and timings.count:
+        body += f"- Estimated Time Remaining: {telemetry.format_seconds(timings.eta())}\n"
+    if _scheduler.merged:
+        body += f"- Merged Updates: {_scheduler.merged + 1} (hourly limit of {_scheduler.max_per_hour} reached)\n"
+        _scheduler.merged = 0
+    return subject, body
+
+def frame_done(scene, send):
+    """Frame callback: count the frame and, when a digest is due, have it sent through send(subject, body, preview)"""
+    global _frames_done, _digest_timer
+
+    _frames_done += 1
+    if _scheduler is None or not _scheduler.frame_done(time.time()):
+        return
+
+    subject, body = build_digest(scene)
+    print(f"📈 Sending progress digest: {_frames_done}/{_expected_frames} frames")
+    if bpy.app.background:
+        # Timers only run once the render is over, and there is no UI to keep responsive
+        send(subject, body, _thumbnail(scene, scene.frame_current))
+        _scheduler.sent(time.time())
+        return
+    # Decoding a full resolution frame takes hundreds of milliseconds; leave it to a timer
+    if _digest_timer is not None and bpy.app.timers.is_registered(_digest_timer):
+        bpy.app.timers.unregister(_digest_timer)  # Superseded by this newer digest
+    _digest_timer = functools.partial(_send_digest, scene.name, scene.frame_current, subject, body, send)
+    bpy.app.timers.register(_digest_timer, first_interval=0.0)
+
+def _send_digest(scene_name, frame, subject, body, send):
+    """Timer callback: read back the thumbnail of a due digest and send it"""
+    global _digest_timer
+
+    _digest_timer = None
+    scene = bpy.data.scenes.get(scene_name)
+    send(subject, body, _thumbnail(scene, frame) if scene is not None else None)
+    if _scheduler is not None:
+        _scheduler.sent(time.time())
+    return None
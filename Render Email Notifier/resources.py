@@ -0,0 +1,289 @@
+import os
+import re
+import sys
+import threading
+import time
+import numpy as np
+from . import contact_sheet, encoders
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows
+
+# Machine load during a render, for capacity planning. A daemon thread reads
+# this process's memory and CPU time and Blender's render_stats memory every
+# few seconds into fixed preallocated arrays. When they fill up, neighbouring
+# slots are averaged together and each slot covers twice the time, so a
+# multi-day render costs the same memory as a short one. Peaks and averages
+# are kept over every reading, so downsampling never hides a spike.
+SAMPLE_INTERVAL = 2.0   # Seconds between readings
+CAPACITY = 512          # Chart slots kept (even, so slots pair up when compacting)
+SERIES = ('rss', 'cpu', 'render_mem', 'render_peak')
+RSS, CPU, RENDER_MEM, RENDER_PEAK = range(len(SERIES))
+
+CHART_WIDTH = 600
+PANEL_HEIGHT = 110      # Memory panel on top, CPU panel below
+CHART_GUTTER = 8
+CHART_NAME = "resource_usage.png"
+BACKGROUND = 255
+GRID = 228
+TEXT = 90
+COLOURS = {
+    RSS: (31, 119, 180),         # Blue: process memory
+    RENDER_MEM: (255, 127, 14),  # Orange: Blender's own memory figure
+    CPU: (44, 160, 44),          # Green: CPU use, drawn filled
+}
+
+# "Fra:12 Mem:285.89M (Peak 318.47M) | Time:..." - the first Mem is Blender's total
+_STATS_MEMORY = re.compile(r"Mem:\s*([\d.]+)([KMG])(?:\s*\(Peak\s*([\d.]+)([KMG])\))?")
+_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+class ResourceSamples:
+    """Fixed-size time series of resource readings that halves its resolution instead of growing"""
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity - capacity % 2
+        self.values = np.full((len(SERIES), self.capacity), np.nan)
+        self.times = np.zeros(self.capacity)   # Seconds since start at the end of each slot
+        self.count = 0                         # Filled slots
+        self.stride = 1                        # Readings averaged into one slot
+        self.readings = 0                      # Readings taken, over the whole render
+        self.peaks = np.full(len(SERIES), np.nan)
+        self.sums = np.zeros(len(SERIES))
+        self.counts = np.zeros(len(SERIES), dtype=np.int64)
+        self._slot_sums = np.zeros(len(SERIES))
+        self._slot_counts = np.zeros(len(SERIES), dtype=np.int64)
+        self._slot_readings = 0
+
+    def add(self, elapsed, reading):
+        """Record one reading (NaN where a value is unavailable)"""
+        reading = np.asarray(reading, dtype=np.float64)
+        valid = ~np.isnan(reading)
+        self.readings += 1
+        self.sums[valid] += reading[valid]
+        self.counts[valid] += 1
+        self.peaks = np.fmax(self.peaks, reading)
+        self._slot_sums[valid] += reading[valid]
+        self._slot_counts[valid] += 1
+        self._slot_readings += 1
+        if self._slot_readings < self.stride:
+            return
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.values[:, self.count] = np.where(self._slot_counts > 0, self._slot_sums / self._slot_counts, np.nan)
+        self.times[self.count] = elapsed
+        self.count += 1
+        self._slot_sums[:] = 0.0
+        self._slot_counts[:] = 0
+        self._slot_readings = 0
+        if self.count == self.capacity:
+            self._compact()
+
+    def _compact(self):
+        """Average neighbouring slots into the first half and double the time per slot"""
+        first, second = self.values[:, 0::2], self.values[:, 1::2]
+        merged = np.where(np.isnan(first), second, np.where(np.isnan(second), first, (first + second) / 2))
+        half = self.capacity // 2
+        self.values[:, :half] = merged
+        self.values[:, half:] = np.nan
+        self.times[:half] = self.times[1::2]
+        self.count = half
+        self.stride *= 2
+
+    def average(self, series):
+        return self.sums[series] / self.counts[series] if self.counts[series] else float('nan')
+
+    def series(self, index):
+        return self.values[index, :self.count]
+
+_samples = None         # ResourceSamples of the render in progress, or of the last one
+_stop = None            # threading.Event that ends the sampler thread
+_thread = None
+_stats_text = ""        # Latest render_stats line; parsed on the sampler thread
+
+def _rss_bytes():
+    """Resident memory of this process, or NaN where it cannot be read"""
+    try:
+        with open("/proc/self/statm", 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if sys.platform == 'win32':
+        return _windows_working_set()
+    if resource is not None:
+        # macOS has no cheap current-RSS call without extra modules; the peak is the closest figure
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return float('nan')
+
+def _windows_working_set():
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+
+    try:
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        kernel32.K32GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(Counters), wintypes.DWORD]
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        if kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    return float('nan')
+
+def parse_render_stats(text):
+    """(memory, peak) in bytes from a render_stats line; NaN where missing"""
+    match = _STATS_MEMORY.search(text or "")
+    if match is None:
+        return float('nan'), float('nan')
+    memory = float(match.group(1)) * _UNITS[match.group(2)]
+    peak = float(match.group(3)) * _UNITS[match.group(4)] if match.group(3) else float('nan')
+    return memory, peak
+
+def _run(samples, stop):
+    cores = os.cpu_count() or 1
+    started = time.monotonic()
+    last_wall, last_cpu = started, time.process_time()
+    while True:
+        stopping = stop.wait(SAMPLE_INTERVAL)
+        now, cpu = time.monotonic(), time.process_time()
+        # process_time() covers every thread of the process, so render threads count too
+        percent = 100.0 * (cpu - last_cpu) / max(now - last_wall, 1e-6) / cores
+        last_wall, last_cpu = now, cpu
+        memory, peak = parse_render_stats(_stats_text)
+        samples.add(now - started, (_rss_bytes(), min(percent, 100.0), memory, peak))
+        if stopping:
+            return
+
+def start():
+    """Start sampling for a new render"""
+    global _samples, _stop, _thread, _stats_text
+    stop()
+    _stats_text = ""
+    _samples = ResourceSamples()
+    _stop = threading.Event()
+    _thread = threading.Thread(target=_run, args=(_samples, _stop), name="RenderMailBotResources", daemon=True)
+    _thread.start()
+
+def render_stats(text):
+    """render_stats handler hook; only keeps the text, parsing happens on the sampler thread"""
+    global _stats_text
+    _stats_text = text
+
+def stop():
+    """Stop the sampler after one last reading; the samples stay available for the report"""
+    global _stop, _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join(timeout=1.0)
+    _stop = _thread = None
+
+def _format_bytes(value):
+    return f"{value / 1024 ** 3:.2f} GB" if value >= 1024 ** 3 else f"{value / 1024 ** 2:.0f} MB"
+
+def report_lines():
+    """Peak and average lines for the notification body"""
+    samples = _samples
+    if samples is None or not samples.readings:
+        return []
+    lines = []
+    if samples.counts[RSS]:
+        lines.append(f"- Process Memory: peak {_format_bytes(samples.peaks[RSS])}, "
+                     f"average {_format_bytes(samples.average(RSS))}")
+    if samples.counts[RENDER_MEM]:
+        peak = np.fmax(samples.peaks[RENDER_MEM], samples.peaks[RENDER_PEAK])
+        lines.append(f"- Blender Render Memory: peak {_format_bytes(peak)}, "
+                     f"average {_format_bytes(samples.average(RENDER_MEM))}")
+    if samples.counts[CPU]:
+        lines.append(f"- CPU Use: peak {samples.peaks[CPU]:.0f}%, average {samples.average(CPU):.0f}% "
+                     f"of {os.cpu_count() or 1} cores")
+    lines.append(f"- Resource Samples: {samples.readings} every {SAMPLE_INTERVAL:g}s")
+    if samples.count >= 2:
+        lines.append("- Resource Chart: process memory (blue) and Blender render memory (orange) on top, "
+                     "CPU use (green) below")
+    return lines
+
+def _nice_ceiling(value):
+    """Round an axis maximum up to 1, 2 or 5 times a power of ten"""
+    if not value > 0:
+        return 1.0
+    power = 10 ** np.floor(np.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * power:
+            return step * power
+    return 10 * power
+
+def _draw_series(panel, values, top, colour, filled=False):
+    """Draw one series across a panel as a 2 px line (and optionally a tinted area); NaN leaves gaps"""
+    height, width = panel.shape[:2]
+    count = len(values)
+    if count == 0:
+        return
+    positions = np.linspace(0, width - 1, count) if count > 1 else np.zeros(1)
+    columns = np.arange(width)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return
+    # Columns take the value interpolated between their neighbouring slots, gaps from the nearest slot
+    y = np.interp(columns, positions[valid], values[valid])
+    nearest = np.clip(np.rint(columns * (count - 1) / max(1, width - 1)).astype(np.intp), 0, count - 1)
+    shown = valid[nearest] & (columns <= positions[-1])
+    rows = (height - 1) * (1.0 - np.clip(y / top, 0.0, 1.0))
+
+    grid = np.arange(height)[:, None]
+    if filled:
+        tint = np.array(colour) * 0.35 + BACKGROUND * 0.65
+        panel[(grid >= rows[None, :]) & shown[None, :]] = tint.astype(np.uint8)
+    previous = np.r_[rows[0], rows[:-1]]
+    low = np.floor(np.minimum(rows, previous))
+    high = np.ceil(np.maximum(rows, previous)) + 1
+    panel[(grid >= low[None, :]) & (grid <= high[None, :]) & shown[None, :]] = colour
+
+def _panel(values_and_colours, top, label):
+    panel = np.full((PANEL_HEIGHT, CHART_WIDTH, 3), BACKGROUND, dtype=np.uint8)
+    for fraction in (0.25, 0.5, 0.75):
+        panel[round((PANEL_HEIGHT - 1) * fraction)] = GRID
+    for values, colour, filled in values_and_colours:
+        _draw_series(panel, values, top, colour, filled)
+    panel[[0, -1]] = GRID
+    panel[:, [0, -1]] = GRID
+    contact_sheet.stamp_text(panel, 3, 3, label, TEXT, scale=2)
+    return panel
+
+def chart_png():
+    """PNG time-series of memory (top) and CPU use (bottom) for the last render, or None"""
+    samples = _samples
+    if samples is None or samples.count < 2:
+        return None
+    rss = samples.series(RSS) / 1024 ** 3
+    render_mem = samples.series(RENDER_MEM) / 1024 ** 3
+    memory_top = _nice_ceiling(np.nanmax(np.r_[rss, render_mem, 0.0]))
+    memory = _panel([(rss, COLOURS[RSS], False), (render_mem, COLOURS[RENDER_MEM], False)],
+                    memory_top, f"{memory_top:g}GB")
+    cpu = _panel([(samples.series(CPU), COLOURS[CPU], True)], 100.0, "100%")
+
+    elapsed = int(samples.times[samples.count - 1])
+    footer = np.full((CHART_GUTTER + 14, CHART_WIDTH, 3), BACKGROUND, dtype=np.uint8)
+    duration = f"{elapsed // 3600}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}"
+    contact_sheet.stamp_text(footer, CHART_GUTTER, 2, "0:00:00", TEXT, scale=2)
+    contact_sheet.stamp_text(footer, CHART_GUTTER, CHART_WIDTH - 2 - len(duration) * 8, duration, TEXT, scale=2)
+    gutter = np.full((CHART_GUTTER, CHART_WIDTH, 3), BACKGROUND, dtype=np.uint8)
+    return encoders.encode_png(np.concatenate([memory, gutter, cpu, footer]))
+
+def chart_attachments():
+    """[(filename, PNG bytes)] to attach inline, empty if there is nothing worth charting"""
+    try:
+        data = chart_png()
+    except Exception as e:
+        print(f"⚠️ Could not draw the resource chart: {e}")
+        return []
+    return [(CHART_NAME, data)] if data is not None else []
@@ -0,0 +1,110 @@
+import threading
+from . import tracing
+
+# Recipient routing: addresses are normalized and deduplicated once when the
+# message is built, then split into envelopes no larger than the relay's
+# per-message recipient limit. Envelopes are sent in parallel over pooled SMTP
+# sessions, and a failed envelope does not stop the others.
+MAX_PARALLEL_ENVELOPES = 4      # Matches the idle sessions the SMTP pool keeps per account
+UNDISCLOSED_RECIPIENTS = "undisclosed-recipients:;"
+
+def normalize_address(raw):
+    """Bare address with a lower-case domain, or None if it does not look like an email address"""
+    from email.utils import parseaddr
+    _, address = parseaddr(raw.strip())
+    local, at, domain = address.rpartition('@')
+    if not at or not local or not domain or any(c.isspace() for c in address):
+        return None
+    return f"{local}@{domain.lower()}"
+
+def normalize_recipients(raw_addresses):
+    """Normalize and deduplicate (case-insensitively) a list of addresses; returns (valid, invalid)"""
+    valid, invalid = [], []
+    seen = set()
+    for raw in raw_addresses:
+        if not raw.strip():
+            continue
+        address = normalize_address(raw)
+        if address is None:
+            invalid.append(raw.strip())
+        elif address.lower() not in seen:
+            seen.add(address.lower())
+            valid.append(address)
+    return valid, invalid
+
+def address_headers(recipients):
+    """To/Bcc headers: a single recipient is addressed directly, larger lists are kept in Bcc"""
+    if len(recipients) == 1:
+        return {'To': recipients[0]}
+    return {'To': UNDISCLOSED_RECIPIENTS, 'Bcc': ", ".join(recipients)}
+
+def envelope_recipients(msg):
+    """Every address a message is meant for, from its To, Cc and Bcc headers"""
+    from email.utils import getaddresses
+    fields = [str(msg[header]) for header in ('To', 'Cc', 'Bcc') if msg[header] is not None]
+    return normalize_recipients(address for _, address in getaddresses(fields))[0]
+
+def parse_recipients(text):
+    """Addresses from a comma separated list, e.g. outbox metadata"""
+    from email.utils import getaddresses
+    return normalize_recipients(address for _, address in getaddresses([text]))[0]
+
+def split_envelopes(recipients, max_per_envelope):
+    """Chunks of at most max_per_envelope addresses"""
+    size = max(1, max_per_envelope)
+    return [recipients[i:i + size] for i in range(0, len(recipients), size)]
+
+class FanoutResult:
+    """Outcome of sending one message to a list of recipients"""
+
+    def __init__(self, recipients, envelopes):
+        self.recipients = recipients
+        self.envelopes = envelopes
+        self.failed = {}    # Address -> exception or server reply for recipients that did not get it
+        self._lock = threading.Lock()
+
+    def fail(self, addresses, error):
+        with self._lock:
+            for address in addresses:
+                self.failed[address] = error
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    @property
+    def delivered(self):
+        return [address for address in self.recipients if address not in self.failed]
+
+    def first_error(self):
+        return next(iter(self.failed.values()), None)
+
+def fan_out(pool, server, sender, password, msg, recipients):
+    """Send msg to every recipient in envelopes of at most server.max_recipients, in parallel"""
+    envelopes = split_envelopes(recipients, server.max_recipients)
+    result = FanoutResult(recipients, len(envelopes))
+
+    def send_envelope(envelope):
+        try:
+            with tracing.span("smtp.envelope", recipients=len(envelope)):
+                refused = pool.send(server, sender, password, msg, to_addrs=envelope)
+        except Exception as e:
+            print(f"⚠️ Envelope of {len(envelope)} recipient(s) failed: {e}")
+            result.fail(envelope, e)
+            return
+        # The server accepted the message but turned some recipients down
+        for address, reply in (refused or {}).items():
+            result.fail([address], reply)
+
+    if len(envelopes) == 1:
+        send_envelope(envelopes[0])
+        return result
+
+    # Flatten once up front so MIME boundaries are fixed before the threads serialize the message
+    msg.as_bytes()
+    print(f"📨 Sending to {len(recipients)} recipients in {len(envelopes)} envelopes")
+    from concurrent.futures import ThreadPoolExecutor
+    workers = min(MAX_PARALLEL_ENVELOPES, len(envelopes))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="RenderMailBotFanout") as executor:
+        list(executor.map(send_envelope, envelopes))
+    return result
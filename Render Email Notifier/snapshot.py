@@ -0,0 +1,52 @@
+from collections import namedtuple
+from . import channels, headless, routing, transport
+
+# Resolved delivery settings. Reading the recipient list, the server and the
+# channel settings goes through RNA, so it is done once and the result is kept
+# until a setting changes: the update callbacks on RenderMailBotProperties and
+# the recipient list operators call invalidate(), and so do loading a file and
+# undo, which change the data without calling them. Each render job keeps the
+# snapshot of its own scene from when it started (RenderJob.delivery) and its
+# completion or cancellation email is sent with that, whichever scene is active
+# by then; sends hand the same immutable object to the delivery worker, so
+# worker threads never read bpy data.
+DeliverySettings = namedtuple('DeliverySettings', [
+    'sender', 'password',
+    'recipients',   # Normalized, deduplicated addresses (tuple)
+    'error',        # Why no email can be addressed (no recipients), or None
+    'server',       # transport.SMTPServer
+    'targets',      # ((channel, channel config), ...) for every enabled, correctly configured channel
+])
+
+_cache = {}       # Scene name -> DeliverySettings; main thread only
+_generation = 0   # Bumped by invalidate(), so copies of the settings kept elsewhere can tell they are stale
+
+def _build(settings):
+    sender = settings.sender
+    error = None
+    if settings.send_myself:
+        recipients = [sender]
+    else:
+        recipients, invalid = routing.normalize_recipients(recipient.name for recipient in settings.recipients)
+        if invalid:
+            print(f"⚠️ Skipping invalid recipient(s): {', '.join(invalid)}")
+        if not recipients:
+            error = "Error: No recipients found. Please add at least one recipient or enable 'Send to myself' option."
+    return DeliverySettings(sender, settings.password, tuple(recipients), error,
+                            transport.server_from_settings(settings), tuple(channels.configured(settings)))
+
+def resolve(scene):
+    """The delivery settings of a scene (with command-line/environment overrides), read again only after a change"""
+    resolved = _cache.get(scene.name)
+    if resolved is None:
+        resolved = _cache[scene.name] = _build(headless.get_settings(scene))
+    return resolved
+
+def generation():
+    return _generation
+
+def invalidate():
+    """Forget every snapshot; the next send reads the settings again"""
+    global _generation
+    _cache.clear()
+    _generation += 1
@@ -0,0 +1,116 @@
+import heapq
+import time
+
+# Per-frame render timing. render_pre/render_post only store a timestamp and
+# one number per frame in preallocated arrays; statistics are computed when
+# a notification is built. NumPy is imported when the first render starts,
+# not when the add-on loads.
+RING_CAPACITY = 4096   # Recent frames kept for percentiles
+ETA_WINDOW = 10        # Recent frames averaged for the time remaining estimate
+SLOWEST_COUNT = 3      # Slowest frames listed in the email
+
+class FrameTimings:
+    """Fixed-size ring buffer of frame numbers and durations for one render"""
+
+    def __init__(self, expected_frames=0, capacity=RING_CAPACITY):
+        import numpy as np
+        self.frames = np.zeros(capacity, dtype=np.int32)
+        self.durations = np.zeros(capacity, dtype=np.float64)
+        self.capacity = capacity
+        self.expected_frames = expected_frames
+        self.count = 0           # Frames recorded, including ones overwritten in the ring
+        self.total_time = 0.0    # Sum over every recorded frame
+        self.slowest = []        # Min-heap of (seconds, frame), SLOWEST_COUNT long
+
+    def record(self, frame, seconds):
+        index = self.count % self.capacity
+        self.frames[index] = frame
+        self.durations[index] = seconds
+        self.count += 1
+        self.total_time += seconds
+        if len(self.slowest) < SLOWEST_COUNT:
+            heapq.heappush(self.slowest, (seconds, frame))
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, frame))
+
+    def _recent(self, count):
+        """Durations of the last count frames, oldest first"""
+        count = min(count, self.count, self.capacity)
+        end = self.count % self.capacity
+        if count <= end:
+            return self.durations[end - count:end]
+        import numpy as np
+        return np.concatenate([self.durations[self.capacity - (count - end):], self.durations[:end]])
+
+    def eta(self):
+        """Seconds left for the remaining frames, from the average of the most recent ones"""
+        if self.count == 0 or self.expected_frames <= self.count:
+            return 0.0
+        return float(self._recent(ETA_WINDOW).mean()) * (self.expected_frames - self.count)
+
+    def stats(self):
+        """Summary statistics, or None if no frame finished yet"""
+        if self.count == 0:
+            return None
+        import numpy as np
+        window = self._recent(self.capacity)
+        p50, p95 = np.percentile(window, [50, 95])
+        return {
+            'frames': self.count,
+            'mean': self.total_time / self.count,
+            'p50': float(p50),
+            'p95': float(p95),
+            'max': max(self.slowest)[0],
+            'slowest': [(frame, seconds) for seconds, frame in sorted(self.slowest, reverse=True)],
+            'eta': self.eta(),
+        }
+
+_timings = None        # FrameTimings for the render in progress
+_frame_started = None  # perf_counter() at the last render_pre
+
+def format_seconds(seconds):
+    """Short human readable duration"""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    return time.strftime('%H:%M:%S', time.gmtime(seconds))
+
+def start(expected_frames):
+    """Reset timings for a new render"""
+    global _timings, _frame_started
+    _timings = FrameTimings(expected_frames)
+    _frame_started = None
+
+def frame_started():
+    global _frame_started
+    _frame_started = time.perf_counter()
+
+def frame_finished(frame):
+    """Record the frame that just finished; returns its duration in seconds, or None"""
+    global _frame_started
+    if _timings is None or _frame_started is None:
+        return None
+    seconds = time.perf_counter() - _frame_started
+    _timings.record(frame, seconds)
+    _frame_started = None
+    return seconds
+
+def current():
+    """FrameTimings of the render in progress, or None"""
+    return _timings
+
+def report_lines():
+    """Timing lines for the notification body"""
+    stats = _timings.stats() if _timings is not None else None
+    if stats is None or stats['frames'] < 2:
+        return []
+
+    slowest = ", ".join(f"{frame} ({format_seconds(seconds)})" for frame, seconds in stats['slowest'])
+    lines = [
+        f"- Frames Rendered: {stats['frames']}",
+        f"- Frame Time: mean {format_seconds(stats['mean'])}, p50 {format_seconds(stats['p50'])}, "
+        f"p95 {format_seconds(stats['p95'])}, max {format_seconds(stats['max'])}",
+        f"- Slowest Frames: {slowest}",
+    ]
+    if stats['eta'] > 0:
+        lines.append(f"- Estimated Time Remaining: {format_seconds(stats['eta'])}")
+    return lines
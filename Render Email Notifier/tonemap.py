@@ -0,0 +1,95 @@
+import numpy as np
+
+# Display transforms for float renders. Previews of EXR output and float
+# render buffers start as scene-linear values that can go far above 1.0, so
+# clipping them through plain sRGB gives flat, blown-out thumbnails. These
+# approximate Blender's view transforms with a handful of NumPy operations on
+# the already downscaled preview, mostly in place to keep 8K sources cheap.
+VIEW_TRANSFORMS = {
+    # Blender view transform -> curve; anything else is shown as Standard
+    'Standard': 'STANDARD',
+    'Filmic': 'FILMIC',
+    'Filmic Log': 'FILMIC',
+    'AgX': 'AGX',
+    'Raw': 'RAW',
+}
+HALF_MAX = 65504.0
+
+# ACES filmic fit (Narkowicz 2015), applied before the sRGB transfer function
+FILMIC_PRESCALE = 0.6
+FILMIC_A, FILMIC_B, FILMIC_C, FILMIC_D, FILMIC_E = 2.51, 0.03, 2.43, 0.59, 0.14
+
+# AgX: inset the primaries, encode log2 exposure between these stops, apply a
+# polynomial fit of the sigmoid (highest power first) and outset again
+AGX_MIN_EV = -12.47393
+AGX_MAX_EV = 4.026069
+AGX_INSET = np.array([[0.842479062253094, 0.0423282422610123, 0.0423756549057051],
+                      [0.0784335999999992, 0.878468636469772, 0.0784336],
+                      [0.0792237451477643, 0.0791661274605434, 0.879142973793104]], dtype=np.float32)
+AGX_OUTSET = np.array([[1.19687900512017, -0.0528968517574562, -0.0529716355144438],
+                       [-0.0980208811401368, 1.15190312990417, -0.0980434501171241],
+                       [-0.0990297440797205, -0.0989611768448433, 1.15107367264116]], dtype=np.float32)
+AGX_SIGMOID = (15.5, -40.14, 31.96, -6.868, 0.4298, 0.1191, -0.00232)
+
+def curve_for_view(view_transform):
+    return VIEW_TRANSFORMS.get(view_transform, 'STANDARD')
+
+def srgb_encode(values):
+    """sRGB transfer function for linear values in 0-1, in place"""
+    low = values <= 0.0031308
+    linear_part = values[low] * 12.92
+    np.power(values, 1 / 2.4, out=values)
+    values *= 1.055
+    values -= 0.055
+    values[low] = linear_part
+    return values
+
+def filmic(rgb):
+    """ACES-style filmic shoulder, then sRGB, in place"""
+    rgb *= FILMIC_PRESCALE
+    denominator = rgb * FILMIC_C
+    denominator += FILMIC_D
+    denominator *= rgb
+    denominator += FILMIC_E
+    numerator = rgb
+    numerator *= rgb * FILMIC_A + FILMIC_B
+    numerator /= denominator
+    np.clip(numerator, 0.0, 1.0, out=numerator)
+    return srgb_encode(numerator)
+
+def agx(rgb):
+    """AgX-style base look; the result is already display encoded"""
+    encoded = rgb @ AGX_INSET
+    np.maximum(encoded, 1e-10, out=encoded)
+    np.log2(encoded, out=encoded)
+    encoded -= AGX_MIN_EV
+    encoded /= AGX_MAX_EV - AGX_MIN_EV
+    np.clip(encoded, 0.0, 1.0, out=encoded)
+
+    # Horner's rule, reusing one buffer
+    curve = np.full_like(encoded, AGX_SIGMOID[0])
+    for coefficient in AGX_SIGMOID[1:]:
+        curve *= encoded
+        curve += coefficient
+    return curve @ AGX_OUTSET
+
+def to_display(rgb, curve='STANDARD', exposure=0.0, gamma=1.0):
+    """Map scene-linear float32 RGB to display uint8; rgb is used as scratch space"""
+    np.nan_to_num(rgb, copy=False, nan=0.0, posinf=HALF_MAX, neginf=0.0)
+    np.maximum(rgb, 0.0, out=rgb)
+    if exposure:
+        rgb *= np.float32(2.0 ** exposure)
+
+    if curve == 'FILMIC':
+        rgb = filmic(rgb)
+    elif curve == 'AGX':
+        rgb = agx(rgb)
+    elif curve == 'STANDARD':
+        np.minimum(rgb, 1.0, out=rgb)
+        rgb = srgb_encode(rgb)
+    np.clip(rgb, 0.0, 1.0, out=rgb)
+    if gamma != 1.0:
+        np.power(rgb, 1.0 / gamma, out=rgb)
+    rgb *= 255.0
+    rgb += 0.5
+    return rgb.astype(np.uint8)
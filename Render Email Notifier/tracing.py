@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Stage timings for the notification pipeline. Each stage runs inside a span;
+# finished spans update in-memory counters and a latency histogram and are
+# appended as JSON lines to a rotating log in the add-on's data folder. When
+# tracing is off span() hands back a shared no-op object, so instrumented code
+# pays for one flag check.
+LOG_NAME = "timings.jsonl"
+LOG_MAX_BYTES = 1024 * 1024   # Rotate the log at 1 MB
+LOG_BACKUPS = 3               # timings.jsonl.1 .. .3 are kept
+
+# Histogram bucket upper bounds in milliseconds; one more bucket collects everything slower
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+_enabled = False    # Mirrors the Stage Timings setting; read on every span()
+_logger = None      # JSON lines logger, created the first time tracing is enabled
+_log_path = None
+_stats = {}         # Stage name -> StageStats
+_lock = threading.Lock()
+
+class StageStats:
+    """Counters and a fixed-bucket latency histogram for one stage"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms, ok):
+        self.count += 1
+        self.errors += 0 if ok else 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples (capped at the max)"""
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(BUCKETS_MS[index], self.max_ms) if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+class Span:
+    """Times one stage of the pipeline; use as a context manager"""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.start = None
+
+    def set(self, **fields):
+        """Attach extra fields to the record, e.g. sizes known only at the end"""
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.name, (time.perf_counter() - self.start) * 1000.0, exc_type, self.fields)
+        return False
+
+class _NullSpan:
+    """Stand-in returned while tracing is off"""
+
+    def set(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name, **fields):
+    """Time a stage: with tracing.span("smtp.login"): ..."""
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, fields)
+
+def _record(name, ms, exc_type, fields):
+    ok = exc_type is None
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = StageStats()
+        stats.add(ms, ok)
+
+    if _logger is None:
+        return
+    record = {
+        'ts': round(time.time(), 3),
+        'stage': name,
+        'ms': round(ms, 3),
+        'ok': ok,
+        'thread': threading.current_thread().name,
+    }
+    if not ok:
+        record['error'] = exc_type.__name__
+    record.update(fields)
+    try:
+        _logger.info(json.dumps(record, ensure_ascii=False, default=str))
+    except Exception as e:
+        print(f"⚠️ Failed to write timing record: {e}")
+
+def _open_log():
+    """Create the rotating JSON lines log in the add-on data folder (main thread only)"""
+    global _logger, _log_path
+
+    import bpy  # Imported here so the farm aggregator can use spans outside Blender
+    import logging
+    from logging.handlers import RotatingFileHandler
+    base_dir = bpy.utils.user_resource('DATAFILES', path="render_email_notifier", create=True)
+    _log_path = os.path.join(base_dir, LOG_NAME)
+    handler = RotatingFileHandler(_log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                  encoding='utf-8', delay=True)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("render_email_notifier.timings")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    _logger = logger
+
+def set_enabled(enabled):
+    """Turn tracing on or off; called from the main thread"""
+    global _enabled
+
+    enabled = bool(enabled)
+    if enabled == _enabled:
+        return
+    if enabled and _logger is None:
+        try:
+            _open_log()
+        except Exception as e:
+            print(f"⚠️ Stage timings will not be logged to disk: {e}")
+    _enabled = enabled
+    print(f"⏱️ Stage timings {'enabled' if enabled else 'disabled'}")
+
+def is_enabled():
+    return _enabled
+
+def log_path():
+    return _log_path
+
+def snapshot():
+    """Per-stage summaries sorted by total time: list of (name, count, errors, mean, p95, max) in ms"""
+    with _lock:
+        items = sorted(_stats.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return [(name, s.count, s.errors, s.mean_ms, s.percentile(0.95), s.max_ms) for name, s in items]
+
+def report_lines():
+    """Human readable stage summary for the panel and the console"""
+    return [f"{name}: {count}x, avg {mean:.1f} ms, p95 ≤{p95:.1f} ms, max {peak:.1f} ms"
+            + (f", {errors} failed" if errors else "")
+            for name, count, errors, mean, p95, peak in snapshot()]
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+def shutdown():
+    """Stop tracing and close the log file"""
+    global _enabled, _logger
+
+    _enabled = False
+    if _logger is not None:
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+            handler.close()
+        _logger = None
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import namedtuple
+from . import tracing
+
+# SMTP transport: authenticated sessions are kept open and reused across
+# sends, so a burst of notifications pays for the TLS handshake and login once.
+# smtplib and ssl are only imported when the first session is opened, so
+# registering the add-on does not load them.
+IDLE_TIMEOUT = 120.0     # Close sessions that have not been used for this long
+NOOP_AFTER = 15.0        # Check sessions idle for longer than this with NOOP before reuse
+CONNECT_TIMEOUT = 30.0   # Socket timeout for connecting and talking to the server
+MAX_IDLE_SESSIONS = 4    # Upper bound on sessions kept open per server/account
+DEFAULT_MAX_RECIPIENTS = 50  # Recipients per message; many relays (e.g. Amazon SES) refuse more
+
+SECURITY_MODES = ('SSL', 'STARTTLS', 'NONE')
+DEFAULT_PORTS = {'SSL': 465, 'STARTTLS': 587, 'NONE': 25}
+
+# Where and how to connect; plain data so it can be handed to worker threads
+SMTPServer = namedtuple('SMTPServer', ['host', 'port', 'security', 'max_recipients'],
+                        defaults=(DEFAULT_MAX_RECIPIENTS,))
+GMAIL_SERVER = SMTPServer('smtp.gmail.com', 465, 'SSL')
+
+_tls_context = None  # ssl.SSLContext shared by every session, built on the first TLS connection
+
+def tls_context():
+    """The default TLS context; loading the system CA certificates is slow, so it is done once"""
+    global _tls_context
+    if _tls_context is None:
+        import ssl
+        _tls_context = ssl.create_default_context()
+    return _tls_context
+
+def disconnect_errors():
+    """Errors that mean the connection itself is gone rather than the message being refused"""
+    import smtplib
+    return smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError
+
+def server_from_settings(settings):
+    """Read the SMTP server from RenderMailBotProperties (main thread only)"""
+    host = settings.smtp_host.strip() or GMAIL_SERVER.host
+    security = settings.smtp_security if settings.smtp_security in SECURITY_MODES else 'SSL'
+    port = settings.smtp_port or DEFAULT_PORTS[security]
+    return SMTPServer(host, port, security, max(1, settings.smtp_max_recipients))
+
+class SMTPSessionPool:
+    """Keeps authenticated SMTP sessions alive and hands them out to senders"""
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, noop_after=NOOP_AFTER):
+        self.idle_timeout = idle_timeout
+        self.noop_after = noop_after
+        self._idle = {}  # (server, sender) -> list of [smtp, password, last_used]
+        self._lock = threading.Lock()
+
+    def _connect(self, server, sender, password):
+        """Open a new session and log in"""
+        import smtplib
+        print(f"🔌 Connecting to SMTP server {server.host}:{server.port} ({server.security})...")
+        with tracing.span("smtp.connect", host=server.host, security=server.security):
+            if server.security == 'SSL':
+                smtp = smtplib.SMTP_SSL(server.host, server.port, timeout=CONNECT_TIMEOUT,
+                                        context=tls_context())
+            else:
+                smtp = smtplib.SMTP(server.host, server.port, timeout=CONNECT_TIMEOUT)
+                if server.security == 'STARTTLS':
+                    smtp.starttls(context=tls_context())
+
+        try:
+            if password:
+                print("🔑 Attempting login...")
+                with tracing.span("smtp.login"):
+                    smtp.login(sender, password)
+                print("✅ Login successful")
+        except Exception:
+            _close_quietly(smtp)
+            raise
+        return smtp
+
+    def _is_alive(self, smtp):
+        try:
+            with tracing.span("smtp.noop"):
+                return smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _reap(self, now):
+        """Drop sessions that have been idle too long; caller holds the lock"""
+        stale = []
+        for key, sessions in list(self._idle.items()):
+            fresh = [s for s in sessions if now - s[2] < self.idle_timeout]
+            stale.extend(s[0] for s in sessions if now - s[2] >= self.idle_timeout)
+            if fresh:
+                self._idle[key] = fresh
+            else:
+                del self._idle[key]
+        return stale
+
+    def _acquire(self, server, sender, password):
+        """Reuse an idle session when possible, otherwise open a new one; returns (smtp, reused)"""
+        now = time.monotonic()
+        with self._lock:
+            stale = self._reap(now)
+            session = None
+            sessions = self._idle.get((server, sender), [])
+            while sessions:
+                candidate = sessions.pop()
+                if candidate[1] == password:
+                    session = candidate
+                    break
+                stale.append(candidate[0])  # Password changed since the session was opened
+
+        for smtp in stale:
+            _close_quietly(smtp)
+
+        if session is not None:
+            smtp, _, last_used = session
+            if now - last_used < self.noop_after or self._is_alive(smtp):
+                return smtp, True
+            print("🔄 Pooled SMTP session went stale - reconnecting")
+            _close_quietly(smtp)
+        return self._connect(server, sender, password), False
+
+    def _release(self, server, sender, password, smtp):
+        with self._lock:
+            sessions = self._idle.setdefault((server, sender), [])
+            if len(sessions) < MAX_IDLE_SESSIONS:
+                sessions.append([smtp, password, time.monotonic()])
+                return
+        _close_quietly(smtp)
+
+    def _send_on(self, smtp, server, sender, password, msg, to_addrs):
+        """Send over one session and return it to the pool unless the connection broke; returns refused recipients"""
+        import smtplib
+        try:
+            with tracing.span("smtp.send"):
+                refused = smtp.send_message(msg, to_addrs=to_addrs)
+        except disconnect_errors():
+            _close_quietly(smtp)
+            raise
+        except smtplib.SMTPException:
+            # Recipient or data errors leave the session usable
+            self._release(server, sender, password, smtp)
+            raise
+        except Exception:
+            _close_quietly(smtp)
+            raise
+        self._release(server, sender, password, smtp)
+        return refused
+
+    def send(self, server, sender, password, msg, to_addrs=None):
+        """Send a message over a pooled session, reconnecting once if the session was dropped
+
+        Returns a dict of the recipients the server refused (empty if everyone was accepted).
+        """
+        smtp, reused = self._acquire(server, sender, password)
+        print("📤 Sending message...")
+        try:
+            return self._send_on(smtp, server, sender, password, msg, to_addrs)
+        except disconnect_errors() as e:
+            if not reused:
+                raise
+            # The server may have timed out a pooled session between our check and the send
+            print(f"🔄 Pooled SMTP session dropped ({e}) - reconnecting")
+            smtp = self._connect(server, sender, password)
+            return self._send_on(smtp, server, sender, password, msg, to_addrs)
+
+    def close_all(self):
+        """Close every idle session"""
+        with self._lock:
+            sessions = [s[0] for group in self._idle.values() for s in group]
+            self._idle.clear()
+        for smtp in sessions:
+            _close_quietly(smtp)
+
+def _close_quietly(smtp):
+    try:
+        smtp.close()
+    except Exception:
+        pass
+
+# Shared pool used by the delivery worker
+smtp_pool = SMTPSessionPool()
@@ -1,10 +1,11 @@
 import bpy
-from . import notifier_core
+from . import channels, contact_sheet, notifier_core, preview, progress, snapshot, tracing, transport, watchdog
 from bpy.types import Panel, Operator
-from bpy.props import StringProperty, BoolProperty, CollectionProperty, PointerProperty
+from bpy.props import StringProperty, BoolProperty, CollectionProperty, PointerProperty, IntProperty, EnumProperty, FloatProperty
 
 # Email checking function
 def validate_email(self, context):
+    snapshot.invalidate()
     email = self.sender
     if email and ('@' not in email or '.' not in email):
         self.sender = ""  # Delete invalid email
@@ -15,17 +16,32 @@ def validate_email(self, context):
         except:
             pass  # If the operator is not registered
 
+# Sends reuse the resolved delivery settings, so any change to them has to drop the snapshot
+def update_delivery_settings(self, context):
+    snapshot.invalidate()
+
 # Class to store recipient email
 class RecipientItem(bpy.types.PropertyGroup):
     name: StringProperty(
         name="Email",
         description="Recipient's email",
-        default=""
+        default="",
+        update=update_delivery_settings
     )
 
 # Update when 'Send Myself' toggle changes - no need to modify list
 def update_send_myself(self, context):
-    pass  # Processing logic in get_email_info() function
+    snapshot.invalidate()  # The recipients are resolved again on the next send
+
+# Keep the port in step with the security mode unless the user picked a custom one
+def update_smtp_security(self, context):
+    snapshot.invalidate()
+    if self.smtp_port in transport.DEFAULT_PORTS.values():
+        self.smtp_port = transport.DEFAULT_PORTS[self.smtp_security]
+
+# Stage timings start or stop being recorded as soon as the option is toggled
+def update_stage_timings(self, context):
+    tracing.set_enabled(self.stage_timings)
 
 class RenderMailBotProperties(bpy.types.PropertyGroup):
     sender: StringProperty(
@@ -41,7 +57,8 @@ class RenderMailBotProperties(bpy.types.PropertyGroup):
         default="",
         maxlen=256,
         subtype='PASSWORD',
-)
+        update=update_delivery_settings
+    )
     recipients: CollectionProperty(
         type=RecipientItem,
         name="Recipients",
@@ -53,6 +70,246 @@ class RenderMailBotProperties(bpy.types.PropertyGroup):
         default=False,
         update=update_send_myself
     )
+    smtp_host: StringProperty(
+        name="SMTP Server",
+        description="Outgoing mail server (Gmail by default, or your own relay)",
+        default=transport.GMAIL_SERVER.host,
+        maxlen=256,
+        update=update_delivery_settings
+    )
+    smtp_port: IntProperty(
+        name="Port",
+        description="Outgoing mail server port",
+        default=transport.GMAIL_SERVER.port,
+        min=1,
+        max=65535,
+        update=update_delivery_settings
+    )
+    smtp_security: EnumProperty(
+        name="Security",
+        description="How the connection to the mail server is secured",
+        items=[
+            ('SSL', "SSL/TLS", "Encrypted connection from the start (usually port 465)"),
+            ('STARTTLS', "STARTTLS", "Upgrade a plain connection to TLS (usually port 587)"),
+            ('NONE', "None", "Unencrypted connection, only for local relays and test servers"),
+        ],
+        default=transport.GMAIL_SERVER.security,
+        update=update_smtp_security
+    )
+    channel_smtp: BoolProperty(
+        name="Email (SMTP)",
+        description="Send notifications by email through the mail server below",
+        default=True,
+        update=update_delivery_settings
+    )
+    channel_file: BoolProperty(
+        name="Local Mail Drop",
+        description="Hand notifications to the local mail system (a Maildir folder or the sendmail program)",
+        default=False,
+        update=update_delivery_settings
+    )
+    file_drop_mode: EnumProperty(
+        name="Drop Method",
+        description="How notifications are handed to the local mail system",
+        items=[
+            ('MAILDIR', "Maildir", "Save each notification as a file in a Maildir folder"),
+            ('SENDMAIL', "sendmail", "Pipe each notification to the sendmail program"),
+        ],
+        default='MAILDIR',
+        update=update_delivery_settings
+    )
+    maildir_path: StringProperty(
+        name="Maildir Folder",
+        description="Maildir folder that receives the notifications (created if missing)",
+        default="",
+        subtype='DIR_PATH',
+        update=update_delivery_settings
+    )
+    sendmail_path: StringProperty(
+        name="sendmail Program",
+        description="Path of the sendmail compatible program",
+        default=channels.DEFAULT_SENDMAIL_PATH,
+        subtype='FILE_PATH',
+        update=update_delivery_settings
+    )
+    channel_webhook: BoolProperty(
+        name="Webhook",
+        description="POST notifications as JSON with a small thumbnail to a web address (chat bots, dashboards)",
+        default=False,
+        update=update_delivery_settings
+    )
+    webhook_url: StringProperty(
+        name="Webhook URL",
+        description="Address that receives the JSON notification",
+        default="",
+        maxlen=1024,
+        update=update_delivery_settings
+    )
+    smtp_max_recipients: IntProperty(
+        name="Recipients per Message",
+        description="Most recipients the mail server accepts on one message; longer lists are sent as several copies",
+        default=transport.DEFAULT_MAX_RECIPIENTS,
+        min=1,
+        max=1000,
+        update=update_delivery_settings
+    )
+    preview_format: EnumProperty(
+        name="Preview Format",
+        description="Image format of the render preview attached to the email",
+        items=[
+            ('JPEG', "JPEG", "Small lossy preview"),
+            ('PNG', "PNG", "Lossless preview, larger attachment"),
+        ],
+        default='JPEG',
+    )
+    preview_max_size: IntProperty(
+        name="Max Size",
+        description="Longest edge of the preview image in pixels; larger renders are scaled down",
+        default=preview.DEFAULT_MAX_EDGE,
+        min=64,
+        max=8192,
+        subtype='PIXEL',
+    )
+    preview_quality: IntProperty(
+        name="Quality",
+        description="JPEG quality of the preview image",
+        default=preview.DEFAULT_QUALITY,
+        min=1,
+        max=100,
+        subtype='PERCENTAGE',
+    )
+    preview_max_kb: IntProperty(
+        name="Max Attachment (KB)",
+        description="Largest preview attachment to send; quality and size are lowered until it fits (0 = no limit)",
+        default=preview.DEFAULT_MAX_KB,
+        min=0,
+        max=25 * 1024,
+    )
+    preview_tone_curve: EnumProperty(
+        name="Tone Curve",
+        description="How float renders and EXR frames are turned into preview colours",
+        items=[
+            ('SCENE', "Scene View Transform", "Follow the scene's Color Management view transform"),
+            ('STANDARD', "Standard", "Plain sRGB; values above 1.0 are clipped"),
+            ('FILMIC', "Filmic", "Filmic shoulder that rolls off highlights"),
+            ('AGX', "AgX", "AgX-style curve that desaturates bright highlights"),
+            ('RAW', "Raw", "No transform, useful for data passes"),
+        ],
+        default='SCENE',
+    )
+    preview_exposure: FloatProperty(
+        name="Preview Exposure",
+        description="Stops added to the scene exposure for the preview only",
+        default=0.0,
+        min=-10.0,
+        max=10.0,
+    )
+    preview_layer: StringProperty(
+        name="Layer",
+        description="View layer shown from multilayer EXR output (empty = first layer)",
+        default="",
+    )
+    preview_pass: StringProperty(
+        name="Pass",
+        description="Render pass shown from EXR output, e.g. Noisy Image instead of the denoised "
+                    "Combined (empty = Combined)",
+        default="",
+    )
+    resource_usage: BoolProperty(
+        name="Resource Usage Chart",
+        description="Sample memory and CPU use during the render and include peaks, averages and a chart "
+                    "in the completion email",
+        default=False
+    )
+    contact_sheet: BoolProperty(
+        name="Contact Sheet for Animations",
+        description="Attach a grid of evenly spaced frames instead of only the last frame when rendering an animation",
+        default=True
+    )
+    contact_sheet_frames: IntProperty(
+        name="Frames",
+        description="Maximum number of frames on the contact sheet",
+        default=contact_sheet.DEFAULT_FRAMES,
+        min=2,
+        max=100,
+    )
+    contact_sheet_columns: IntProperty(
+        name="Columns",
+        description="Number of frames per row on the contact sheet",
+        default=contact_sheet.DEFAULT_COLUMNS,
+        min=1,
+        max=12,
+    )
+    progress_enabled: BoolProperty(
+        name="Progress Updates",
+        description="Send progress digests while a long animation is rendering",
+        default=False
+    )
+    progress_every_frames: IntProperty(
+        name="Every N Frames",
+        description="Send an update after this many frames (0 = don't count frames)",
+        default=progress.DEFAULT_EVERY_FRAMES,
+        min=0,
+    )
+    progress_every_minutes: IntProperty(
+        name="Every N Minutes",
+        description="Send an update after this many minutes (0 = don't use time)",
+        default=progress.DEFAULT_EVERY_MINUTES,
+        min=0,
+    )
+    progress_max_per_hour: IntProperty(
+        name="Max per Hour",
+        description="Hard limit on progress emails per hour; extra updates are merged into the next one",
+        default=progress.DEFAULT_MAX_PER_HOUR,
+        min=1,
+        max=60,
+    )
+    verify_frames: BoolProperty(
+        name="Verify Output Frames",
+        description="When an animation finishes, check every frame file for missing, empty, truncated, "
+                    "all-black or NaN frames and list them in the email",
+        default=False
+    )
+    watchdog_enabled: BoolProperty(
+        name="Crash Watchdog",
+        description="Watch the render from a separate process and send an email if Blender crashes, "
+                    "runs out of memory or stops making progress",
+        default=False
+    )
+    watchdog_minutes: IntProperty(
+        name="Hang After (min)",
+        description="Shortest silence that counts as a hang; with long frames the limit grows to "
+                    "4 times the slowest recent frame",
+        default=watchdog.DEFAULT_MIN_MINUTES,
+        min=1,
+    )
+    farm_enabled: BoolProperty(
+        name="Render Farm Mode",
+        description="Record finished frames in a shared spool folder instead of emailing from this instance; "
+                    "farm.py merges every node's frames and sends one email for the job",
+        default=False
+    )
+    farm_spool_dir: StringProperty(
+        name="Spool Folder",
+        description="Folder shared by every render node, e.g. on a network drive",
+        default="",
+        subtype='DIR_PATH',
+    )
+    farm_job_id: StringProperty(
+        name="Job ID",
+        description="Identifies the job across nodes (empty = the blend file name)",
+        default="",
+        maxlen=128,
+    )
+    stage_timings: BoolProperty(
+        name="Stage Timings",
+        description="Time each step of sending a notification (preview, message, connect, login, send) "
+                    "and log the results to timings.jsonl in the add-on data folder",
+        default=False,
+        update=update_stage_timings
+    )
+
+MAX_TIMING_ROWS = 10  # Stages listed in the panel, slowest in total first
 
 # Main Panel
 class RenderMailBotPanel(Panel):
@@ -73,6 +330,88 @@ class RenderMailBotPanel(Panel):
         layout.label(text="For Gmail, use an App Password. Learn how:", icon='QUESTION')
         layout.operator("wm.url_open", text="Get App Password Guide").url = "https://support.google.com/accounts/answer/185833"
 
+        # Where notifications go; every enabled channel is sent to at the same time
+        box = layout.box()
+        box.label(text="Channels:", icon='LINKED')
+        box.prop(scene.render_mailbot, "channel_smtp")
+        box.prop(scene.render_mailbot, "channel_file")
+        if scene.render_mailbot.channel_file:
+            box.prop(scene.render_mailbot, "file_drop_mode")
+            if scene.render_mailbot.file_drop_mode == 'MAILDIR':
+                box.prop(scene.render_mailbot, "maildir_path")
+            else:
+                box.prop(scene.render_mailbot, "sendmail_path")
+        box.prop(scene.render_mailbot, "channel_webhook")
+        if scene.render_mailbot.channel_webhook:
+            box.prop(scene.render_mailbot, "webhook_url")
+
+        # Outgoing mail server
+        box = layout.box()
+        box.label(text="Mail Server:", icon='URL')
+        box.prop(scene.render_mailbot, "smtp_host")
+        row = box.row(align=True)
+        row.prop(scene.render_mailbot, "smtp_port")
+        row.prop(scene.render_mailbot, "smtp_security", text="")
+        box.prop(scene.render_mailbot, "smtp_max_recipients")
+
+        # Preview image attached to the completion email
+        box = layout.box()
+        box.label(text="Preview Image:", icon='IMAGE_DATA')
+        row = box.row(align=True)
+        row.prop(scene.render_mailbot, "preview_format", text="")
+        row.prop(scene.render_mailbot, "preview_max_size")
+        if scene.render_mailbot.preview_format == 'JPEG':
+            box.prop(scene.render_mailbot, "preview_quality")
+        box.prop(scene.render_mailbot, "preview_max_kb")
+        row = box.row(align=True)
+        row.prop(scene.render_mailbot, "preview_tone_curve", text="")
+        row.prop(scene.render_mailbot, "preview_exposure")
+        row = box.row(align=True)
+        row.prop(scene.render_mailbot, "preview_layer")
+        row.prop(scene.render_mailbot, "preview_pass")
+        box.prop(scene.render_mailbot, "contact_sheet")
+        if scene.render_mailbot.contact_sheet:
+            row = box.row(align=True)
+            row.prop(scene.render_mailbot, "contact_sheet_frames")
+            row.prop(scene.render_mailbot, "contact_sheet_columns")
+
+        # Progress digests for long animations
+        box = layout.box()
+        box.prop(scene.render_mailbot, "progress_enabled")
+        if scene.render_mailbot.progress_enabled:
+            row = box.row(align=True)
+            row.prop(scene.render_mailbot, "progress_every_frames")
+            row.prop(scene.render_mailbot, "progress_every_minutes")
+            box.prop(scene.render_mailbot, "progress_max_per_hour")
+
+        # Checks on the render itself: output frames afterwards, machine load, crashes and hangs while it runs
+        box = layout.box()
+        box.prop(scene.render_mailbot, "verify_frames")
+        box.prop(scene.render_mailbot, "resource_usage")
+        box.prop(scene.render_mailbot, "watchdog_enabled")
+        if scene.render_mailbot.watchdog_enabled:
+            box.prop(scene.render_mailbot, "watchdog_minutes")
+
+        # Render farm: nodes write frame events, one aggregator sends the job email
+        box = layout.box()
+        box.prop(scene.render_mailbot, "farm_enabled")
+        if scene.render_mailbot.farm_enabled:
+            box.prop(scene.render_mailbot, "farm_spool_dir")
+            box.prop(scene.render_mailbot, "farm_job_id")
+
+        # Diagnostics: where the time goes when sending a notification
+        box = layout.box()
+        box.prop(scene.render_mailbot, "stage_timings")
+        if scene.render_mailbot.stage_timings:
+            lines = tracing.report_lines()
+            for line in lines[:MAX_TIMING_ROWS]:
+                box.label(text=line)
+            if not lines:
+                box.label(text="No timings recorded yet", icon='INFO')
+            row = box.row(align=True)
+            row.operator("rendermailbot.print_timings", text="Print Report", icon='CONSOLE')
+            row.operator("rendermailbot.reset_timings", text="Reset", icon='TRASH')
+
         # Toggle for "Send Myself"
         layout.prop(scene.render_mailbot, "send_myself")
 
@@ -93,6 +432,7 @@ class RenderMailBotPanel(Panel):
         # Test email button
         row = layout.row()
         row.operator("rendermailbot.test_email", text="Send Test Email")
+        row.operator("rendermailbot.resend_last", text="Resend Last", icon='FILE_REFRESH')
 
 # Operators for adding and removing recipients
 class AddRecipientOperator(Operator):
@@ -102,6 +442,7 @@ class AddRecipientOperator(Operator):
 
     def execute(self, context):
         context.scene.render_mailbot.recipients.add()
+        snapshot.invalidate()  # Collection changes do not call update callbacks
         return {'FINISHED'}
 
 class RemoveSpecificRecipientOperator(Operator):
@@ -114,6 +455,7 @@ class RemoveSpecificRecipientOperator(Operator):
     def execute(self, context):
         if len(context.scene.render_mailbot.recipients) > self.index:
             context.scene.render_mailbot.recipients.remove(self.index)
+            snapshot.invalidate()
         return {'FINISHED'}
 
 # Operator to show notify
@@ -153,16 +495,66 @@ Happy rendering! 😊
 Contribute and propose changes at: https://github.com/NguyenNP-24/Render-Email-Notifier-Blender
 """
 
-        success, msg = notifier_core.send_email(subject, body)
+        # Test emails report failures straight away instead of waiting in the outbox
+        success, msg = notifier_core.send_email(subject, body, durable=False)
+
+        # Delivery runs in the background; the result shows up as a popup when it finishes
+        if success:
+            self.report({'INFO'}, "Sending test email...") 
+        else:
+            self.report({'ERROR'}, f"Error sending email: {msg}")
+
+        return {'FINISHED'}
+
+
+# Operator to resend the last completion email, reusing its encoded preview
+class ResendLastOperator(Operator):
+    bl_idname = "rendermailbot.resend_last"
+    bl_label = "Resend Last Notification"
+    bl_description = "Send the last render completion email again"
+
+    @classmethod
+    def poll(cls, context):
+        return notifier_core.get_last_notification() is not None
+
+    def execute(self, context):
+        subject, body, preview_image, charts = notifier_core.get_last_notification()
+        success, msg = notifier_core.send_email(subject, body, preview_image, durable=False, charts=charts)
 
         if success:
-            self.report({'INFO'}, "Test email sent successfully!") 
+            self.report({'INFO'}, "Resending last notification...")
         else:
             self.report({'ERROR'}, f"Error sending email: {msg}")
 
         return {'FINISHED'}
 
 
+# Operators for the stage timing statistics
+class PrintTimingsOperator(Operator):
+    bl_idname = "rendermailbot.print_timings"
+    bl_label = "Print Stage Timings"
+    bl_description = "Print the timing of each notification stage to the system console"
+
+    def execute(self, context):
+        lines = tracing.report_lines()
+        print("⏱️ Notification stage timings:")
+        for line in lines:
+            print(f"   {line}")
+        if tracing.log_path():
+            print(f"📝 Timing log: {tracing.log_path()}")
+        self.report({'INFO'}, f"Printed timings for {len(lines)} stages to the system console")
+        return {'FINISHED'}
+
+class ResetTimingsOperator(Operator):
+    bl_idname = "rendermailbot.reset_timings"
+    bl_label = "Reset Stage Timings"
+    bl_description = "Clear the timing statistics collected so far (the log file is kept)"
+
+    def execute(self, context):
+        tracing.reset()
+        return {'FINISHED'}
+
+
 # Register and unregister classes
 classes = [
     RecipientItem,
@@ -171,7 +563,10 @@ classes = [
     AddRecipientOperator,
     RemoveSpecificRecipientOperator,
     ShowMessageOperator,
-    TestEmailOperator
+    TestEmailOperator,
+    ResendLastOperator,
+    PrintTimingsOperator,
+    ResetTimingsOperator
 ]
 
 def register():
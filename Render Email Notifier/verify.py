@@ -0,0 +1,235 @@
+import bpy
+import mmap
+import os
+import statistics
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from . import exr, farm, tracing
+
+# Output frame verification. When an animation finishes, every frame file
+# the scene should have written is checked on a thread pool: it must exist,
+# not be empty or much smaller than its siblings, and decode. Files are
+# memory-mapped, and zlib and NumPy release the GIL while they work, so the
+# threads really overlap. PNG and OpenEXR (uncompressed, ZIP and ZIPS) frames
+# are decoded far enough to spot all-black frames and NaN pixels; other EXR
+# codecs get a structural check of the header and chunk table. With a UI the
+# whole pass runs off the main thread (verify_later) and the completion timer
+# waits for its report before building the email.
+MAX_WORKERS = 16          # Frame files checked at once; reads on network shares overlap well
+SMALL_FRACTION = 0.1      # Frames below this fraction of the median size are reported
+MIN_FRAMES_FOR_SIZE = 5   # The size check needs enough frames for a meaningful median
+ROWS_PER_BLOCK = 64       # PNG rows inflated at a time, keeping memory flat for 8K frames
+MAX_LISTED = 10           # Per-frame details listed in the email
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}   # Colour type -> samples per pixel
+
+# status is one of 'ok', 'missing', 'empty', 'corrupt', 'black', 'nan' or 'small';
+# decoded says whether the pixels were looked at, not just the file structure
+FrameCheck = namedtuple('FrameCheck', ['frame', 'path', 'status', 'detail', 'size', 'decoded'])
+
+class FrameError(Exception):
+    """The frame file is damaged or truncated"""
+
+def expected_frames(scene):
+    """(frame, absolute path) of every file an animation render should have written (main thread only)"""
+    render = scene.render
+    step = max(1, scene.frame_step)
+    return [(frame, bpy.path.abspath(render.frame_path(frame=frame)))
+            for frame in range(scene.frame_start, scene.frame_end + 1, step)]
+
+def _check_png(data):
+    """Inflate every IDAT chunk; returns (decoded, black)"""
+    if data[:8] != PNG_SIGNATURE:
+        raise FrameError("not a PNG file")
+    if data[12:16] != b"IHDR":
+        raise FrameError("invalid PNG header")
+    width, height, depth, color_type, _, _, interlace = struct.unpack_from(">IIBBBBB", data, 16)
+    channels = PNG_CHANNELS.get(color_type)
+    if channels is None or not width or not height:
+        raise FrameError("invalid PNG header")
+
+    pixel_bytes = channels * depth // 8 if depth >= 8 else 1
+    row_bytes = 1 + (width * channels * depth + 7) // 8
+    # Filters predict each byte from the same channel of neighbouring pixels, so colour bytes
+    # that are all zero after filtering are all zero in the image: no unfiltering needed
+    track_black = interlace == 0 and depth >= 8 and color_type != 3
+    if track_black:
+        colour = np.zeros(row_bytes, dtype=bool)
+        colour_channels = channels - 1 if color_type in (4, 6) else channels
+        sample_bytes = depth // 8
+        per_pixel = colour.reshape(-1)[1:].reshape(width, pixel_bytes)
+        per_pixel[:, :colour_channels * sample_bytes] = True
+    black = track_black
+    inflater = zlib.decompressobj()
+    pending = b""
+    total = 0
+    block = row_bytes * ROWS_PER_BLOCK
+
+    position = 8
+    ended = False
+    while position + 8 <= len(data):
+        length, tag = struct.unpack_from(">I4s", data, position)
+        start = position + 8
+        if start + length + 4 > len(data):
+            raise FrameError("file is truncated")
+        if tag == b"IDAT":
+            chunk = inflater.decompress(data[start:start + length])
+            total += len(chunk)
+            if black:
+                pending += chunk
+                usable = len(pending) - len(pending) % row_bytes
+                for offset in range(0, usable, block):
+                    rows = np.frombuffer(pending, dtype=np.uint8, count=min(block, usable - offset), offset=offset)
+                    if rows.reshape(-1, row_bytes)[:, colour].any():
+                        black = False
+                        break
+                pending = pending[usable:] if black else b""
+        elif tag == b"IEND":
+            ended = True
+            break
+        position = start + length + 4
+
+    total += len(inflater.flush())
+    if not ended or not inflater.eof:
+        raise FrameError("image data is incomplete")
+    if interlace == 0 and total != row_bytes * height:
+        raise FrameError(f"expected {row_bytes * height} bytes of pixels, found {total}")
+    return True, black
+
+def _is_colour(name):
+    return name in ('R', 'G', 'B') or name.endswith(('.R', '.G', '.B'))
+
+def _check_exr(data):
+    """Walk the chunk table and decode uncompressed/ZIP blocks; returns (decoded, black, NaN samples)"""
+    header, position = exr.read_header(data)
+    if header is None:
+        return False, False, 0
+    offsets = exr.chunk_offsets(data, header, position)
+    if not exr.is_decodable(header):
+        exr.check_chunks(data, offsets)
+        return False, False, 0
+
+    columns = exr.channel_columns(header)
+    black = any(_is_colour(name) for name in columns)
+    nan_samples = 0
+    for _, rows in exr.iter_blocks(data, header, offsets):
+        for name, (pixel_type, start, end) in columns.items():
+            samples = rows[:, start:end]
+            if pixel_type == 1:
+                bits = np.ascontiguousarray(samples).view("<u2")
+                nan_samples += int(np.count_nonzero(((bits & 0x7C00) == 0x7C00) & ((bits & 0x03FF) != 0)))
+                if black and _is_colour(name) and (bits & 0x7FFF).any():
+                    black = False
+            elif pixel_type == 2:
+                values = np.ascontiguousarray(samples).view("<f4")
+                nan_samples += int(np.count_nonzero(np.isnan(values)))
+                if black and _is_colour(name) and (values != 0).any():
+                    black = False
+    return True, black, nan_samples
+
+def _check_jpeg(data):
+    if data[:2] != b"\xff\xd8":
+        raise FrameError("not a JPEG file")
+    if data[-2:] != b"\xff\xd9" and data.rfind(b"\xff\xd9", max(0, len(data) - 1024)) < 0:
+        raise FrameError("file is truncated")
+    return False
+
+def check_frame(frame, path):
+    """Check one frame file; runs on the verification pool and must not touch bpy"""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return FrameCheck(frame, path, 'missing', "", 0, False)
+    if size == 0:
+        return FrameCheck(frame, path, 'empty', "", 0, False)
+
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if extension == '.png':
+                decoded, black = _check_png(data)
+                nan_samples = 0
+            elif extension == '.exr':
+                decoded, black, nan_samples = _check_exr(data)
+            elif extension in ('.jpg', '.jpeg'):
+                decoded, black, nan_samples = _check_jpeg(data), False, 0
+            else:
+                decoded, black, nan_samples = False, False, 0
+    except (FrameError, exr.ExrError, struct.error, zlib.error, IndexError, ValueError) as e:
+        return FrameCheck(frame, path, 'corrupt', str(e) or type(e).__name__, size, False)
+    except OSError as e:
+        return FrameCheck(frame, path, 'corrupt', f"unreadable: {e}", size, False)
+
+    if nan_samples:
+        return FrameCheck(frame, path, 'nan', f"{nan_samples} NaN samples", size, decoded)
+    if black:
+        return FrameCheck(frame, path, 'black', "", size, decoded)
+    return FrameCheck(frame, path, 'ok', "", size, decoded)
+
+class VerifyReport:
+    """Results of checking every output frame of an animation"""
+
+    def __init__(self, checks, elapsed):
+        self.checks = checks
+        self.elapsed = elapsed
+        sizes = [check.size for check in checks if check.status == 'ok']
+        if len(sizes) >= MIN_FRAMES_FOR_SIZE:
+            limit = statistics.median(sizes) * SMALL_FRACTION
+            self.checks = [check._replace(status='small', detail=f"{check.size} bytes")
+                           if check.status == 'ok' and check.size < limit else check for check in checks]
+
+    def frames(self, status):
+        return [check for check in self.checks if check.status == status]
+
+    @property
+    def ok(self):
+        return all(check.status == 'ok' for check in self.checks)
+
+    def report_lines(self):
+        """Lines for the notification body"""
+        counts = {}
+        for check in self.checks:
+            counts[check.status] = counts.get(check.status, 0) + 1
+        decoded = sum(1 for check in self.checks if check.decoded)
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items(), key=lambda item: -item[1]))
+        lines = [f"- Output Check: {len(self.checks)} frames in {self.elapsed:.1f}s ({decoded} decoded): {summary}"]
+
+        titles = (('missing', "Missing Frames"), ('empty', "Empty Frames"), ('corrupt', "Corrupt Frames"),
+                  ('black', "All-Black Frames"), ('nan', "Frames With NaN"), ('small', "Suspiciously Small Frames"))
+        for status, title in titles:
+            checks = self.frames(status)
+            if not checks:
+                continue
+            lines.append(f"- {title}: {farm.format_ranges(check.frame for check in checks)}")
+            for check in checks[:MAX_LISTED]:
+                if check.detail:
+                    lines.append(f"  {check.frame}: {check.detail}")
+        return lines
+
+def verify(frames, workers=MAX_WORKERS):
+    """Check (frame, path) pairs in parallel and return a VerifyReport"""
+    start = time.perf_counter()
+    with tracing.span("verify.frames", frames=len(frames)):
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(frames))),
+                                thread_name_prefix="RenderMailBotVerify") as executor:
+            checks = list(executor.map(lambda item: check_frame(*item), frames))
+    report = VerifyReport(checks, time.perf_counter() - start)
+    print(f"🔍 Verified {len(checks)} output frames in {report.elapsed:.2f}s")
+    return report
+
+def verify_later(frames):
+    """Start verify() on a background thread and return a Future of its VerifyReport"""
+    future = Future()
+    def run():
+        try:
+            future.set_result(verify(frames))
+        except Exception as e:
+            future.set_exception(e)
+    threading.Thread(target=run, name="RenderMailBotVerifyJob", daemon=True).start()
+    return future
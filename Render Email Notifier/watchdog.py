@@ -0,0 +1,355 @@
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+if __name__ == "__main__" and not __package__:
+    # Run as a script outside Blender (PEP 366): load the sibling modules as a package
+    # without running the add-on's __init__, which needs bpy
+    import types
+    __package__ = "render_email_notifier"
+    _package = types.ModuleType(__package__)
+    _package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules[__package__] = _package
+
+from . import farm, transport
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows
+
+# Crash and hang watchdog. render_init launches this file as a separate
+# Python process and keeps the write end of its stdin pipe; every finished
+# frame writes one JSON line to it, and render_stats adds an occasional
+# "still alive" line so long frames and stills are not mistaken for hangs.
+# If the pipe closes without a clean stop (Blender crashed or was killed,
+# e.g. by the out-of-memory killer), the parent process disappears, or
+# Blender goes silent for longer than a timeout derived from recent frame
+# times, the watchdog sends the failure email itself. A hang report goes out
+# from its own thread, so the watchdog keeps checking the process while the
+# email is retried and still reports a crash after the hang.
+LOG_NAME = "watchdog.log"
+LOG_MAX_BYTES = 1024 * 1024   # Start the log over once it grows past 1 MB
+POLL_INTERVAL = 1.0           # Seconds between watchdog checks
+HANG_FACTOR = 4.0             # A frame is hung after this many times the slowest recent frame
+FIRST_FRAME_FACTOR = 3.0      # The first frame also compiles shaders and builds the BVH, so allow it longer
+RECENT_FRAMES = 10            # Frame times the adaptive timeout looks at
+DEFAULT_MIN_MINUTES = 15      # The timeout never drops below this
+ALIVE_INTERVAL = 30.0         # Blender sends at most one "still alive" line this often
+SEND_RETRY_DELAYS = (30.0, 120.0, 600.0)  # Seconds between attempts when the failure email cannot be sent
+
+_process = None     # Popen of the running watchdog, Blender side
+_pipe_fd = None     # Write end of its stdin
+_last_alive = 0.0   # time.monotonic() of the last "still alive" line
+_report_lock = threading.Lock()  # Watchdog side: the hang and crash emails share the SMTP pool
+
+def _usage():
+    """Peak memory and CPU time of this process, or {} where resource is unavailable"""
+    if resource is None:
+        return {}
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return {'peak_rss': peak, 'cpu': round(usage.ru_utime + usage.ru_stime, 2)}
+
+def _send(record):
+    """Write one line to the watchdog without ever blocking a render"""
+    global _pipe_fd
+
+    if _pipe_fd is None:
+        return
+    try:
+        os.write(_pipe_fd, json.dumps(record, separators=(',', ':')).encode('utf-8') + b"\n")
+    except BlockingIOError:
+        pass  # The watchdog is behind; it only needs the latest heartbeat anyway
+    except OSError as e:
+        print(f"⚠️ Crash watchdog is gone ({e}) - this render is no longer watched")
+        _close_pipe()
+
+def _close_pipe():
+    global _pipe_fd, _process
+
+    if _process is not None and _process.stdin is not None:
+        try:
+            _process.stdin.close()
+        except OSError:
+            pass
+    _pipe_fd = None
+    _process = None
+
+def start(config, log_path):
+    """Launch the watchdog for a render; config is plain data (email settings, frame range, timeouts)"""
+    global _process, _pipe_fd
+
+    stop()
+    python = sys.executable
+    if not python or 'blender' in os.path.basename(python).lower():
+        print("⚠️ Crash watchdog needs Blender's Python executable, which was not found")
+        return False
+    try:
+        oversized = os.path.exists(log_path) and os.path.getsize(log_path) > LOG_MAX_BYTES
+        log = open(log_path, 'wb' if oversized else 'ab')
+    except OSError as e:
+        print(f"⚠️ Cannot open watchdog log {log_path}: {e}")
+        return False
+    import subprocess
+    try:
+        # Own session, so a Ctrl+C or a kill of Blender's process group does not take the watchdog with it
+        _process = subprocess.Popen([python, os.path.abspath(__file__)], stdin=subprocess.PIPE,
+                                    stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    except OSError as e:
+        print(f"⚠️ Failed to start crash watchdog: {e}")
+        return False
+    finally:
+        log.close()
+
+    _pipe_fd = _process.stdin.fileno()
+    record = dict(config, e='config', pid=os.getpid(), started=time.time())
+    record.update(_usage())
+    _send(record)  # Goes out before the pipe is non-blocking: the config must not be dropped
+    try:
+        os.set_blocking(_pipe_fd, False)
+    except (AttributeError, OSError):
+        pass  # Pipes stay blocking on older Pythons on Windows; lines are tiny and read continuously
+    print(f"🐕 Crash watchdog started (pid {_process.pid})")
+    return True
+
+def frame_done(frame, seconds):
+    if _pipe_fd is not None:
+        _send(dict(_usage(), e='frame', f=frame, s=seconds))
+
+def alive():
+    """Called from render_stats, which fires many times per frame; sends a line every ALIVE_INTERVAL"""
+    global _last_alive
+
+    if _pipe_fd is None:
+        return
+    now = time.monotonic()
+    if now - _last_alive >= ALIVE_INTERVAL:
+        _last_alive = now
+        _send(dict(_usage(), e='alive'))
+
+def stop():
+    """Tell the watchdog the render ended normally and let it exit"""
+    if _pipe_fd is None:
+        return
+    _send({'e': 'stop'})
+    _close_pipe()
+    print("🐕 Crash watchdog stopped")
+
+def is_running():
+    return _pipe_fd is not None
+
+class WatchState:
+    """What the watchdog knows about the render it watches"""
+
+    def __init__(self):
+        self.config = None
+        self.recent = deque(maxlen=RECENT_FRAMES)   # Durations of the latest frames
+        self.last_frame = None
+        self.last_frame_time = None   # time.time() of the last finished frame
+        self.frames_done = 0
+        self.last_beat = time.monotonic()
+        self.usage = {}               # Latest usage reported by Blender
+        self.sampled = {}             # Latest usage read from /proc by the watchdog
+        self.stopped = False          # Blender said goodbye
+        self.closed = False           # The pipe reached end of file
+        self.lock = threading.Lock()
+
+    def apply(self, record):
+        event = record.get('e')
+        with self.lock:
+            self.last_beat = time.monotonic()
+            self.usage.update((key, record[key]) for key in ('peak_rss', 'cpu') if key in record)
+            if event == 'config':
+                self.config = record
+            elif event == 'frame':
+                self.frames_done += 1
+                self.last_frame = record.get('f')
+                self.last_frame_time = time.time()
+                if record.get('s') is not None:
+                    self.recent.append(record['s'])
+            elif event == 'stop':
+                self.stopped = True
+
+    def hang_timeout(self):
+        """Seconds of silence from Blender after which the render counts as hung"""
+        minimum = self.config.get('min_timeout', DEFAULT_MIN_MINUTES * 60.0)
+        if not self.recent:
+            return minimum * FIRST_FRAME_FACTOR
+        return max(minimum, HANG_FACTOR * max(self.recent))
+
+def _read_pipe(state):
+    """Reader thread: apply every line from Blender until the pipe closes"""
+    for line in sys.stdin.buffer:
+        try:
+            state.apply(json.loads(line))
+        except ValueError as e:
+            print(f"⚠️ Bad heartbeat: {e}")
+    with state.lock:
+        state.closed = True
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        return True  # The pipe closing is the signal on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _read_kb(path, keys):
+    """Values in bytes of 'Key: N kB' lines from a /proc file"""
+    values = {}
+    try:
+        with open(path, 'r', encoding='ascii', errors='replace') as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in keys:
+                    values[keys[key]] = int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+def _sample(pid):
+    """Memory of the watched process and of the system, where /proc is available (Linux)"""
+    values = _read_kb(f"/proc/{pid}/status", {'VmRSS': 'rss', 'VmHWM': 'peak_rss'})
+    values.update(_read_kb("/proc/meminfo", {'MemAvailable': 'mem_available', 'MemTotal': 'mem_total'}))
+    return values
+
+def _format_bytes(value):
+    return f"{value / 1024 ** 3:.2f} GB" if value >= 1024 ** 3 else f"{value / 1024 ** 2:.0f} MB"
+
+def report(state, reason):
+    """(subject, body) of the failure email"""
+    config = state.config
+    blend = config.get('blend') or "untitled.blend"
+    crashed = reason == 'crash'
+    title = "Blender Crashed Mid-Render" if crashed else "Blender Render Hung"
+    last = state.last_frame if state.last_frame is not None else "none"
+    subject = f"{'💥' if crashed else '🧊'} {title}: {blend} (last frame {last})"
+
+    started = config.get('started', time.time())
+    lines = [
+        f"{'💥' if crashed else '🧊'} {title}",
+        "- What Happened: " + ("Blender exited without finishing the render (crash, out of memory or killed)"
+                               if crashed else
+                               f"no sign of progress for {farm.format_duration(time.monotonic() - state.last_beat)}"),
+        f"- Blend File: {blend}",
+        f"- Host: {config.get('host', socket.gethostname())} (pid {config.get('pid')})",
+        f"- Render Started: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))}",
+    ]
+    frame_range = config.get('range')
+    expected = f" of {config['expected']}" if config.get('expected') else ""
+    lines.append(f"- Frames Done: {state.frames_done}{expected}"
+                 + (f" (range {frame_range[0]}-{frame_range[1]})" if frame_range else ""))
+    if state.last_frame is not None:
+        lines.append(f"- Last Completed Frame: {state.last_frame} at "
+                     f"{time.strftime('%H:%M:%S', time.localtime(state.last_frame_time))}")
+    if state.recent:
+        lines.append(f"- Recent Frame Time: mean {farm.format_duration(sum(state.recent) / len(state.recent))}, "
+                     f"max {farm.format_duration(max(state.recent))}")
+    lines.append(f"- Hang Timeout: {farm.format_duration(state.hang_timeout())}")
+
+    usage = dict(state.usage, **state.sampled)
+    if 'rss' in usage:
+        lines.append(f"- Last Memory Use: {_format_bytes(usage['rss'])}")
+    if 'peak_rss' in usage:
+        lines.append(f"- Peak Memory Use: {_format_bytes(usage['peak_rss'])}")
+    if 'cpu' in usage:
+        lines.append(f"- CPU Time: {farm.format_duration(usage['cpu'])}")
+    if 'mem_available' in usage and 'mem_total' in usage:
+        lines.append(f"- System Memory Free: {_format_bytes(usage['mem_available'])} of "
+                     f"{_format_bytes(usage['mem_total'])}")
+    return subject, "\n".join(lines) + "\n"
+
+def notify(state, reason, cancel=None):
+    """Send the failure email, retrying a few times since nobody else will; setting cancel stops the retries"""
+    subject, body = report(state, reason)
+    print(f"{subject}\n{body}")
+    config = state.config
+
+    if config.get('farm_events'):
+        try:
+            farm.append_event(config['farm_events'], 'cancel', reason=reason, f=state.last_frame)
+        except OSError as e:
+            print(f"⚠️ Failed to mark the farm node as failed: {e}")
+
+    if not config.get('recipients'):
+        print("⚠️ No email settings were passed to the watchdog")
+        return False
+    server = transport.SMTPServer(*config['server'])
+    cancel = cancel or threading.Event()
+    for delay in SEND_RETRY_DELAYS + (None,):
+        try:
+            with _report_lock:
+                if farm.send_report(subject, body, config['sender'], config['password'], config['recipients'], server):
+                    return True
+        except Exception as e:
+            print(f"⚠️ Failed to send failure email: {e}")
+        if delay is None:
+            break
+        print(f"⏳ Retrying in {delay:.0f} seconds")
+        if cancel.wait(delay):
+            print(f"🐕 No longer sending the {reason} email")
+            break
+    return False
+
+def watch(state):
+    """Main loop of the watchdog process; returns once the render ended one way or another"""
+    reader = threading.Thread(target=_read_pipe, args=(state,), name="WatchdogReader", daemon=True)
+    reader.start()
+    hang_reported = None   # last_beat at the time a hang was reported
+    hang_cancel = None     # Stops the retries of the hang email once it no longer applies
+
+    while True:
+        time.sleep(POLL_INTERVAL)
+        with state.lock:
+            config, stopped, closed, last_beat = state.config, state.stopped, state.closed, state.last_beat
+        if stopped:
+            print("🐕 Render ended normally")
+            return
+        if config is None:
+            if closed:
+                return  # Blender went away before sending anything to watch
+            continue
+
+        pid = config['pid']
+        if closed or not _pid_alive(pid):
+            with state.lock:
+                state.sampled = dict(state.sampled, **_sample(pid))  # System memory still says something
+            if hang_cancel is not None:
+                hang_cancel.set()  # The crash email supersedes it
+            notify(state, 'crash')
+            return
+
+        sampled = _sample(pid)
+        if sampled:
+            with state.lock:
+                state.sampled = sampled
+
+        if hang_reported is not None and last_beat != hang_reported:
+            print("🐕 Frames are finishing again")
+            hang_reported = None
+            hang_cancel.set()
+        if hang_reported is None and time.monotonic() - last_beat > state.hang_timeout():
+            # Keep watching while the email goes out, retries included: the render may recover, or crash after all
+            hang_cancel = threading.Event()
+            threading.Thread(target=notify, args=(state, 'hang', hang_cancel), name="WatchdogHangReport",
+                             daemon=True).start()
+            hang_reported = last_beat
+
+def main():
+    state = WatchState()
+    print(f"🐕 Watchdog {os.getpid()} started at {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    watch(state)
+    sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Minimal stand-in for Blender's bpy module, just enough to run the add-on outside Blender"""
+
+import copy
+import os
+import sys
+import tempfile
+import types
+from types import SimpleNamespace
+
+NOISE_BAND = 256  # Rows of random noise generated per synthetic image
+
+class Handlers:
+    """bpy.app.handlers: plain lists plus the persistent decorator"""
+
+    def __init__(self):
+        for name in ('render_init', 'render_complete', 'render_cancel', 'render_pre', 'render_post',
+                     'render_write', 'render_stats', 'load_post', 'undo_post', 'redo_post'):
+            setattr(self, name, [])
+
+    @staticmethod
+    def persistent(func):
+        return func
+
+class Timers:
+    """bpy.app.timers that only run when the harness calls run_due()"""
+
+    def __init__(self):
+        self.functions = {}
+
+    def register(self, func, first_interval=0.0, persistent=False):
+        self.functions[func] = first_interval
+
+    def unregister(self, func):
+        if func not in self.functions:
+            raise ValueError("Error: function is not registered")
+        del self.functions[func]
+
+    def is_registered(self, func):
+        return func in self.functions
+
+    def run_due(self):
+        """Call every registered timer once, dropping the ones that return None"""
+        for func in list(self.functions):
+            if func() is None:
+                self.functions.pop(func, None)
+
+class Pixels:
+    """Image.pixels: a flat float buffer supporting len() and foreach_get()"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __len__(self):
+        return self.buffer.size
+
+    def foreach_get(self, out):
+        out[:] = self.buffer
+
+class Image:
+    """bpy.types.Image backed by a NumPy array of float RGBA pixels, bottom row first"""
+
+    def __init__(self, name, width, height, is_float=True, seed=0):
+        self.name = name
+        self.size = (width, height)
+        self.channels = 4
+        self.is_float = is_float
+        self.has_data = True
+        # A smooth gradient with some noise compresses like a real render; the noise is
+        # one band repeated down the image to keep 8K frames cheap to build
+        import numpy as np  # Imported here so the startup benchmark can tell whether the add-on loads NumPy
+        rng = np.random.default_rng(seed)
+        x = np.linspace(0.0, 1.0, width, dtype=np.float32)
+        y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+        rgba = np.empty((height, width, 4), dtype=np.float32)
+        rgba[..., 0] = x
+        rgba[..., 1] = y
+        rgba[..., 2] = 0.5 * (x + y)
+        rgba[..., 3] = 1.0
+        band = rng.normal(0.0, 0.02, (min(height, NOISE_BAND), width, 3)).astype(np.float32)
+        for top in range(0, height, len(band)):
+            rows = rgba[top:top + len(band), :, :3]
+            rows += band[:len(rows)]
+        self.pixels = Pixels(rgba.ravel())
+
+    def save_render(self, filepath):
+        """Register the image under a path so images.load() finds it again"""
+        data.files[filepath] = self
+        with open(filepath, 'wb'):
+            pass
+
+    def scale(self, width, height):
+        """Resize in place; Blender filters in C, nearest samples are enough to time the rest"""
+        import numpy as np
+        old_w, old_h = self.size
+        rgba = self.pixels.buffer.reshape(old_h, old_w, self.channels)
+        rows = np.arange(height) * old_h // height
+        columns = np.arange(width) * old_w // width
+        self.pixels = Pixels(np.ascontiguousarray(rgba[rows][:, columns]).ravel())
+        self.size = (width, height)
+
+class Images(dict):
+    """bpy.data.images; load() returns the image that was saved to a path"""
+
+    def load(self, filepath, check_existing=False):
+        return copy.copy(data.files[filepath])  # A fresh datablock, so scale() leaves the saved one alone
+
+    def remove(self, image):
+        pass
+
+class Collection(list):
+    """CollectionProperty value"""
+
+    def add(self):
+        item = SimpleNamespace(name="")
+        self.append(item)
+        return item
+
+    def remove(self, index):
+        del self[index]
+
+def _property(*args, **kwargs):
+    return kwargs.get('default')
+
+def _default_settings():
+    """render_mailbot settings pointing at a local SMTP server"""
+    return SimpleNamespace(
+        sender="render@localhost", password="secret", send_myself=False,
+        recipients=Collection([SimpleNamespace(name="artist@localhost")]),
+        smtp_host="127.0.0.1", smtp_port=25, smtp_security='NONE', smtp_max_recipients=50,
+        preview_format='JPEG', preview_max_size=1280, preview_quality=85, preview_max_kb=2048,
+        preview_tone_curve='SCENE', preview_exposure=0.0, preview_layer="", preview_pass="",
+        contact_sheet=True, contact_sheet_frames=24, contact_sheet_columns=6,
+        progress_enabled=False, progress_every_frames=100, progress_every_minutes=60, progress_max_per_hour=4,
+        stage_timings=False,
+        channel_smtp=True, channel_file=False, file_drop_mode='MAILDIR', maildir_path="",
+        sendmail_path="/usr/sbin/sendmail", channel_webhook=False, webhook_url="",
+        verify_frames=False, resource_usage=False, watchdog_enabled=False, watchdog_minutes=15, farm_enabled=False, farm_spool_dir="", farm_job_id="",
+    )
+
+def _default_scene(output_dir):
+    render = SimpleNamespace(
+        engine='CYCLES', resolution_x=1920, resolution_y=1080, pixel_aspect_x=1.0, pixel_aspect_y=1.0,
+        use_sequencer=False, use_compositing=False, is_movie_format=False, file_extension=".png",
+        filepath=output_dir,
+    )
+    render.frame_path = lambda frame=0: os.path.join(output_dir, f"{frame:04d}.png")
+    return SimpleNamespace(
+        name="Scene", render=render, cycles=SimpleNamespace(samples=128), use_nodes=False,
+        view_settings=SimpleNamespace(view_transform='AgX', look='None', exposure=0.0, gamma=1.0),
+        frame_start=1, frame_end=250, frame_current=1, frame_step=1,
+        render_mailbot=_default_settings(),
+    )
+
+def _show_message(*args, **kwargs):
+    return {'FINISHED'}
+
+data = SimpleNamespace(images=Images(), files={}, filepath="", scenes={})
+
+def install(root=None):
+    """Create the bpy modules in sys.modules; root is where datafiles and output frames go"""
+    root = root or tempfile.mkdtemp(prefix="render_notifier_bench_")
+    output_dir = os.path.join(root, "render")
+    os.makedirs(output_dir, exist_ok=True)
+
+    handlers = Handlers()
+    app = SimpleNamespace(handlers=handlers, timers=Timers(), background=False, online_access=True,
+                          version=(4, 3, 2))
+
+    def user_resource(resource_type, path="", create=False):
+        directory = os.path.join(root, resource_type.lower(), path)
+        if create:
+            os.makedirs(directory, exist_ok=True)
+        return directory
+
+    bpy = types.ModuleType("bpy")
+    bpy.app = app
+    bpy.data = data
+    bpy.types = types.ModuleType("bpy.types")
+    for name in ('PropertyGroup', 'Panel', 'Operator', 'UIList'):
+        setattr(bpy.types, name, type(name, (), {}))
+    bpy.types.Image = Image
+    bpy.types.Scene = SimpleNamespace()
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ('StringProperty', 'BoolProperty', 'IntProperty', 'FloatProperty', 'EnumProperty',
+                 'CollectionProperty', 'PointerProperty'):
+        setattr(bpy.props, name, _property)
+    bpy.utils = SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None,
+                                user_resource=user_resource)
+    bpy.path = SimpleNamespace(abspath=os.path.abspath)
+    bpy.ops = SimpleNamespace(rendermailbot=SimpleNamespace(show_message=_show_message))
+    scene = _default_scene(output_dir)
+    data.scenes = {scene.name: scene}
+    bpy.context = SimpleNamespace(
+        scene=scene,
+        preferences=SimpleNamespace(system=SimpleNamespace(use_online_access=True)),
+        window_manager=SimpleNamespace(popup_menu=lambda *args, **kwargs: None),
+    )
+
+    sys.modules['bpy'] = bpy
+    sys.modules['bpy.app'] = app
+    sys.modules['bpy.app.handlers'] = handlers
+    sys.modules['bpy.types'] = bpy.types
+    sys.modules['bpy.props'] = bpy.props
+    return bpy
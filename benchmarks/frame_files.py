@@ -0,0 +1,98 @@
+"""Synthetic output frames on disk: ZIP-compressed (multilayer) OpenEXR and PNG files, plus broken variants"""
+
+import os
+import shutil
+import struct
+import zlib
+import numpy as np
+
+EXR_ZIP = 3
+EXR_ZIP_LINES = 16
+EXR_HALF = 1
+
+def _attribute(name, type_name, value):
+    return name.encode() + b"\0" + type_name.encode() + b"\0" + struct.pack("<i", len(value)) + value
+
+def _zip_block(raw):
+    """The ZIP codec: split bytes into halves, delta-encode with a +128 bias, deflate"""
+    data = np.frombuffer(raw, dtype=np.uint8)
+    interleaved = np.concatenate([data[0::2], data[1::2]])
+    delta = np.empty_like(interleaved)
+    delta[0] = interleaved[0]
+    delta[1:] = (interleaved[1:].astype(np.int16) - interleaved[:-1] + 128) & 0xFF
+    packed = zlib.compress(delta.tobytes(), 4)
+    return packed if len(packed) < len(raw) else raw
+
+def write_exr(path, rgba):
+    """Write an (height, width, 4) array as a half-float RGBA scanline EXR with ZIP compression"""
+    write_exr_channels(path, {name: rgba[:, :, index] for index, name in enumerate('RGBA')})
+
+def write_multilayer_exr(path, passes, layer="ViewLayer"):
+    """Write {pass name: (height, width, 3) array} the way Blender names multilayer channels"""
+    write_exr_channels(path, {f"{layer}.{name}.{channel}": pixels[:, :, index]
+                              for name, pixels in passes.items() for index, channel in enumerate('RGB')})
+
+def write_exr_channels(path, planes):
+    """Write {channel name: (height, width) array} as a half-float scanline EXR with ZIP compression"""
+    names = sorted(planes)                           # Channels are stored sorted by name
+    height, width = planes[names[0]].shape
+    halves = [np.ascontiguousarray(planes[name], dtype="<f2") for name in names]
+
+    channels = b"".join(name.encode() + b"\0" + struct.pack("<i4xii", EXR_HALF, 1, 1) for name in names) + b"\0"
+    window = struct.pack("<iiii", 0, 0, width - 1, height - 1)
+    header = (b"\x76\x2f\x31\x01" + struct.pack("<I", 2)
+              + _attribute("channels", "chlist", channels)
+              + _attribute("compression", "compression", bytes([EXR_ZIP]))
+              + _attribute("dataWindow", "box2i", window)
+              + _attribute("displayWindow", "box2i", window)
+              + _attribute("lineOrder", "lineOrder", b"\0")
+              + _attribute("pixelAspectRatio", "float", struct.pack("<f", 1.0))
+              + _attribute("screenWindowCenter", "v2f", struct.pack("<ff", 0.0, 0.0))
+              + _attribute("screenWindowWidth", "float", struct.pack("<f", 1.0))
+              + b"\0")
+
+    chunks = []
+    for y in range(0, height, EXR_ZIP_LINES):
+        lines = range(y, min(height, y + EXR_ZIP_LINES))
+        raw = b"".join(plane[line].tobytes() for line in lines for plane in halves)
+        block = _zip_block(raw)
+        chunks.append(struct.pack("<ii", y, len(block)) + block)
+
+    offset = len(header) + 8 * len(chunks)
+    offsets = []
+    for chunk in chunks:
+        offsets.append(offset)
+        offset += len(chunk)
+    with open(path, 'wb') as f:
+        f.write(header + struct.pack(f"<{len(offsets)}Q", *offsets) + b"".join(chunks))
+
+def noise_frame(width, height, seed=0):
+    """Float RGBA frame with some structure so it compresses like a render"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = 0.5 + 0.5 * np.sin(x / 37.0)[..., None] * np.cos(y / 23.0)[..., None]
+    rgba = np.concatenate([base * rng.uniform(0.9, 1.0, (height, width, 3)).astype(np.float32),
+                           np.ones((height, width, 1), dtype=np.float32)], axis=2)
+    return rgba
+
+def fill_sequence(directory, template, frames, pattern="frame_{:04d}{}"):
+    """Copy one file to every frame path; returns the (frame, path) list"""
+    extension = os.path.splitext(template)[1]
+    paths = []
+    for frame in frames:
+        path = os.path.join(directory, pattern.format(frame, extension))
+        shutil.copyfile(template, path)
+        paths.append((frame, path))
+    return paths
+
+def truncate(path, fraction=0.5):
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(int(size * fraction))
+
+def corrupt_png_data(path):
+    """Overwrite the start of the first IDAT chunk, keeping the file size, so inflating it fails"""
+    with open(path, 'r+b') as f:
+        data = f.read()
+        f.seek(data.index(b"IDAT") + 4)
+        f.write(b"\x78\x01" + b"\xff" * 16)
@@ -0,0 +1,676 @@
+"""Offline benchmarks for the Render Email Notifier add-on
+
+Runs notifier_core against the bpy stand-in in bpy_stub.py and an in-process
+SMTP sink, so it needs neither Blender nor a network connection. Results are
+written as JSON so runs from different releases can be compared.
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --quick
+"""
+
+import argparse
+import ast
+import compileall
+import contextlib
+import datetime
+import gc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import bpy_stub
+from smtp_sink import SMTPSink
+from webhook_sink import WebhookSink
+import frame_files
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_DIR = os.path.join(REPO_ROOT, "Render Email Notifier")
+ADDON_PACKAGE = "render_email_notifier"
+SCHEMA_VERSION = 1
+FANOUT_RECIPIENTS = 120
+STARTUP_PROBE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_probe.py")
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160),
+    '8K': (7680, 4320),
+}
+
+def load_addon():
+    """Import the add-on folder (its name has spaces) as a package"""
+    spec = importlib.util.spec_from_file_location(ADDON_PACKAGE, os.path.join(ADDON_DIR, "__init__.py"),
+                                                  submodule_search_locations=[ADDON_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_PACKAGE] = package
+    spec.loader.exec_module(package)
+    return package
+
+def summarize(samples):
+    """Timing statistics in milliseconds for a list of durations in seconds"""
+    ms = sorted(sample * 1000.0 for sample in samples)
+    return {
+        'runs': len(ms),
+        'mean_ms': statistics.fmean(ms),
+        'median_ms': statistics.median(ms),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'min_ms': ms[0],
+        'max_ms': ms[-1],
+    }
+
+def measure(func, repeat):
+    """Run func repeat times and summarize the durations"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def bench_startup(runs, budget_ms):
+    """Import and register the add-on in fresh interpreters; fails over budget or if a deferred module is loaded"""
+    compileall.compile_dir(ADDON_DIR, quiet=1)  # Blender imports from cached bytecode after the first start
+    probes = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, STARTUP_PROBE, ADDON_DIR, ADDON_PACKAGE],
+                                   capture_output=True, text=True, check=True)
+        probes.append(json.loads(completed.stdout))
+
+    results = {
+        'import': summarize([probe['import_ms'] / 1000.0 for probe in probes]),
+        'register': summarize([probe['register_ms'] / 1000.0 for probe in probes]),
+        'total': summarize([(probe['import_ms'] + probe['register_ms']) / 1000.0 for probe in probes]),
+        'budget_ms': budget_ms,
+        'addon_modules': len(probes[0]['addon_modules']),
+        'deferred_loaded': sorted({name for probe in probes for name in probe['deferred_loaded']}),
+    }
+    if results['deferred_loaded']:
+        raise RuntimeError(f"startup: registering the add-on loaded {', '.join(results['deferred_loaded'])}")
+    if budget_ms and results['total']['median_ms'] > budget_ms:
+        raise RuntimeError(f"startup: import and register took {results['total']['median_ms']:.1f} ms, "
+                           f"over the {budget_ms:g} ms budget")
+    return results
+
+def bench_handlers(addon, bpy, frames, repeat):
+    """Cost of the render handlers: once per render, and per frame of an animation"""
+    nc = addon.notifier_core
+    scene = bpy.context.scene
+    settings = scene.render_mailbot
+    settings.contact_sheet = False   # Frame capture is measured with the previews
+    # One frame more than is simulated, so the completion email is never triggered
+    scene.frame_start, scene.frame_end = 1, frames + 1
+
+    results = {'on_render_start': measure(lambda: nc.on_render_start(scene), repeat)}
+
+    per_frame = {name: [] for name in ('on_frame_pre', 'on_frame_post', 'on_frame_written', 'on_render_complete')}
+    nc.on_render_start(scene)
+    for frame in range(1, frames + 1):
+        scene.frame_current = frame
+        for name, samples in per_frame.items():
+            handler = getattr(nc, name)
+            start = time.perf_counter()
+            handler(scene)
+            samples.append(time.perf_counter() - start)
+    for name, samples in per_frame.items():
+        results[name] = summarize(samples)
+    totals = [sum(samples) for samples in zip(*per_frame.values())]
+    results['per_frame_total'] = summarize(totals)
+
+    # A progress digest due on every frame of a 1080p render: the render_write handler only queues it,
+    # the timer reads the thumbnail back and builds the email
+    saved = (settings.progress_enabled, settings.progress_every_frames, settings.progress_max_per_hour)
+    settings.progress_enabled, settings.progress_every_frames, settings.progress_max_per_hour = True, 1, 1000
+    nc.on_render_start(scene)
+    handler_samples, timer_samples = [], []
+    for frame in range(1, max(2, repeat // 10) + 1):
+        scene.frame_current = frame
+        bpy_stub.Image("Frame", 1920, 1080, seed=frame).save_render(scene.render.frame_path(frame=frame))
+        start = time.perf_counter()
+        nc.on_frame_written(scene)
+        handler_samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        bpy.app.timers.run_due()
+        timer_samples.append(time.perf_counter() - start)
+    results['progress_digest'] = {'handler': summarize(handler_samples), 'timer': summarize(timer_samples)}
+    settings.progress_enabled, settings.progress_every_frames, settings.progress_max_per_hour = saved
+
+    settings.contact_sheet = True
+    return results
+
+def bench_message(addon, bpy, repeat):
+    """Building the MIME message, attaching a cached preview and serializing it"""
+    nc = addon.notifier_core
+    preview = addon.preview
+    body = "🎉 Render Complete!\n" + "- Detail line\n" * 12
+    image = bpy_stub.Image("Render Result", 1920, 1080)
+    render_preview = preview.make_preview(preview.preview_from_image(image, 1280), bpy.context.scene.render_mailbot)
+    render_preview.encode()   # Warm the encode cache so only message handling is timed
+
+    def build_attach_serialize():
+        prepared, _ = nc.build_email("📸 Blender Render Complete", body)
+        msg = prepared[0]
+        nc.attach_preview(msg, render_preview)
+        msg.as_bytes()
+
+    results = {
+        'build_email': measure(lambda: nc.build_email("📸 Blender Render Complete", body), repeat),
+        'build_attach_serialize': measure(build_attach_serialize, repeat),
+    }
+
+    # Per-send settings lookup: the cached snapshot, and reading a long recipient list again after a change
+    snapshot = addon.snapshot
+    scene = bpy.context.scene
+    settings = scene.render_mailbot
+    single = settings.recipients
+    settings.recipients = bpy_stub.Collection(bpy_stub.SimpleNamespace(name=f"artist{i}@localhost")
+                                              for i in range(FANOUT_RECIPIENTS))
+    snapshot.invalidate()
+
+    def rebuild():
+        snapshot.invalidate()
+        snapshot.resolve(scene)
+
+    results['settings_cached'] = measure(lambda: snapshot.resolve(scene), repeat * 10)
+    results['settings_rebuilt'] = dict(measure(rebuild, repeat), recipients=FANOUT_RECIPIENTS)
+    settings.recipients = single
+    snapshot.invalidate()
+    return results
+
+def bench_previews(addon, bpy, resolutions, repeat):
+    """Capture, downscale and encode previews for full frames of several sizes"""
+    preview = addon.preview
+    settings = bpy.context.scene.render_mailbot
+    results = {}
+
+    for label in resolutions:
+        width, height = RESOLUTIONS[label]
+        image = bpy_stub.Image("Render Result", width, height)
+        pixels = preview.preview_from_image(image, settings.preview_max_size)
+        entry = {
+            'source': f"{width}x{height}",
+            'preview': f"{pixels.shape[1]}x{pixels.shape[0]}",
+            'capture': measure(lambda: preview.preview_from_image(image, settings.preview_max_size), repeat),
+        }
+        for file_format, quality in (('JPEG', settings.preview_quality), ('PNG', 0)):
+            def encode():
+                preview._encode_cache.clear()
+                return preview.RenderPreview(pixels, file_format, quality).encode()
+            entry[f"encode_{file_format.lower()}"] = measure(encode, repeat)
+            entry[f"{file_format.lower()}_bytes"] = len(encode()[0])
+
+        # The same frame as a multilayer EXR, decoded directly with a pass picked and tone mapped
+        rgb = preview.read_pixels(image)[::-1, :, :3]
+        exr_path = os.path.join(bpy.utils.user_resource('DATAFILES', path="bench", create=True), f"{label}.exr")
+        frame_files.write_multilayer_exr(exr_path, {"Combined": rgb, "Noisy Image": rgb})
+        display = preview.display_settings(bpy.context.scene, settings)._replace(pass_name="Noisy Image")
+        entry['exr_capture'] = measure(lambda: preview.preview_from_file(exr_path, settings.preview_max_size, display),
+                                       repeat)
+        linear = preview.downscale(preview.read_pixels(image), settings.preview_max_size)[:, :, :3]
+        for curve in ('STANDARD', 'FILMIC', 'AGX'):
+            entry[f"tone_map_{curve.lower()}"] = measure(lambda: addon.tonemap.to_display(linear.copy(), curve), repeat)
+        os.remove(exr_path)
+
+        # One written frame going onto a 24 frame contact sheet through the real path: the render_write
+        # handler only queues the file, the timer reads it back shrunk to the cell
+        entry['contact_sheet_frame'] = {
+            'png': bench_contact_sheet_frame(addon, bpy, image, None),
+            'exr': bench_contact_sheet_frame(addon, bpy, image, rgb),
+        }
+        results[label] = entry
+
+        del image, pixels, rgb, linear
+        gc.collect()
+    return results
+
+def bench_contact_sheet_frame(addon, bpy, image, rgb, repeat=3):
+    """capture_frame() in the handler, then the timer that reads the frame file back, with its peak memory"""
+    contact_sheet = addon.contact_sheet
+    scene = bpy.context.scene
+    settings = scene.render_mailbot
+    render = scene.render
+    directory = bpy.utils.user_resource('DATAFILES', path="bench", create=True)
+    path = os.path.join(directory, "sheet_frame.exr" if rgb is not None else "sheet_frame.png")
+    if rgb is not None:
+        frame_files.write_exr(path, np.concatenate([rgb, np.ones(rgb.shape[:2] + (1,), np.float32)], axis=2))
+    else:
+        image.save_render(path)
+    saved = (render.frame_path, scene.frame_start, scene.frame_end, scene.frame_current)
+    render.frame_path = lambda frame=0: path
+    scene.frame_start, scene.frame_end = 1, 240
+
+    handler, timer, peaks = [], [], []
+    for _ in range(repeat):
+        contact_sheet.start(scene, settings)
+        scene.frame_current = contact_sheet._sheet.frames[1]
+        start = time.perf_counter()
+        contact_sheet.capture_frame(scene)
+        handler.append(time.perf_counter() - start)
+        sheet = contact_sheet._sheet
+        tracemalloc.start()
+        start = time.perf_counter()
+        bpy.app.timers.run_due()
+        timer.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if sheet.captured != [scene.frame_current]:
+            raise RuntimeError(f"contact sheet frame from {path} was not read back")
+        contact_sheet.discard()
+
+    render.frame_path, scene.frame_start, scene.frame_end, scene.frame_current = saved
+    os.remove(path)
+    return {'handler': summarize(handler), 'timer': summarize(timer), 'timer_peak_mb': max(peaks) / 1024 ** 2}
+
+def bench_send(addon, bpy, sink, repeat):
+    """End-to-end latency from send_email() until the SMTP sink has the message"""
+    nc = addon.notifier_core
+    preview = addon.preview
+    settings = bpy.context.scene.render_mailbot
+    single = list(settings.recipients)
+    # Enough recipients to be split into several envelopes at the default relay limit
+    many = bpy_stub.Collection(bpy_stub.SimpleNamespace(name=f"artist{i}@localhost")
+                               for i in range(FANOUT_RECIPIENTS))
+    image = bpy_stub.Image("Render Result", 1920, 1080)
+    render_preview = preview.make_preview(preview.preview_from_image(image, 1280), bpy.context.scene.render_mailbot)
+    cases = {
+        'direct_text': dict(preview_image=None, durable=False),
+        'direct_preview': dict(preview_image=render_preview, durable=False),
+        'outbox_text': dict(preview_image=None, durable=True),
+        'outbox_preview': dict(preview_image=render_preview, durable=True),
+        'fanout_preview': dict(preview_image=render_preview, durable=False),
+    }
+
+    results = {}
+    for name, options in cases.items():
+        settings.recipients = many if name.startswith('fanout') else bpy_stub.Collection(single)
+        addon.snapshot.invalidate()   # The stand-in has no property update callbacks
+        envelopes = -(-len(settings.recipients) // settings.smtp_max_recipients)
+        samples = []
+        for index in range(repeat):
+            expected = len(sink.messages) + envelopes
+            preview._encode_cache.clear()   # Every real notification encodes its own preview
+            start = time.perf_counter()
+            # Bodies differ per run so the outbox does not drop them as duplicates
+            nc.send_email(f"Benchmark {name}", f"Run {index} at {time.time()}", notify=False, **options)
+            if not sink.wait_for(expected):
+                raise RuntimeError(f"{name}: message {index} never reached the SMTP sink")
+            samples.append(time.perf_counter() - start)
+            bpy.app.timers.run_due()
+        results[name] = dict(summarize(samples), first_ms=samples[0] * 1000.0, envelopes=envelopes)
+    settings.recipients = bpy_stub.Collection(single)
+    addon.snapshot.invalidate()
+
+    results['connections'] = sink.connections
+    results['logins'] = sink.logins
+    results['messages'] = len(sink.messages)
+    return results
+
+def bench_jobs(addon, bpy, sink, renders):
+    """Back-to-back stills: every render starts while the completion timers of the earlier ones are pending"""
+    nc = addon.notifier_core
+    scene = bpy.context.scene
+    settings = scene.render_mailbot
+    saved = (scene.frame_start, scene.frame_end, scene.frame_current, settings.resource_usage)
+    scene.frame_start = scene.frame_end = scene.frame_current = 1
+    settings.resource_usage = False   # The sampler thread is measured on its own
+
+    expected = len(sink.messages) + renders
+    starts, completions = [], []
+    for _ in range(renders):
+        start = time.perf_counter()
+        nc.on_render_start(scene)
+        starts.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        nc.on_render_complete(scene)
+        completions.append(time.perf_counter() - start)
+    pending = len(addon.jobs.pending())
+
+    start = time.perf_counter()
+    bpy.app.timers.run_due()
+    delivered = sink.wait_for(expected)
+    results = {
+        'renders': renders,
+        'pending_jobs': pending,
+        'on_render_start': summarize(starts),
+        'on_render_complete': summarize(completions),
+        'notify_all_ms': (time.perf_counter() - start) * 1000.0,
+        'notifications': renders - max(0, expected - len(sink.messages)),
+        'all_delivered': delivered,
+    }
+    scene.frame_start, scene.frame_end, scene.frame_current, settings.resource_usage = saved
+    return results
+
+# Stand-in for the sendmail program: ignores its arguments and stores the message in a folder
+FAKE_SENDMAIL = """#!/bin/sh
+cat > "{folder}/$$.eml"
+"""
+
+def bench_channels(addon, bpy, sink, hook, root, repeat):
+    """Latency of each notification channel alone and of all of them at once"""
+    nc = addon.notifier_core
+    preview = addon.preview
+    settings = bpy.context.scene.render_mailbot
+    image = bpy_stub.Image("Render Result", 1920, 1080)
+    render_preview = preview.make_preview(preview.preview_from_image(image, 1280), settings)
+
+    sendmail_dir = os.path.join(root, "sendmail")
+    os.makedirs(sendmail_dir, exist_ok=True)
+    sendmail_path = os.path.join(root, "sendmail.sh")
+    with open(sendmail_path, 'w', encoding='utf-8') as f:
+        f.write(FAKE_SENDMAIL.format(folder=sendmail_dir))
+    os.chmod(sendmail_path, 0o755)
+    settings.sendmail_path = sendmail_path
+    settings.maildir_path = os.path.join(root, "maildir")
+
+    cases = {
+        'smtp': dict(channel_smtp=True),
+        'maildir': dict(channel_file=True, file_drop_mode='MAILDIR'),
+        'sendmail': dict(channel_file=True, file_drop_mode='SENDMAIL'),
+        'webhook': dict(channel_webhook=True, webhook_url=hook.url),
+        'all': dict(channel_smtp=True, channel_file=True, file_drop_mode='MAILDIR',
+                    channel_webhook=True, webhook_url=hook.url),
+    }
+    results = {}
+    for name, options in cases.items():
+        settings.channel_smtp = settings.channel_file = settings.channel_webhook = False
+        for key, value in options.items():
+            setattr(settings, key, value)
+        addon.snapshot.invalidate()   # The stand-in has no property update callbacks
+
+        # One untimed send opens the SMTP session and warms the channel up
+        nc.send_email(f"Warm-up {name}", "Warm-up", render_preview, notify=False, durable=False)
+        addon.delivery.wait_idle(30)
+
+        samples = []
+        for index in range(repeat):
+            preview._encode_cache.clear()
+            start = time.perf_counter()
+            nc.send_email(f"Benchmark {name}", f"Run {index} at {time.time()}", render_preview,
+                          notify=False, durable=False)
+            if not addon.delivery.wait_idle(30):
+                raise RuntimeError(f"{name}: notification {index} was not delivered")
+            samples.append(time.perf_counter() - start)
+            bpy.app.timers.run_due()
+        results[name] = summarize(samples)
+
+    settings.channel_smtp, settings.channel_file, settings.channel_webhook = True, False, False
+    addon.snapshot.invalidate()
+    # Below 1.0 when the channels overlap; wait_idle() polls every 50 ms, which sets the resolution
+    single = sum(results[name]['median_ms'] for name in ('smtp', 'maildir', 'webhook'))
+    results['all_vs_sum_of_channels'] = results['all']['median_ms'] / single
+    results['webhook_payloads'] = len(hook.payloads)
+    return results
+
+def bench_farm(addon, root, nodes, frames):
+    """Aggregator cost for a job split across many nodes: first full merge, then incremental passes"""
+    farm = addon.farm
+    spool = os.path.join(root, "farm")
+    job_dir = os.path.join(spool, "bench_job")
+    os.makedirs(job_dir, exist_ok=True)
+
+    # Event files in the nodes' format, written directly: NodeLog would fsync every line
+    start = time.time() - frames * 10.0
+    per_node = max(1, frames // nodes)
+    paths = []
+    for index in range(nodes):
+        first = index * per_node + 1
+        path = os.path.join(job_dir, f"node{index:04d}{farm.EVENTS_SUFFIX}")
+        records = [{'e': 'start', 't': start, 'host': f"node{index:04d}", 'pid': 1,
+                    'range': [first, first + per_node - 1, 1]}]
+        # Every tenth node is twice as slow so the straggler check has something to find
+        seconds = 20.0 if index % 10 == 0 else 10.0
+        records += [{'e': 'frame', 't': start + (n + 1) * seconds, 'f': first + n, 's': seconds}
+                    for n in range(per_node)]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record, separators=(',', ':')) + "\n" for record in records)
+        paths.append(path)
+
+    aggregator = farm.JobAggregator(spool, "bench_job", settle=0.0)
+    results = {'nodes': nodes, 'frames': per_node * nodes}
+    begin = time.perf_counter()
+    results['events_merged'] = aggregator.poll()
+    results['full_merge_ms'] = (time.perf_counter() - begin) * 1000.0
+
+    results['idle_poll'] = measure(aggregator.poll, 10)
+
+    def append_done():
+        for path in paths:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'e': 'done', 't': time.time()}) + "\n")
+        aggregator.poll()
+    results['incremental_poll'] = measure(append_done, 1)
+    results['report'] = measure(aggregator.report, 10)
+    results['finished'] = aggregator.is_finished(time.time())
+    results['stragglers'] = len(aggregator.stragglers(time.time()))
+    return results
+
+def bench_verify(addon, bpy, sink, root, frame_count, repeat):
+    """Output frame verification of a 1080p EXR and PNG sequence, one worker against the pool"""
+    verify = addon.verify
+    results = {}
+    rgba = frame_files.noise_frame(1920, 1080)
+    for extension in ('exr', 'png'):
+        directory = os.path.join(root, "verify", extension)
+        os.makedirs(directory, exist_ok=True)
+        template = os.path.join(root, "verify", f"template.{extension}")
+        if extension == 'exr':
+            frame_files.write_exr(template, rgba)
+        else:
+            with open(template, 'wb') as f:
+                f.write(addon.encoders.encode_png((np.clip(rgba, 0.0, 1.0) * 255).astype(np.uint8)))
+        frames = frame_files.fill_sequence(directory, template, range(1, frame_count + 1))
+
+        # A few broken frames so every check runs: missing, truncated, and all black (EXR) or damaged pixel data (PNG)
+        os.remove(frames[1][1])
+        frame_files.truncate(frames[2][1])
+        if extension == 'exr':
+            black = rgba.copy()
+            black[..., :3] = 0.0
+            frame_files.write_exr(frames[3][1], black)
+        else:
+            frame_files.corrupt_png_data(frames[3][1])
+
+        megabytes = sum(os.path.getsize(path) for _, path in frames if os.path.exists(path)) / 1024 ** 2
+        case = {'frames': frame_count, 'megabytes': megabytes}
+        for name, workers in (('single_worker', 1), ('pool', verify.MAX_WORKERS)):
+            report = None
+            def run_verify():
+                nonlocal report
+                report = verify.verify(frames, workers)
+            case[name] = measure(run_verify, repeat)
+        case['speedup'] = case['single_worker']['median_ms'] / case['pool']['median_ms']
+        case['megabytes_per_second'] = megabytes / (case['pool']['median_ms'] / 1000.0)
+        case['problems'] = {check.status: check.frame for check in report.checks if check.status != 'ok'}
+        results[extension] = case
+
+    # The completion timer of an animation whose frames are checked: the check runs on its own
+    # thread, so the timer callbacks that Blender runs on the main thread stay short
+    nc, jobs = addon.notifier_core, addon.jobs
+    job = jobs.begin(bpy.context.scene, True)
+    job.body = f"Verify benchmark at {time.time()}\n"
+    job.frame_paths = frames
+    jobs.complete(job)
+    expected = len(sink.messages) + 1
+    calls = []
+    start = time.perf_counter()
+    while True:
+        call = time.perf_counter()
+        interval = nc.send_render_notification_later(job.key)
+        calls.append(time.perf_counter() - call)
+        if interval is None:
+            break
+        time.sleep(interval)
+    results['completion_timer'] = {
+        'frames': len(frames),
+        'until_sent_ms': (time.perf_counter() - start) * 1000.0,
+        'timer_calls': len(calls),
+        'longest_call_ms': max(calls) * 1000.0,
+        'delivered': sink.wait_for(expected),
+    }
+    bpy.app.timers.run_due()
+    return results
+
+def bench_resources(addon, readings, repeat):
+    """Resource sampler: cost per reading over a multi-day render, and drawing the chart"""
+    resources = addon.resources
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0.0, 1.0, readings)
+    values = np.stack([2e9 + 6e9 * ramp + 1e8 * rng.random(readings),
+                       60.0 + 30.0 * np.sin(np.arange(readings) / 500.0),
+                       1.5e9 + 5e9 * ramp,
+                       np.full(readings, 7e9)], axis=1)
+
+    samples = None
+    def fill():
+        nonlocal samples
+        samples = resources.ResourceSamples()
+        for index in range(readings):
+            samples.add(index * resources.SAMPLE_INTERVAL, values[index])
+    timing = measure(fill, repeat)
+    results = {
+        'readings': readings,
+        'simulated_hours': readings * resources.SAMPLE_INTERVAL / 3600,
+        'per_reading_us': timing['median_ms'] * 1000.0 / readings,
+        'slots': samples.count,
+        'readings_per_slot': samples.stride,
+        'array_bytes': samples.values.nbytes + samples.times.nbytes,
+        'render_stats_hook': measure(lambda: resources.render_stats("Fra:1 Mem:285.89M (Peak 318.47M) | Time:00:01.15"),
+                                     repeat * 100),
+    }
+    resources._samples = samples
+    results['chart'] = measure(resources.chart_png, repeat)
+    results['chart_bytes'] = len(resources.chart_png())
+    resources._samples = None
+    return results
+
+def bench_tracing(addon, repeat):
+    """Cost of one stage span with tracing off, and on with the JSON lines log"""
+    tracing = addon.tracing
+    spans = 10000
+
+    def run_spans():
+        for _ in range(spans):
+            with tracing.span("bench.stage", frame=1):
+                pass
+
+    results = {}
+    for state in (False, True):
+        tracing.set_enabled(state)
+        summary = measure(run_spans, max(1, repeat // 10))
+        results['enabled' if state else 'disabled'] = {'per_span_us': summary['mean_ms'] * 1000.0 / spans}
+    tracing.set_enabled(False)
+    tracing.reset()
+    return results
+
+def addon_version():
+    with open(os.path.join(ADDON_DIR, "__init__.py"), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], 'id', None) == 'bl_info':
+            return ".".join(str(part) for part in ast.literal_eval(node.value)['version'])
+    return None
+
+def run(args):
+    root = tempfile.mkdtemp(prefix="render_notifier_bench_")
+    bpy = bpy_stub.install(root)
+    sink = SMTPSink(latency=args.smtp_latency / 1000.0).start()
+    hook = WebhookSink(latency=args.webhook_latency / 1000.0).start()
+    bpy.context.scene.render_mailbot.smtp_port = sink.port
+
+    log = sys.stderr if args.verbose else open(os.devnull, 'w', encoding='utf-8')
+    benchmarks = {}
+    with contextlib.redirect_stdout(log):
+        addon = load_addon()
+        addon.notifier_core.register_handlers()
+        try:
+            steps = [
+                ('startup', lambda: bench_startup(max(3, args.repeat // 10), args.startup_budget)),
+                ('handlers', lambda: bench_handlers(addon, bpy, args.frames, args.repeat)),
+                ('message', lambda: bench_message(addon, bpy, args.repeat)),
+                ('preview', lambda: bench_previews(addon, bpy, args.resolutions, max(1, args.repeat // 10))),
+                ('send', lambda: bench_send(addon, bpy, sink, max(1, args.repeat // 10))),
+                ('jobs', lambda: bench_jobs(addon, bpy, sink, args.renders)),
+                ('channels', lambda: bench_channels(addon, bpy, sink, hook, root, max(3, args.repeat // 10))),
+                ('farm', lambda: bench_farm(addon, root, args.farm_nodes, args.farm_frames)),
+                ('verify', lambda: bench_verify(addon, bpy, sink, root, args.verify_frames, 3)),
+                ('resources', lambda: bench_resources(addon, args.resource_readings, 3)),
+                ('tracing', lambda: bench_tracing(addon, args.repeat)),
+            ]
+            for name, step in steps:
+                print(f"⏱️ Running {name} benchmarks...", file=sys.stderr)
+                benchmarks[name] = step()
+        finally:
+            addon.notifier_core.unregister_handlers()
+            sink.stop()
+            hook.stop()
+
+    return {
+        'schema': SCHEMA_VERSION,
+        'addon_version': addon_version(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': {
+            'frames': args.frames,
+            'repeat': args.repeat,
+            'resolutions': args.resolutions,
+            'smtp_latency_ms': args.smtp_latency,
+            'webhook_latency_ms': args.webhook_latency,
+            'farm_nodes': args.farm_nodes,
+            'farm_frames': args.farm_frames,
+            'verify_frames': args.verify_frames,
+            'renders': args.renders,
+            'resource_readings': args.resource_readings,
+            'startup_budget_ms': args.startup_budget,
+        },
+        'benchmarks': benchmarks,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the Render Email Notifier add-on")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--frames", type=int, default=1000, help="frames in the simulated animation")
+    parser.add_argument("--repeat", type=int, default=100, help="runs per measurement (previews and sends use a tenth)")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument("--smtp-latency", type=float, default=0.0, help="milliseconds the sink waits per SMTP command")
+    parser.add_argument("--webhook-latency", type=float, default=0.0, help="milliseconds the webhook sink waits per request")
+    parser.add_argument("--farm-nodes", type=int, default=200, help="render nodes in the simulated farm job")
+    parser.add_argument("--farm-frames", type=int, default=20000, help="frames in the simulated farm job")
+    parser.add_argument("--verify-frames", type=int, default=500, help="frames in each verified sequence")
+    parser.add_argument("--renders", type=int, default=100, help="back-to-back renders in the job table benchmark")
+    parser.add_argument("--resource-readings", type=int, default=100000,
+                        help="resource sampler readings to simulate (100,000 is about 55 hours)")
+    parser.add_argument("--startup-budget", type=float, default=75.0,
+                        help="fail if importing and registering the add-on takes longer (median ms; 0 turns the check off)")
+    parser.add_argument("--quick", action="store_true", help="small run for a smoke check: 1080p only, fewer repeats")
+    parser.add_argument("--verbose", action="store_true", help="show the add-on's log output on stderr")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.frames, args.repeat, args.resolutions = 200, 20, ['1080p']
+        args.verify_frames = min(args.verify_frames, 40)
+        args.renders = min(args.renders, 20)
+        args.resource_readings = min(args.resource_readings, 20000)
+
+    results = run(args)
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
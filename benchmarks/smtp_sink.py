@@ -0,0 +1,91 @@
+"""Minimal in-process SMTP server that accepts and records every message"""
+
+import socketserver
+import threading
+import time
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA, NOOP, RSET, QUIT"""
+
+    def _reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self._reply("220 localhost sink ready")
+        envelope_from, envelope_to = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if server.latency:
+                time.sleep(server.latency)
+
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-localhost")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif verb == "AUTH":
+                server.logins += 1
+                self._reply("235 Authentication successful")
+            elif verb == "MAIL":
+                envelope_from, envelope_to = command[10:].strip("<> "), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                envelope_to.append(command[8:].strip("<> "))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                chunks = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b".\r\n":
+                        break
+                    chunks.append(data[1:] if data.startswith(b"..") else data)
+                with server.received:
+                    server.messages.append((envelope_from, envelope_to, b"".join(chunks)))
+                    server.received.notify_all()
+                self._reply("250 OK queued")
+            elif verb in ("NOOP", "RSET"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Threaded SMTP sink bound to an ephemeral localhost port"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.latency = latency  # Seconds added to every command, to mimic a remote relay
+        self.messages = []
+        self.connections = 0
+        self.logins = 0
+        self.received = threading.Condition()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def wait_for(self, count, timeout=30.0):
+        """Block until at least count messages arrived; returns False on timeout"""
+        with self.received:
+            return self.received.wait_for(lambda: len(self.messages) >= count, timeout)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
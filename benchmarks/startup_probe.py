@@ -0,0 +1,50 @@
+"""Time importing and registering the add-on in a fresh interpreter
+
+Run by run_benchmarks.py once per sample, since the import cost can only be
+seen the first time. Prints one JSON object: the import and register times and
+which of the modules the add-on is meant to load lazily are already loaded.
+
+    python benchmarks/startup_probe.py <add-on folder> <package name>
+"""
+
+import contextlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+import bpy_stub
+
+# Loaded by the first send or the first render, never by registering the add-on
+DEFERRED_MODULES = (
+    'numpy', 'smtplib', 'ssl', 'email.message', 'email.parser', 'email.utils', 'mailbox',
+    'urllib.request', 'subprocess', 'concurrent.futures', 'logging', 'argparse',
+)
+
+def main(addon_dir, package_name):
+    bpy_stub.install(tempfile.mkdtemp(prefix="render_notifier_startup_"))
+    with open(os.devnull, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        start = time.perf_counter()
+        spec = importlib.util.spec_from_file_location(package_name, os.path.join(addon_dir, "__init__.py"),
+                                                      submodule_search_locations=[addon_dir])
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[package_name] = package
+        spec.loader.exec_module(package)
+        imported = time.perf_counter()
+        package.register()
+        registered = time.perf_counter()
+        loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+        modules = sorted(name for name in sys.modules if name.startswith(package_name + "."))
+        package.unregister()
+
+    print(json.dumps({
+        'import_ms': (imported - start) * 1000.0,
+        'register_ms': (registered - imported) * 1000.0,
+        'addon_modules': modules,
+        'deferred_loaded': loaded,
+    }))
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2])
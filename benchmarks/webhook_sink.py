@@ -0,0 +1,54 @@
+"""Minimal in-process HTTP endpoint that accepts and records every JSON POST"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    """Answers every POST with 204 after the configured latency"""
+
+    def do_POST(self):
+        server = self.server
+        data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if server.latency:
+            time.sleep(server.latency)
+        with server.received:
+            server.payloads.append(json.loads(data))
+            server.received.notify_all()
+        self.send_response(server.status)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+class WebhookSink(ThreadingHTTPServer):
+    """Threaded HTTP sink bound to an ephemeral localhost port"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, status=204):
+        super().__init__(("127.0.0.1", 0), _WebhookHandler)
+        self.latency = latency  # Seconds before answering, to mimic a remote service
+        self.status = status
+        self.payloads = []
+        self.received = threading.Condition()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/hook"
+
+    def wait_for(self, count, timeout=30.0):
+        """Block until at least count payloads arrived; returns False on timeout"""
+        with self.received:
+            return self.received.wait_for(lambda: len(self.payloads) >= count, timeout)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()